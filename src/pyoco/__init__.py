@@ -1,11 +1,36 @@
-from .core.models import Flow, Task
-from .core.engine import Engine
-from .dsl.syntax import task
-from .trace.console import ConsoleTraceBackend
+import importlib
+
+# Public names resolve on first access so that `import pyoco` (and the CLI,
+# which lives in this package) does not load the engine or DSL up front.
+_LAZY_EXPORTS = {
+    "Flow": ".core.models",
+    "Task": ".core.models",
+    "Engine": ".core.engine",
+    "task": ".dsl.syntax",
+    "subflow_task": ".dsl.syntax",
+    "ConsoleTraceBackend": ".trace.console",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+def run(flow: "Flow", params: dict = None, trace: bool = True, cute: bool = True):
+    from .core.engine import Engine
+    from .trace.console import ConsoleTraceBackend
 
-def run(flow: Flow, params: dict = None, trace: bool = True, cute: bool = True):
     backend = ConsoleTraceBackend(style="cute" if cute else "plain")
-    engine = Engine(trace_backend=backend)
-    return engine.run(flow, params)
+    with Engine(trace_backend=backend) as engine:
+        return engine.run(flow, params)
 
-__all__ = ["task", "Flow", "run"]
+__all__ = ["task", "subflow_task", "Flow", "run"]
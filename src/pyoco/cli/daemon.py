@@ -0,0 +1,355 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import traceback
+from typing import Any, Dict, Optional, TextIO
+
+# Requests and replies are JSON objects, one per line.
+#   client -> daemon: {"cmd": "run", "config": ..., "cwd": ..., "flow": ..., "params": {...}, "cute": bool}
+#                     {"cmd": "cancel"} (while a run is streaming), {"cmd": "status"}, {"cmd": "stop"}
+#   daemon -> client: {"type": "output", "stream": "stdout" | "stderr", "text": ...} while running,
+#                     then {"type": "result", "status": ..., "error": ...}
+
+
+def default_socket_path() -> str:
+    """
+    ``$PYOCO_DAEMON_SOCKET``, else ``pyoco-daemon.sock`` in ``$XDG_RUNTIME_DIR``,
+    else in a private (0700) per-user directory under the temp dir.
+    """
+    path = os.getenv("PYOCO_DAEMON_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"pyoco-{os.getuid()}")
+        os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+        stat = os.lstat(runtime_dir)
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            raise RuntimeError(f"Refusing to use {runtime_dir}: not a private directory of the current user.")
+    return os.path.join(runtime_dir, "pyoco-daemon.sock")
+
+
+class _Workspace:
+    """A loaded config (by path and working directory) and the flows built from it."""
+
+    def __init__(self, config_path: str, cwd: str):
+        from ..discovery.loader import TaskLoader
+        from ..schemas.config import PyocoConfig
+
+        self.config_path = config_path
+        self.cwd = cwd
+        self.stamp = _stamp(config_path)
+        self.config = PyocoConfig.from_yaml(config_path)
+        self.loader = TaskLoader(self.config)
+        self.loader.load()
+        self.flows: Dict[str, Any] = {}
+        self.sources: Dict[str, Any] = {}
+
+    def flow(self, name: str):
+        flow = self.flows.get(name)
+        if flow is None:
+            from .flow_cache import build_flow
+
+            flow_conf = self.config.flows[name]
+            graphs = {key: conf.graph for key, conf in self.config.flows.items()}
+            flow = build_flow(name, flow_conf.graph, self.loader, lazy=self.config.discovery.lazy, flows=graphs)
+            tasks = list(flow.tasks)
+            while tasks:
+                task = tasks.pop()
+                if task.subflow is not None:
+                    tasks.extend(task.subflow.flow.tasks)
+                    continue
+                source = getattr(getattr(task.func, "__code__", None), "co_filename", None)
+                if source:
+                    self.sources[source] = _stamp(source)
+            self.flows[name] = flow
+        return flow
+
+    def changed_sources(self):
+        return [source for source, stamp in self.sources.items() if _stamp(source) != stamp]
+
+
+class RunnerDaemon:
+    """
+    Long-lived local runner behind a Unix domain socket.
+
+    Configs are parsed, their tasks imported and their flows built once per
+    (config path, working directory) and reused by later runs. Editing the
+    config reloads it; editing the source of a task used by a built flow
+    re-imports that module. Runs are executed one at a time, on one Engine
+    whose worker threads stay up between runs, with stdout/stderr (trace
+    output and task prints) streamed to the client.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.workspaces: Dict[Any, _Workspace] = {}
+        self.runs = 0
+        self.engine = None
+        self.ready = threading.Event()
+        self._server: Optional[socketserver.UnixStreamServer] = None
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            if _ping(self.socket_path):
+                raise RuntimeError(f"A pyoco daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                daemon._handle(self.connection, self.rfile)
+
+        self._server = socketserver.UnixStreamServer(self.socket_path, Handler)
+        self.ready.set()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.engine is not None:
+                self.engine.close()
+            with contextlib.suppress(OSError):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _handle(self, conn: socket.socket, rfile):
+        line = rfile.readline()
+        if not line:
+            return
+        sender = _Sender(conn)
+        try:
+            request = json.loads(line)
+        except ValueError:
+            sender.send({"type": "result", "status": "FAILED", "error": "Malformed request."})
+            return
+        command = request.get("cmd")
+        if command == "run":
+            self._run(request, conn, sender)
+        elif command == "status":
+            sender.send({
+                "type": "result",
+                "status": "ok",
+                "pid": os.getpid(),
+                "runs": self.runs,
+                "configs": sorted({ws.config_path for ws in self.workspaces.values()}),
+            })
+        elif command == "stop":
+            sender.send({"type": "result", "status": "ok"})
+            self.shutdown()
+        else:
+            sender.send({"type": "result", "status": "FAILED", "error": f"Unknown command: {command!r}"})
+
+    def _run(self, request: Dict[str, Any], conn: socket.socket, sender: "_Sender"):
+        from ..core.engine import Engine
+        from ..core.models import RunContext
+        from ..trace.console import ConsoleTraceBackend
+
+        cwd = request.get("cwd") or os.getcwd()
+        flow_name = request.get("flow", "main")
+        previous_cwd = os.getcwd()
+        stdout, stderr = _StreamWriter(sender, "stdout"), _StreamWriter(sender, "stderr")
+        run_ctx = RunContext()
+        result: Dict[str, Any] = {"type": "result", "status": "FAILED", "error": None}
+        try:
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    workspace = self._workspace(request["config"], cwd)
+                    flow_conf = workspace.config.flows.get(flow_name)
+                    if flow_conf is None:
+                        result["error"] = f"Flow '{flow_name}' not found in config."
+                        return
+                    flow = workspace.flow(flow_name)
+                except Exception as exc:
+                    traceback.print_exc()
+                    result["error"] = f"Error loading flow: {exc}"
+                    return
+                params = dict(flow_conf.defaults)
+                params.update(request.get("params") or {})
+                if self.engine is None:
+                    self.engine = Engine()
+                engine = self.engine
+                # Runs are served one at a time, so the trace style can follow the request.
+                engine.trace = ConsoleTraceBackend(style="cute" if request.get("cute", True) else "plain")
+                self.runs += 1
+
+                def execute():
+                    try:
+                        engine.run(flow, params, run_context=run_ctx)
+                    except Exception as exc:
+                        traceback.print_exc()
+                        result["error"] = f"Error executing flow: {exc}"
+
+                runner = threading.Thread(target=execute, name=f"pyoco-daemon-run-{self.runs}")
+                runner.start()
+                self._watch_client(conn, runner, engine, run_ctx)
+                runner.join()
+            result["status"] = run_ctx.status.value
+            result["run_id"] = run_ctx.run_id
+        finally:
+            os.chdir(previous_cwd)
+            sender.send(result)
+
+    def _watch_client(self, conn: socket.socket, runner: threading.Thread, engine, run_ctx):
+        # A "cancel" request or a closed connection (client interrupted) cancels the run.
+        conn.settimeout(0.1)
+        cancelled = False
+        while runner.is_alive():
+            try:
+                data = conn.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                data = b""
+            if not cancelled and (not data or b"cancel" in data):
+                cancelled = True
+                engine.cancel(run_ctx.run_id)
+            if not data:
+                runner.join()
+        conn.settimeout(None)
+
+    def _workspace(self, config_path: str, cwd: str) -> _Workspace:
+        key = (config_path, cwd)
+        workspace = self.workspaces.get(key)
+        if workspace is not None:
+            changed = workspace.changed_sources()
+            if changed:
+                _reload_modules(changed)
+                workspace = None
+            elif workspace.stamp != _stamp(config_path):
+                workspace = None
+        if workspace is None:
+            workspace = self.workspaces[key] = _Workspace(config_path, cwd)
+        return workspace
+
+
+class _Sender:
+    def __init__(self, conn: socket.socket):
+        self.conn = conn
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                self.closed = True
+
+
+class _StreamWriter(io.TextIOBase):
+    def __init__(self, sender: _Sender, stream: str):
+        self.sender = sender
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.sender.send({"type": "output", "stream": self.stream, "text": text})
+        return len(text)
+
+
+def _reload_modules(sources):
+    import importlib
+
+    paths = {os.path.abspath(source) for source in sources}
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if filename and os.path.abspath(filename) in paths:
+            importlib.reload(module)
+
+
+def _stamp(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _connect(socket_path: str) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _ping(socket_path: str) -> bool:
+    try:
+        request(socket_path, {"cmd": "status"})
+    except OSError:
+        return False
+    return True
+
+
+def request(socket_path: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request and return the daemon's result message."""
+    with _connect(socket_path) as sock:
+        sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                reply = json.loads(line)
+                if reply.get("type") == "result":
+                    return reply
+    raise ConnectionError("pyoco daemon closed the connection without a result.")
+
+
+def submit_run(
+    socket_path: str,
+    config_path: str,
+    flow_name: str,
+    params: Dict[str, Any],
+    cute: bool = True,
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+) -> Dict[str, Any]:
+    """
+    Run a flow on the daemon, echoing its output as it arrives. Ctrl+C asks
+    the daemon to cancel the run. Returns the result message.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    message = {
+        "cmd": "run",
+        "config": os.path.abspath(config_path),
+        "cwd": os.getcwd(),
+        "flow": flow_name,
+        "params": params,
+        "cute": cute,
+    }
+    with _connect(socket_path) as sock:
+        sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as replies:
+            while True:
+                try:
+                    line = replies.readline()
+                except KeyboardInterrupt:
+                    print("\n🛑 Ctrl+C detected. Cancelling the daemon run...", file=stdout)
+                    sock.sendall(b'{"cmd": "cancel"}\n')
+                    continue
+                if not line:
+                    raise ConnectionError("pyoco daemon closed the connection without a result.")
+                reply = json.loads(line)
+                if reply.get("type") == "output":
+                    target = stderr if reply.get("stream") == "stderr" else stdout
+                    target.write(reply.get("text", ""))
+                    target.flush()
+                elif reply.get("type") == "result":
+                    return reply
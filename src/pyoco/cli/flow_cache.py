@@ -0,0 +1,361 @@
+import hashlib
+import importlib
+import io
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+
+from ..core.models import Flow, Task
+from ..paths import user_cache_dir
+
+CACHE_VERSION = 2
+
+# Task attributes the graph string may change (e.g. `.map(...)`); restored on a hit.
+_TASK_FIELDS = (
+    "inputs",
+    "outputs",
+    "parallel_group",
+    "fail_policy",
+    "retries",
+    "timeout_sec",
+    "trigger_policy",
+    "stream",
+    "map_over",
+    "map_arg",
+)
+
+
+class _TaskScope(dict):
+    """exec() locals that wrap a task the first time the graph names it."""
+
+    def __init__(self, tasks):
+        super().__init__()
+        self.tasks = tasks
+        self.referenced = []
+
+    def __missing__(self, name):
+        from ..dsl.syntax import TaskWrapper, detached_copy
+        if name not in self.tasks:
+            raise KeyError(name)
+        task = detached_copy(self.tasks[name])
+        self[name] = wrapper = TaskWrapper(task)
+        self.referenced.append(task)
+        return wrapper
+
+
+def build_flow(
+    flow_name: str,
+    graph: str,
+    loader: Any,
+    lazy: bool = False,
+    flows: Optional[Mapping[str, str]] = None,
+    _building: tuple = (),
+) -> Flow:
+    """
+    Evaluate a config ``graph`` string over the loader's tasks.
+
+    Eagerly loaded tasks are all added to the flow. With ``lazy`` only the
+    tasks the graph names are looked up (and so imported) and added. The
+    flow gets its own copies of the tasks, so the edges and options it sets
+    do not leak into other flows built from the same loader.
+
+    ``flows`` maps the config's flow names to their graph strings; the graph
+    can embed one of them as a single task with
+    ``subflow("etl", "first", params={...}, output=...)`` (the arguments of
+    ``subflow_task``). Each embedded flow is built from the same loader.
+    """
+    from ..dsl.syntax import TaskWrapper, detached_copy, subflow_task, switch
+
+    building = _building + (flow_name,)
+
+    def subflow(name: str, task_name: Optional[str] = None, **options) -> TaskWrapper:
+        if flows is None or name not in flows:
+            raise KeyError(f"Flow '{name}' not found in config.")
+        if name in building:
+            raise ValueError(f"Sub-flow cycle: {' -> '.join(building + (name,))}")
+        child = build_flow(name, flows[name], loader, lazy=lazy, flows=flows, _building=building)
+        return subflow_task(child, task_name, **options)
+
+    flow = Flow(name=flow_name)
+    if lazy:
+        eval_context = _TaskScope(loader.tasks)
+    else:
+        eval_context = {}
+        for name, task in loader.tasks.items():
+            task = detached_copy(task)
+            eval_context[name] = TaskWrapper(task)
+            flow.add_task(task)
+    eval_context["switch"] = switch
+    eval_context["subflow"] = subflow
+    eval_context["flow"] = flow
+    exec(graph, {}, eval_context)
+    if lazy:
+        for t in eval_context.referenced:
+            if t not in flow.tasks:  # Keep variants the graph added, e.g. from `.map(...)`.
+                flow.add_task(t)
+    return flow
+
+
+class FlowCache:
+    """
+    On-disk cache of flows built from a config's ``graph`` string.
+
+    An entry holds the task edges, the task policies and the control-flow
+    program of one flow, with tasks stored by name, plus the flow's default
+    params and the module attribute each task was loaded from. It is valid
+    while the config file content and the source files (mtime and size) of
+    the flow's tasks are unchanged. ``load_or_build`` also requires the same
+    set of loaded task names and wires up copies of the already loaded tasks;
+    ``lookup`` runs before the config is parsed or tasks are discovered and
+    imports only the modules of the flow's tasks. A new module that shadows a
+    cached task name is not noticed by ``lookup``; ``--no-cache`` rebuilds.
+    Unreadable or stale entries are rebuilt, and cache write errors are ignored.
+    Entries live in the per-user cache (``$PYOCO_FLOW_CACHE_DIR`` overrides).
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or os.getenv("PYOCO_FLOW_CACHE_DIR") or user_cache_dir("flows"))
+
+    def load_or_build(
+        self,
+        config_path: str,
+        flow_name: str,
+        tasks: Mapping[str, Task],
+        build: Callable[[], Flow],
+        defaults: Optional[Dict[str, Any]] = None,
+    ) -> Flow:
+        """Return the cached flow, or ``build()`` it and store the result."""
+        digest = _file_digest(config_path)
+        if digest is None:
+            return build()
+        path = self.entry_path(config_path, flow_name)
+        flow = self._load(path, digest, flow_name, tasks)
+        if flow is None:
+            flow = build()
+            self._store(path, digest, flow, tasks, defaults or {})
+        return flow
+
+    def lookup(self, config_path: str, flow_name: str) -> Optional[Tuple[Flow, Dict[str, Any]]]:
+        """
+        Return ``(flow, default params)`` from the cache without a loader, or
+        None on a miss. Only the modules defining the flow's tasks are imported.
+        """
+        digest = _file_digest(config_path)
+        if digest is None:
+            return None
+        entry = self._read(self.entry_path(config_path, flow_name), digest)
+        if entry is None or entry["origins"] is None:
+            return None
+        try:
+            tasks = {name: _import_task(name, origin) for name, origin in entry["origins"].items()}
+            return _restore(entry["payload"], flow_name, tasks), dict(entry["defaults"])
+        except Exception:
+            return None
+
+    def entry_path(self, config_path: str, flow_name: str) -> Path:
+        key = f"{os.path.abspath(config_path)}\0{flow_name}".encode("utf-8")
+        return self.directory / f"{hashlib.sha256(key).hexdigest()[:32]}.pickle"
+
+    def _read(self, path: Path, digest: str) -> Optional[Dict[str, Any]]:
+        # The entry at ``path`` if it is current for the config ``digest`` and task sources.
+        try:
+            with path.open("rb") as fp:
+                entry = pickle.load(fp)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            return None
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != CACHE_VERSION
+            or entry.get("config") != digest
+        ):
+            return None
+        for source, stamp in entry["sources"].items():
+            if _source_stamp(source) != stamp:
+                return None
+        return entry
+
+    def _load(self, path: Path, digest: str, flow_name: str, tasks: Mapping[str, Task]) -> Optional[Flow]:
+        entry = self._read(path, digest)
+        if entry is None or entry["task_names"] != sorted(tasks):
+            return None
+        try:
+            return _restore(entry["payload"], flow_name, tasks)
+        except Exception:
+            return None
+
+    def _store(self, path: Path, digest: str, flow: Flow, tasks: Mapping[str, Task], defaults: Dict[str, Any]):
+        if any(task.subflow is not None for task in flow.tasks):
+            return  # Sub-flow tasks embed whole flows; run uncached.
+        referenced: Set[str] = set()
+        try:
+            payload = _dump(flow, referenced)
+        except Exception:
+            # Unpicklable task options (e.g. a lambda in map_over); run uncached.
+            return
+        names = referenced | {task.name for task in flow.tasks}
+        sources: Dict[str, Any] = {}
+        origins: Optional[Dict[str, Tuple[str, str, str]]] = {}
+        for name in names:
+            task = tasks.get(name)
+            source = _source_file(task)
+            if source is not None:
+                sources[source] = _source_stamp(source)
+            origin = _task_origin(task) if task is not None else None
+            if origin is None:
+                origins = None  # e.g. registered by a plug-in hook
+            elif origins is not None:
+                origins[name] = origin
+        entry = {
+            "version": CACHE_VERSION,
+            "config": digest,
+            "task_names": sorted(tasks),
+            "sources": sources,
+            "origins": origins,
+            "defaults": defaults,
+            "payload": payload,
+        }
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("wb") as fp:
+                pickle.dump(entry, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+class _TaskPickler(pickle.Pickler):
+    # Tasks hold functions; they are written as names and looked up on load.
+    def __init__(self, file, referenced: Set[str]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.referenced = referenced
+
+    def persistent_id(self, obj):
+        if isinstance(obj, Task):
+            self.referenced.add(obj.name)
+            return obj.name
+        return None
+
+
+class _TaskUnpickler(pickle.Unpickler):
+    def __init__(self, file, tasks: Mapping[str, Task]):
+        super().__init__(file)
+        self.tasks = tasks
+        self.copies: Dict[str, Task] = {}
+
+    def persistent_load(self, name):
+        return self.copy(name)
+
+    def copy(self, name: str) -> Task:
+        # One copy per task name, shared by the edges and the control-flow program.
+        from ..dsl.syntax import detached_copy
+
+        task = self.copies.get(name)
+        if task is None:
+            task = self.copies[name] = detached_copy(self.tasks[name])
+        return task
+
+
+def _dump(flow: Flow, referenced: Set[str]) -> bytes:
+    structure = {
+        "tasks": {
+            task.name: (
+                sorted(dep.name for dep in task.dependencies),
+                {key: getattr(task, key) for key in _TASK_FIELDS},
+            )
+            for task in flow.tasks
+        },
+        "tail": sorted(task.name for task in flow._tail),
+        "definition": list(flow._definition),
+        "control_flow": flow.has_control_flow(),
+    }
+    for task in flow.tasks:
+        if task.dependencies or task.dependents:
+            referenced.add(task.name)
+    buffer = io.BytesIO()
+    _TaskPickler(buffer, referenced).dump(structure)
+    return buffer.getvalue()
+
+
+def _restore(payload: bytes, flow_name: str, tasks: Mapping[str, Task]) -> Flow:
+    unpickler = _TaskUnpickler(io.BytesIO(payload), tasks)
+    structure = unpickler.load()
+    flow = Flow(name=flow_name)
+    for name, (deps, options) in structure["tasks"].items():
+        task = unpickler.copy(name)
+        for key, value in options.items():
+            setattr(task, key, value)
+        for dep_name in deps:
+            dep = unpickler.copy(dep_name)
+            task.dependencies.add(dep)
+            dep.dependents.add(task)
+        flow.add_task(task)
+    flow._tail = {unpickler.copy(name) for name in structure["tail"]}
+    flow._definition = structure["definition"]
+    flow._has_control_flow = structure["control_flow"]
+    return flow
+
+
+def _task_origin(task: Task) -> Optional[Tuple[str, str, str]]:
+    """
+    Where ``task`` can be imported from: ``("task", module, attr)`` if the
+    module attribute is the task itself, ``("func", module, attr)`` if the
+    task was created around the attribute's function (a config ``callable:``).
+    """
+    from ..dsl.syntax import TaskWrapper
+
+    func = task.func
+    module = sys.modules.get(getattr(func, "__module__", None) or "")
+    if module is None:
+        return None
+    found = getattr(module, task.name, None)
+    if isinstance(found, TaskWrapper):
+        found = found.task
+    if found is task:
+        return ("task", module.__name__, task.name)
+    for attr, value in vars(module).items():
+        if isinstance(value, TaskWrapper):
+            value = value.task
+        if value is func or (isinstance(value, Task) and value.func is func):
+            return ("func", module.__name__, attr)
+    return None
+
+
+def _import_task(name: str, origin: Tuple[str, str, str]) -> Task:
+    from ..dsl.syntax import TaskWrapper
+
+    kind, module_name, attr = origin
+    value = getattr(importlib.import_module(module_name), attr)
+    if isinstance(value, TaskWrapper):
+        value = value.task
+    if kind == "task":
+        if not isinstance(value, Task):
+            raise TypeError(f"{module_name}.{attr} is not a task")
+        return value
+    return Task(func=value.func if isinstance(value, Task) else value, name=name)
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as fp:
+            return hashlib.sha256(fp.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _source_file(task: Optional[Task]) -> Optional[str]:
+    code = getattr(getattr(task, "func", None), "__code__", None)
+    return code.co_filename if code is not None else None
+
+
+def _source_stamp(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
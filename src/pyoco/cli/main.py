@@ -5,12 +5,10 @@ import os
 import signal
 import time
 from types import SimpleNamespace
-from ..schemas.config import PyocoConfig
-from ..discovery.loader import TaskLoader
-from ..core.models import Flow
-from ..core.engine import Engine
-from ..trace.console import ConsoleTraceBackend
-from ..client import Client
+
+# Heavy dependencies (the engine, yaml, httpx via Client, ...) are imported
+# inside the commands that use them, so `--help` and light commands stay fast.
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pyoco Workflow Engine")
@@ -26,6 +24,10 @@ def main():
     # Allow overriding params via CLI
     run_parser.add_argument("--param", action="append", help="Override params (key=value)")
     run_parser.add_argument("--server", help="Server URL for remote execution")
+    run_parser.add_argument("--daemon", action="store_true", help="Run on the local pyoco daemon (see `pyoco daemon start`)")
+    run_parser.add_argument("--socket", help="Daemon socket path (default: $PYOCO_DAEMON_SOCKET or $XDG_RUNTIME_DIR/pyoco-daemon.sock)")
+    run_parser.add_argument("--no-cache", action="store_true", help="Rebuild the flow graph instead of using the flow cache")
+    run_parser.add_argument("--watch", action="store_true", help="Re-run changed tasks and their dependents when sources change")
 
     # Check command
     check_parser = subparsers.add_parser("check", help="Verify a workflow")
@@ -33,6 +35,14 @@ def main():
     check_parser.add_argument("--flow", default="main", help="Flow name to check")
     check_parser.add_argument("--dry-run", action="store_true", help="Traverse flow without executing tasks")
     check_parser.add_argument("--json", action="store_true", help="Output report as JSON")
+    check_parser.add_argument("--estimate", action="store_true", help="Estimate makespan from historical task durations")
+    check_parser.add_argument("--jobs", type=int, default=8, help="Worker count for --estimate (default: 8)")
+    check_parser.add_argument(
+        "--history",
+        action="append",
+        help="Archived run JSON file or directory for --estimate (default: $PYOCO_RUN_ARCHIVE_DIR or artifacts/runs)",
+    )
+    check_parser.add_argument("--no-cache", action="store_true", help="Rebuild the flow graph instead of using the flow cache")
 
     # List tasks command
     list_parser = subparsers.add_parser("list-tasks", help="List available tasks")
@@ -45,6 +55,17 @@ def main():
     server_start.add_argument("--host", default="0.0.0.0", help="Host to bind")
     server_start.add_argument("--port", type=int, default=8000, help="Port to bind")
 
+    # Daemon command
+    daemon_parser = subparsers.add_parser("daemon", help="Manage the local runner daemon")
+    daemon_subparsers = daemon_parser.add_subparsers(dest="daemon_command")
+    for name, help_text in (
+        ("start", "Start the daemon in the foreground"),
+        ("stop", "Stop a running daemon"),
+        ("status", "Show daemon status"),
+    ):
+        daemon_cmd = daemon_subparsers.add_parser(name, help=help_text)
+        daemon_cmd.add_argument("--socket", help="Socket path (default: $PYOCO_DAEMON_SOCKET or $XDG_RUNTIME_DIR/pyoco-daemon.sock)")
+
     # Worker command
     worker_parser = subparsers.add_parser("worker", help="Manage Worker")
     worker_subparsers = worker_parser.add_subparsers(dest="worker_command")
@@ -97,9 +118,40 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    if args.command == "daemon":
+        _daemon_command(args, daemon_parser)
+        return
+
+    if args.command == "run" and args.daemon:
+        # The daemon loads the config and tasks; this process only streams output.
+        from .daemon import default_socket_path, submit_run
+        socket_path = args.socket or default_socket_path()
+        try:
+            result = submit_run(socket_path, args.config, args.flow, _parse_params(args.param), cute=args.cute)
+        except OSError as e:
+            print(f"Error: cannot reach pyoco daemon at {socket_path}: {e}")
+            sys.exit(1)
+        if result.get("error"):
+            print(result["error"])
+        if result.get("status") != "COMPLETED":
+            sys.exit(1)
+        return
+
+    if args.command == "run" and not (args.server or args.watch or args.no_cache):
+        # A flow cache hit needs neither the parsed config nor task discovery.
+        from .flow_cache import FlowCache
+        cached = FlowCache().lookup(args.config, args.flow)
+        if cached is not None:
+            flow, params = cached
+            params.update(_parse_params(args.param))
+            _run_flow(args, flow, params)
+            return
+
     # Load config only if needed
     config = None
     if hasattr(args, 'config') and args.config:
+        from ..schemas.config import PyocoConfig
+        from ..discovery.loader import TaskLoader
         try:
             config = PyocoConfig.from_yaml(args.config)
         except Exception as e:
@@ -186,6 +238,7 @@ def main():
         return
 
     if args.command == "runs":
+        from ..client import Client
         client = Client(args.server)
         try:
             if args.runs_command == "list":
@@ -247,14 +300,11 @@ def main():
         
         # Params
         params = flow_conf.defaults.copy()
-        if args.param:
-            for p in args.param:
-                if "=" in p:
-                    k, v = p.split("=", 1)
-                    params[k] = v # Simple string parsing for now
+        params.update(_parse_params(args.param))
 
         if args.server:
             # Remote execution
+            from ..client import Client
             client = Client(args.server)
             try:
                 run_id = client.submit_run(args.flow, params)
@@ -264,42 +314,18 @@ def main():
                 print(f"Error submitting flow: {e}")
                 sys.exit(1)
             return
-        # Build Flow from graph string
-        from ..dsl.syntax import TaskWrapper, switch
-        eval_context = {name: TaskWrapper(task) for name, task in loader.tasks.items()}
-        eval_context["switch"] = switch
-        
+        if args.watch:
+            _watch_flow(args)
+            return
         try:
-            # Create Flow and add all loaded tasks
-            flow = Flow(name=args.flow)
-            for t in loader.tasks.values():
-                flow.add_task(t)
-            eval_context["flow"] = flow
-
-            # Evaluate graph to set up dependencies
-            exec(flow_conf.graph, {}, eval_context)
-            
-            # Run engine
-            backend = ConsoleTraceBackend(style="cute" if args.cute else "plain")
-            engine = Engine(trace_backend=backend)
-            
-            # Params (Moved up)
-            
-            # Signal handler for cancellation
-            def signal_handler(sig, frame):
-                print("\n🛑 Ctrl+C detected. Cancelling active runs...")
-                for rid in list(engine.active_runs.keys()):
-                    engine.cancel(rid)
-            
-            signal.signal(signal.SIGINT, signal_handler)
-            
-            engine.run(flow, params)
-            
+            # Build Flow from graph string (or the flow cache)
+            flow = _build_flow(args, config, flow_conf, loader)
         except Exception as e:
             print(f"Error executing flow: {e}")
             import traceback
             traceback.print_exc()
             sys.exit(1)
+        _run_flow(args, flow, params)
 
     elif args.command == "check":
         print(f"Checking flow '{args.flow}'...")
@@ -310,52 +336,40 @@ def main():
 
         errors = []
         warnings = []
+        stats = None
 
         # 1. Check imports (already done by loader.load(), but we can check for missing tasks in graph)
         # 2. Build flow to check graph
-        from ..dsl.syntax import TaskWrapper, switch
-        eval_context = {name: TaskWrapper(task) for name, task in loader.tasks.items()}
-        eval_context["switch"] = switch
-        
         try:
-            flow = Flow(name=args.flow)
-            for t in loader.tasks.values():
-                flow.add_task(t)
-            eval_context["flow"] = flow
-            
-            eval(flow_conf.graph, {}, eval_context)
-            
+            flow = _build_flow(args, config, flow_conf, loader)
+
+            graph = flow.compile_graph()
+
             # 3. Reachability / Orphans
-            if len(flow.tasks) > 1:
-                for t in flow.tasks:
+            if len(graph) > 1:
+                for t in graph.tasks:
                     if not t.dependencies and not t.dependents:
                         warnings.append(f"Task '{t.name}' is orphaned (no dependencies or dependents).")
 
-            # 4. Cycles
-            visited = set()
-            path = set()
-
-            def visit(node):
-                if node in path:
-                    return True
-                if node in visited:
-                    return False
-                visited.add(node)
-                path.add(node)
-                for dep in node.dependencies:
-                    if visit(dep):
-                        return True
-                path.remove(node)
-                return False
-            
-            for t in flow.tasks:
-                if visit(t):
-                    errors.append(f"Cycle detected involving task '{t.name}'.")
-                    break
+            # 4. Cycles (all of them, one strongly connected component each)
+            from ..core.graph import analyze_graph, find_cycles
+            for cycle in find_cycles(graph):
+                names = sorted(graph.tasks[i].name for i in cycle)
+                errors.append(f"Cycle detected involving tasks: {_format_task_names(names)}.")
+
+            graph_stats = analyze_graph(graph)
+            stats = {
+                "nodes": graph_stats.nodes,
+                "edges": graph_stats.edges,
+                "depth": graph_stats.depth,
+                "max_width": graph_stats.max_width,
+                "critical_path_length": graph_stats.critical_path_length,
+                "critical_path": [graph.tasks[i].name for i in graph_stats.critical_path],
+            }
 
             # 5. Signature Check
             import inspect
-            for t in flow.tasks:
+            for t in graph.tasks:
                 sig = inspect.signature(t.func)
                 for name, param in sig.parameters.items():
                     if name == 'ctx': 
@@ -366,6 +380,23 @@ def main():
         except Exception as e:
             errors.append(f"Graph evaluation failed: {e}")
 
+        estimate = None
+        if args.estimate and stats is not None and not errors:
+            from dataclasses import asdict
+            from ..core.estimate import durations_from_runs, estimate_makespan, load_run_history
+            history = args.history or [os.getenv("PYOCO_RUN_ARCHIVE_DIR", "artifacts/runs")]
+            durations = durations_from_runs(load_run_history(history), flow_name=args.flow)
+            try:
+                estimate = asdict(estimate_makespan(graph, durations, args.jobs))
+            except ValueError as exc:
+                errors.append(f"Estimate failed: {exc}")
+            else:
+                if estimate["missing"]:
+                    warnings.append(
+                        f"No duration history for {len(estimate['missing'])} task(s); "
+                        f"estimated with the median duration: {_format_task_names(estimate['missing'])}."
+                    )
+
         if args.dry_run:
             from ..dsl.validator import FlowValidator
             try:
@@ -386,12 +417,37 @@ def main():
             status = "warning"
 
         report = {"status": status, "warnings": warnings, "errors": errors}
+        if stats is not None:
+            report["stats"] = stats
+        if estimate is not None:
+            report["estimate"] = estimate
 
         if args.json:
             print(json.dumps(report, indent=2))
         else:
             print("\n--- Check Report ---")
             print(f"Status: {status}")
+            if stats is not None:
+                print(f"Graph: {stats['nodes']} tasks, {stats['edges']} edges")
+                if stats["depth"] is not None:
+                    print(
+                        f"Depth: {stats['depth']}, max width: {stats['max_width']}, "
+                        f"critical path: {stats['critical_path_length']:g} "
+                        f"({_format_task_names(stats['critical_path'], sep=' -> ')})"
+                    )
+            if estimate is not None:
+                print(
+                    f"Estimate (jobs={estimate['jobs']}): makespan {estimate['makespan_ms']:.1f} ms, "
+                    f"work {estimate['total_work_ms']:.1f} ms, "
+                    f"critical path {estimate['critical_path_ms']:.1f} ms, "
+                    f"utilization {estimate['utilization']:.0%}"
+                )
+                for usage in estimate["levels"]:
+                    print(
+                        f"  level {usage['level']}: {usage['tasks']} task(s), "
+                        f"work {usage['work_ms']:.1f} ms, span {usage['span_ms']:.1f} ms, "
+                        f"utilization {usage['utilization']:.0%}"
+                    )
             if not errors and not warnings:
                 print("✅ All checks passed!")
             else:
@@ -404,7 +460,118 @@ def main():
             sys.exit(2 if args.dry_run else 1)
         return
 
+def _parse_params(pairs):
+    params = {}
+    for p in pairs or ():
+        if "=" in p:
+            k, v = p.split("=", 1)
+            params[k] = v # Simple string parsing for now
+    return params
+
+
+def _daemon_command(args, daemon_parser):
+    from .daemon import RunnerDaemon, default_socket_path, request
+    socket_path = args.socket or default_socket_path()
+    if args.daemon_command == "start":
+        print(f"🐇 pyoco daemon listening on {socket_path}")
+        try:
+            RunnerDaemon(socket_path).serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Daemon stopping...")
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.daemon_command in ("stop", "status"):
+        try:
+            reply = request(socket_path, {"cmd": args.daemon_command})
+        except OSError:
+            print(f"No pyoco daemon is listening on {socket_path}.")
+            sys.exit(1)
+        if args.daemon_command == "stop":
+            print(f"🛑 Daemon on {socket_path} stopped.")
+        else:
+            print(f"🐇 Daemon pid={reply['pid']} on {socket_path}: {reply['runs']} run(s)")
+            for path in reply.get("configs", []):
+                print(f" - {path}")
+    else:
+        daemon_parser.print_help()
+
+
+def _watch_flow(args):
+    from ..core.engine import Engine
+    from ..trace.console import ConsoleTraceBackend
+    from .watch import FlowWatcher
+
+    engine = Engine(trace_backend=ConsoleTraceBackend(style="cute" if args.cute else "plain"))
+
+    # Ctrl+C cancels a run in progress; while idle it stops watching.
+    def signal_handler(sig, frame):
+        if not engine.active_runs:
+            raise KeyboardInterrupt
+        print("\n🛑 Ctrl+C detected. Cancelling active runs...")
+        for rid in list(engine.active_runs.keys()):
+            engine.cancel(rid)
+
+    signal.signal(signal.SIGINT, signal_handler)
+    try:
+        FlowWatcher(args.config, args.flow, _parse_params(args.param), engine=engine).watch()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def _run_flow(args, flow, params):
+    try:
+        from ..core.engine import Engine
+        from ..trace.console import ConsoleTraceBackend
+        backend = ConsoleTraceBackend(style="cute" if args.cute else "plain")
+        engine = Engine(trace_backend=backend)
+
+        # Signal handler for cancellation
+        def signal_handler(sig, frame):
+            print("\n🛑 Ctrl+C detected. Cancelling active runs...")
+            for rid in list(engine.active_runs.keys()):
+                engine.cancel(rid)
+
+        signal.signal(signal.SIGINT, signal_handler)
+
+        try:
+            engine.run(flow, params)
+        finally:
+            engine.close()
+
+    except Exception as e:
+        print(f"Error executing flow: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+def _build_flow(args, config, flow_conf, loader):
+    from .flow_cache import FlowCache, build_flow
+
+    def build():
+        graphs = {name: conf.graph for name, conf in config.flows.items()}
+        return build_flow(args.flow, flow_conf.graph, loader, lazy=config.discovery.lazy, flows=graphs)
+
+    if args.no_cache:
+        return build()
+    return FlowCache().load_or_build(args.config, args.flow, loader.tasks, build, defaults=flow_conf.defaults)
+
+
+def _format_task_names(names, sep=", ", limit=8):
+    if len(names) <= limit:
+        return sep.join(names)
+    head = sep.join(names[:limit // 2])
+    tail = sep.join(names[-(limit // 2):])
+    return f"{head}{sep}... ({len(names) - limit} more){sep}{tail}"
+
+
 def _collect_plugin_reports():
+    from ..discovery.loader import TaskLoader
+
     dummy = SimpleNamespace(
         tasks={},
         discovery=SimpleNamespace(entry_points=[], packages=[], glob_modules=[]),
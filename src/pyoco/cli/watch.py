@@ -0,0 +1,179 @@
+import hashlib
+import os
+import time
+import types
+from typing import Any, Dict, List, Optional, Set
+
+from .daemon import _reload_modules, _stamp
+
+
+class FlowWatcher:
+    """
+    Re-runs a config flow in this process whenever its sources change.
+
+    Watched files are the config and the source files of the loaded tasks.
+    Results of tasks that succeeded are kept in memory between runs. When
+    task modules change they are reloaded, and only the tasks whose code
+    changed (or that did not succeed last time) run again together with
+    everything downstream of them; the other tasks reuse their previous
+    result. A changed config, or a flow with control flow, runs in full.
+    """
+
+    def __init__(self, config_path: str, flow_name: str, params: Optional[Dict[str, Any]] = None,
+                 engine: Any = None):
+        self.config_path = config_path
+        self.flow_name = flow_name
+        self.overrides = dict(params or {})
+        self.engine = engine
+        self.results: Dict[str, Any] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.stamps: Dict[str, Any] = {}
+        self.config = None
+        self.loader = None
+        self.flow = None
+        self._load_config()
+
+    def _load_config(self):
+        from ..discovery.loader import TaskLoader
+        from ..schemas.config import PyocoConfig
+
+        self.config = PyocoConfig.from_yaml(self.config_path)
+        if self.flow_name not in self.config.flows:
+            raise ValueError(f"Flow '{self.flow_name}' not found in config.")
+        self.loader = TaskLoader(self.config)
+        self.loader.load()
+        self._build()
+
+    def _reload_tasks(self, changed: List[str]):
+        from ..discovery.loader import TaskLoader
+
+        _reload_modules(changed)
+        self.loader = TaskLoader(self.config)
+        self.loader.load()
+        self._build()
+
+    def _build(self):
+        from .flow_cache import build_flow
+
+        flow_conf = self.config.flows[self.flow_name]
+        graphs = {name: conf.graph for name, conf in self.config.flows.items()}
+        self.flow = build_flow(self.flow_name, flow_conf.graph, self.loader, lazy=self.config.discovery.lazy,
+                               flows=graphs)
+        self.stamps = {self.config_path: _stamp(self.config_path)}
+        for task in self.loader.tasks.values():
+            source = getattr(getattr(task.func, "__code__", None), "co_filename", None)
+            if source and os.path.exists(source):
+                self.stamps[source] = _stamp(source)
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        params = dict(self.config.flows[self.flow_name].defaults)
+        params.update(self.overrides)
+        return params
+
+    def changed_files(self) -> List[str]:
+        return [path for path, stamp in self.stamps.items() if _stamp(path) != stamp]
+
+    def run(self, changed: Optional[List[str]] = None):
+        """
+        Run the flow, first reloading whatever ``changed`` lists. Returns the
+        run's RunContext; failures are reported but do not raise.
+        """
+        from ..core.models import RunContext, TaskState
+
+        full = not self.results
+        if changed:
+            if self.config_path in changed:
+                self._load_config()
+                full = True
+            else:
+                self._reload_tasks(changed)
+        tasks = {task.name: task for task in self.flow.tasks}
+        fingerprints = {name: _fingerprint(task.func) for name, task in tasks.items()}
+        reuse: Dict[str, Any] = {}
+        if not full and not self.flow.has_control_flow():
+            dirty = {
+                name for name, task in tasks.items()
+                if name not in self.results or self.fingerprints.get(name) != fingerprints[name]
+                # A stream's consumers read it while it runs; never reuse one.
+                or task.stream
+            }
+            affected = _downstream(tasks, dirty)
+            reuse = {name: self.results[name] for name in tasks if name not in affected}
+            print(f"🔁 Re-running {len(tasks) - len(reuse)} task(s), reusing {len(reuse)}: "
+                  f"{', '.join(sorted(affected)) or '-'}")
+        self.fingerprints = fingerprints
+
+        run_ctx = RunContext()
+        try:
+            self.engine.run(self.flow, self.params, run_context=run_ctx, reuse=reuse)
+        except Exception as e:
+            print(f"Error executing flow: {e}")
+        self.results = {
+            name: record.output
+            for name, record in run_ctx.task_records.items()
+            if name in tasks and record.state == TaskState.SUCCEEDED
+        }
+        return run_ctx
+
+    def watch(self, interval: float = 0.5):
+        """Run once, then re-run on every change until interrupted."""
+        self.run()
+        print(f"👀 Watching {len(self.stamps)} file(s) for changes. Press Ctrl+C to stop.")
+        while True:
+            time.sleep(interval)
+            changed = self.changed_files()
+            if not changed:
+                continue
+            print(f"\n📝 Changed: {', '.join(os.path.relpath(path) for path in changed)}")
+            try:
+                self.run(changed)
+            except Exception as e:
+                # e.g. a syntax error in the edited module; wait for the next save.
+                print(f"Error reloading: {e}")
+                self.stamps.update((path, _stamp(path)) for path in changed)
+
+
+def _downstream(tasks: Dict[str, Any], names: Set[str]) -> Set[str]:
+    affected = set(names)
+    stack = list(names)
+    while stack:
+        for dependent in tasks[stack.pop()].dependents:
+            if dependent.name in tasks and dependent.name not in affected:
+                affected.add(dependent.name)
+                stack.append(dependent.name)
+    return affected
+
+
+def _fingerprint(func: Any) -> str:
+    """
+    Hash of a task function's code, ignoring line numbers, including the
+    functions of its own module that it calls (directly or indirectly).
+    """
+    digest = hashlib.sha256()
+    seen: Set[Any] = set()
+
+    def visit_code(code: types.CodeType, namespace: Dict[str, Any], module: str):
+        digest.update(code.co_code)
+        digest.update(repr((code.co_names, code.co_varnames, code.co_freevars)).encode("utf-8"))
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                visit_code(const, namespace, module)
+            else:
+                digest.update(repr(const).encode("utf-8"))
+        for name in code.co_names:
+            value = namespace.get(name)
+            if isinstance(value, types.FunctionType) and value.__module__ == module:
+                visit_function(value)
+
+    def visit_function(fn: types.FunctionType):
+        if fn.__code__ in seen:
+            return
+        seen.add(fn.__code__)
+        visit_code(fn.__code__, fn.__globals__, fn.__module__)
+
+    if isinstance(func, types.FunctionType):
+        visit_function(func)
+    else:
+        digest.update(repr(func).encode("utf-8"))
+    return digest.hexdigest()
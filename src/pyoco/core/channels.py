@@ -0,0 +1,124 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Iterator, Optional
+
+
+DEFAULT_STREAM_CAPACITY = 64
+
+
+class Channel:
+    """
+    Bounded queue connecting a producing task to its consumers.
+
+    The producer blocks in ``put`` once ``capacity`` items are buffered
+    (backpressure). Consumers iterate the channel and receive items as soon as
+    they are produced; iteration ends when the producer closes the channel and
+    re-raises the producer's exception if it failed. Items are delivered
+    once, so a channel has a single reader: iterating it a second time (for
+    example from a retried consumer) raises ``RuntimeError`` instead of
+    silently resuming where the first reader stopped.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_STREAM_CAPACITY, name: Optional[str] = None):
+        if capacity < 1:
+            raise ValueError("Channel capacity must be at least 1.")
+        self.capacity = capacity
+        self.name = name
+        self.produced = 0
+        self._buffer: Deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._closed = False
+        self._read = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def put(self, item: Any) -> bool:
+        """Block until ``item`` is buffered. Returns False if the channel was cancelled."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot put into a closed channel.")
+            while len(self._buffer) >= self.capacity and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled:
+                return False
+            self._buffer.append(item)
+            self.produced += 1
+            self._cond.notify_all()
+            return True
+
+    def close(self):
+        self._finish(None)
+
+    def fail(self, error: BaseException):
+        self._finish(error)
+
+    def cancel(self):
+        """Unblock the producer; used when consumers are done or the run is cancelled."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def _finish(self, error: Optional[BaseException]):
+        with self._cond:
+            if self._closed:
+                return
+            self._error = error
+            self._closed = True
+            self._cond.notify_all()
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._cond:
+            if self._read:
+                label = f" '{self.name}'" if self.name else ""
+                raise RuntimeError(f"Channel{label} was already read; streamed items cannot be replayed.")
+            self._read = True
+        return self._drain()
+
+    def _drain(self) -> Iterator[Any]:
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                item = self._buffer.popleft()
+                self._cond.notify_all()
+            yield item
+
+    def __repr__(self):
+        state = "closed" if self._closed else "open"
+        label = f" {self.name}" if self.name else ""
+        return f"<Channel{label} {state} produced={self.produced}>"
+
+
+def pump(iterator, channel: Channel) -> int:
+    """
+    Move every item of ``iterator`` into ``channel`` and close it, failing the
+    channel if the iterator raises. Returns the number of items delivered.
+    """
+    count = 0
+    try:
+        for item in iterator:
+            if not channel.put(item):
+                break
+            count += 1
+    except BaseException as exc:
+        channel.fail(exc)
+        raise
+    finally:
+        if channel.cancelled:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+    channel.close()
+    return count
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Callable, Optional
+
+_BASELINE_DRIFT = 0.05
+
+
+class ConcurrencyController:
+    """
+    AIMD controller for the number of tasks an engine runs at once.
+
+    Finished calls are reported with ``observe`` and grouped into windows of
+    ``max(limit, window)`` calls. At the end of a window the limit grows by
+    one if work was waiting for a slot, latency stayed within
+    ``latency_tolerance`` times the best recent window average, and throughput
+    did not drop after the previous increase. It shrinks by ``backoff`` when
+    latency rises past that bound, and at once (at most once per window) on
+    ``congestion``, which the engine reports for task timeouts and retries.
+    The limit stays within ``min_limit`` and ``max_limit``; ``on_change`` is
+    called with every new value.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, initial: Optional[int] = None,
+                 on_change: Optional[Callable[[int], None]] = None, window: int = 8,
+                 latency_tolerance: float = 2.0, backoff: float = 0.7,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Concurrency bounds must satisfy 1 <= min_limit <= max_limit.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = self._clamp(initial if initial is not None else min(max_limit, 8))
+        self.on_change = on_change
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._baseline_ms: Optional[float] = None
+        self._throughput: Optional[float] = None  # calls/s of the window before the last increase
+        self._grew = False
+        self._reset()
+
+    def observe(self, latency_ms: float, saturated: bool = False):
+        """Record one finished call; ``saturated`` if work was waiting for a slot."""
+        with self._lock:
+            self._calls += 1
+            self._total_ms += latency_ms
+            self._saturated = self._saturated or saturated
+            if self._calls < max(self.limit, self.window):
+                return
+            elapsed = self._clock() - self._started
+            average_ms = self._total_ms / self._calls
+            throughput = self._calls / elapsed if elapsed > 0 else None
+            if self._baseline_ms is None or average_ms < self._baseline_ms:
+                self._baseline_ms = average_ms
+            else:
+                # Drift up slowly so a lasting change in the workload becomes the new normal.
+                self._baseline_ms += (average_ms - self._baseline_ms) * _BASELINE_DRIFT
+            if average_ms > self._baseline_ms * self.latency_tolerance:
+                limit = int(self.limit * self.backoff)
+            elif (self._grew and throughput is not None and self._throughput is not None
+                  and throughput < self._throughput):
+                limit = self.limit - 1  # The extra slot did not pay off.
+            elif self._saturated:
+                limit = self.limit + 1
+            else:
+                limit = self.limit
+            self._reset()
+            self._grew = self._clamp(limit) > self.limit
+            if self._grew:
+                self._throughput = throughput
+            changed = self._set(limit)
+        self._notify(changed)
+
+    def congestion(self):
+        """Record a timeout or retry: back off unless this window already did."""
+        with self._lock:
+            if self._backed_off:
+                return
+            limit = int(self.limit * self.backoff)
+            self._reset()
+            self._backed_off = True
+            self._grew = False
+            changed = self._set(limit)
+        self._notify(changed)
+
+    def _reset(self):
+        self._calls = 0
+        self._total_ms = 0.0
+        self._saturated = False
+        self._backed_off = False
+        self._started = self._clock()
+
+    def _clamp(self, limit: int) -> int:
+        return max(self.min_limit, min(self.max_limit, limit))
+
+    def _set(self, limit: int) -> Optional[int]:
+        # Returns the new limit, or None if it did not change.
+        limit = self._clamp(limit)
+        if limit == self.limit:
+            return None
+        self.limit = limit
+        return limit
+
+    def _notify(self, limit: Optional[int]):
+        if limit is not None and self.on_change is not None:
+            self.on_change(limit)
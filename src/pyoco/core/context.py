@@ -1,6 +1,6 @@
 import threading
 from typing import Any, Dict, List, Optional, Sequence
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from .models import RunContext
 
 
@@ -41,6 +41,11 @@ class LoopStack:
     def snapshot(self) -> Sequence[LoopFrame]:
         return tuple(self._frames)
 
+    def fork(self) -> "LoopStack":
+        forked = LoopStack()
+        forked._frames = list(self._frames)
+        return forked
+
 @dataclass
 class Context:
     """
@@ -63,8 +68,7 @@ class Context:
     @property
     def is_cancelled(self) -> bool:
         if self.run_context:
-            from .models import RunStatus
-            return self.run_context.status in [RunStatus.CANCELLING, RunStatus.CANCELLED]
+            return self.run_context.cancel_requested
         return False
 
     @property
@@ -81,6 +85,15 @@ class Context:
     def pop_loop(self) -> LoopFrame:
         return self._loop_stack.pop()
 
+    def fork(self) -> "Context":
+        """
+        Return a view for a concurrent branch: params, results and the run
+        context are shared (along with the lock guarding them), but the branch
+        gets its own loop stack and a copy of the variables, so loop aliases
+        and variables it binds stay local to the branch.
+        """
+        return replace(self, _vars=dict(self._vars), _loop_stack=self._loop_stack.fork())
+
     def set_var(self, name: str, value: Any):
         self._vars[name] = value
 
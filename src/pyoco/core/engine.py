@@ -2,31 +2,494 @@ import time
 import io
 import sys
 import traceback
-from typing import Dict, Any, List, Set, Optional
+import weakref
+from array import array
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+import concurrent.futures
 import contextlib
+import heapq
+import inspect
+import itertools
+import threading
+from collections.abc import Iterable, Mapping, Sized
 from .models import Flow, Task, RunContext, TaskState, RunStatus
 from .context import Context, LoopFrame
+from .channels import Channel, pump
 from .exceptions import UntilMaxIterationsExceeded
+from .sweep import SweepShare, _freeze
+from .concurrency import ConcurrencyController
 from ..trace.backend import TraceBackend
 from ..trace.console import ConsoleTraceBackend
-from ..dsl.nodes import TaskNode, RepeatNode, ForEachNode, UntilNode, SwitchNode, DEFAULT_CASE_VALUE
+from ..dsl.nodes import TaskNode, RepeatNode, ForEachNode, UntilNode, SwitchNode, ParallelNode, DEFAULT_CASE_VALUE
 from ..dsl.expressions import Expression
 
-class TeeStream:
-    def __init__(self, original):
-        self.original = original
-        self.buffer = io.StringIO()
+class _TaskOutput:
+    """
+    Process-wide stand-in for ``sys.stdout``/``sys.stderr`` while tasks run.
+
+    Writes are passed through to the stream it replaced and also copied into
+    the buffer of the task running on the writing thread. Installing one
+    object for all tasks (instead of swapping a tee per task) keeps concurrent
+    tasks from restoring each other's streams.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.original = None
+        self._local = threading.local()
+        self._users = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def capture(self):
+        buffer = io.StringIO()
+        with self._lock:
+            if self._users == 0:
+                self.original = getattr(sys, self.name)
+                setattr(sys, self.name, self)
+            self._users += 1
+        previous = getattr(self._local, "buffer", None)
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = previous
+            with self._lock:
+                self._users -= 1
+                if self._users == 0:
+                    if getattr(sys, self.name) is self:
+                        setattr(sys, self.name, self.original)
+                    self.original = None
+
+    def _target(self):
+        original = self.original
+        return original if original is not None else getattr(sys, f"__{self.name}__")
 
     def write(self, data):
-        self.original.write(data)
-        self.buffer.write(data)
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer.write(data)
+        self._target().write(data)
         return len(data)
 
     def flush(self):
-        self.original.flush()
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+_task_stdout = _TaskOutput("stdout")
+_task_stderr = _TaskOutput("stderr")
+
+class _SingleFlight:
+    """In-flight calls of coalescing tasks, shared by every engine in the process."""
+
+    def __init__(self):
+        self._calls: Dict[Any, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def call(self, task: Task, kwargs: Dict[str, Any]) -> Any:
+        try:
+            key = (task.name, task.func, _freeze({k: v for k, v in kwargs.items() if k != "ctx"}))
+            hash(key)
+        except TypeError:
+            return task.func(**kwargs)
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+        if not leader:
+            return future.result()
+        try:
+            result = task.func(**kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+_single_flight = _SingleFlight()
+
+# Set on threads of a _SharedExecutor.
+_worker_local = threading.local()
+
+class _Lane:
+    """One run's queue on a _SharedExecutor; has the executor ``submit`` interface."""
+
+    def __init__(self, executor: "_SharedExecutor"):
+        self.executor = executor
+        self.queue: deque = deque()
+        self.scheduled = False
+        self.futures: List[concurrent.futures.Future] = []
+
+    def submit(self, fn, *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        self.futures.append(future)
+        self.executor._enqueue(self, (future, fn, args))
+        return future
+
+    def join(self):
+        # Like leaving a ThreadPoolExecutor block: wait for stragglers (e.g. timed-out tasks).
+        concurrent.futures.wait(self.futures)
+
+class _SharedExecutor:
+    """
+    Worker threads shared by the runs of an Engine.
+
+    Each run submits through its own ``lane()``. Idle workers take the next
+    call from the lanes with queued work in round-robin order, so a run with
+    many ready tasks does not starve runs started after it. Threads are
+    started on demand up to ``max_workers`` and kept until ``shutdown``.
+    With a ``controller``, at most its current ``limit`` calls run at once
+    and every finished call is reported to it.
+    """
+
+    def __init__(self, max_workers: int, controller: Optional[ConcurrencyController] = None):
+        self.max_workers = max_workers
+        self.controller = controller
+        self._cond = threading.Condition()
+        self._lanes: deque = deque()  # lanes with queued calls, in service order
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+        self._queued = 0
+        self._active = 0
+        self._shutdown = False
+
+    @property
+    def limit(self) -> int:
+        if self.controller is None:
+            return self.max_workers
+        return min(self.max_workers, self.controller.limit)
+
+    def lane(self) -> _Lane:
+        return _Lane(self)
+
+    def _enqueue(self, lane: _Lane, item):
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Engine is closed.")
+            lane.queue.append(item)
+            self._queued += 1
+            if not lane.scheduled:
+                lane.scheduled = True
+                self._lanes.append(lane)
+            if self._idle:
+                self._cond.notify()
+            self._spawn()
+
+    def resize(self):
+        """Apply a changed ``limit``."""
+        with self._cond:
+            self._cond.notify_all()
+            self._spawn()
+
+    def _spawn(self):
+        # Woken workers may not have taken their call yet; count calls, not wake-ups.
+        if self._queued > self._idle and len(self._threads) < self.limit:
+            thread = threading.Thread(
+                target=self._work, name=f"pyoco-worker-{len(self._threads)}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self):
+        _worker_local.shared = True
+        while True:
+            with self._cond:
+                while (not self._lanes or self._active >= self.limit) and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                if not self._lanes:
+                    return
+                lane = self._lanes.popleft()
+                future, fn, args = lane.queue.popleft()
+                self._queued -= 1
+                self._active += 1
+                if lane.queue:
+                    self._lanes.append(lane)
+                else:
+                    lane.scheduled = False
+            if future.set_running_or_notify_cancel():
+                start = time.monotonic()
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                    del result
+                latency_ms = (time.monotonic() - start) * 1000
+            else:
+                latency_ms = None
+            # An idle worker must not keep its last call (often a bound method
+            # of the Engine) alive, or a dropped engine is never collected.
+            del future, fn, args, lane
+            with self._cond:
+                self._active -= 1
+                saturated = self._queued > 0
+            if self.controller is not None and latency_ms is not None:
+                self.controller.observe(latency_ms, saturated)
+
+    def shutdown(self, wait: bool = True):
+        # Queued calls still run; new ones are refused.
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+def _prefetch(iterator, window: int):
+    """
+    Pull items from ``iterator`` on a background thread into a channel of
+    ``window`` items so the source is produced while the loop body runs.
+    Exceptions raised by the source are re-raised in the consuming thread.
+    """
+    channel = Channel(capacity=window)
+
+    def produce():
+        try:
+            pump(iterator, channel)
+        except BaseException:
+            pass  # Delivered to the consumer through the channel.
+
+    thread = threading.Thread(target=produce, name="pyoco-foreach-prefetch", daemon=True)
+    thread.start()
+    try:
+        yield from channel
+    finally:
+        channel.cancel()
+
+
+def _iter_chunks(source, size: int):
+    """
+    Yield consecutive batches of at most ``size`` items. Sized sources that
+    support slicing (lists, tuples, arrays) are sliced directly so the batch
+    keeps the source type; other iterables (including deques, which index
+    but do not slice) are drained into lists.
+    """
+    if isinstance(source, Sized) and hasattr(source, "__getitem__") and not isinstance(source, Mapping):
+        try:
+            first = source[0:size]
+        except TypeError:
+            pass
+        else:
+            if len(source):
+                yield first
+            for start in range(size, len(source), size):
+                yield source[start:start + size]
+            return
+    iterator = iter(source)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+_CANCEL_POLL_INTERVAL = 0.1
+# Default worker threads per engine (and per nested-graph pool). Raised from
+# 8 to 32 when workers became shared by all runs of an engine.
+DEFAULT_MAX_WORKERS = 32
+_MAX_PARALLEL_BRANCH_WORKERS = 8
+# Runs of a task observed before auto_inline_ms may inline it.
+_AUTO_INLINE_MIN_CALLS = 3
+
+# DAG scheduler node states (ordered: >= _NODE_SUCCEEDED means finished)
+_NODE_PENDING = 0
+_NODE_QUEUED = 1
+_NODE_RUNNING = 2
+_NODE_SUCCEEDED = 3
+_NODE_FAILED = 4
+
+
+class _Park:
+    """Request yielded by the control-flow interpreter to wait until ``deadline``."""
+
+    __slots__ = ("deadline",)
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+
+
+class _Program:
+    """A control-flow sub-flow the scheduler steps from one ``_Park`` to the next."""
+
+    __slots__ = ("steps", "ctx", "timeout_at")
+
+    def __init__(self, steps, ctx: Context, timeout_at: Optional[float] = None):
+        self.steps = steps
+        self.ctx = ctx
+        self.timeout_at = timeout_at
+
+
+class _Gather:
+    """Outputs of a mapped task's instances, filled in as they finish."""
+
+    __slots__ = ("outputs", "remaining")
+
+    def __init__(self, count: int):
+        self.outputs: List[Any] = [None] * count
+        self.remaining = count
+
+
+def _mapped_arg(task: Task) -> str:
+    if task.map_arg:
+        return task.map_arg
+    for name in inspect.signature(task.func).parameters:
+        if name != "ctx" and name not in task.inputs:
+            return name
+    raise TypeError(f"Task '{task.name}' has no parameter to receive mapped items.")
+
+
+class _DagRun:
+    """
+    Scheduling state of one compiled graph within a DAG run.
+
+    A run starts with a single ``_DagRun`` for its flow; each sub-flow task
+    that starts adds a nested one (``parent``/``parent_node`` point back at
+    the task). All of them feed the same ready queue and executor.
+    """
+
+    def __init__(self, graph, ctx: Context, ready: deque, parent: Optional["_DagRun"] = None, parent_node: int = -1):
+        self.graph = graph
+        self.tasks = graph.tasks
+        self.ctx = ctx
+        self.ready = ready
+        self.parent = parent
+        self.parent_node = parent_node
+        # Nested graphs of sub-flow tasks with a timeout: when the task times out.
+        self.deadline: Optional[float] = None
+        self.total = len(graph)
+        self.finished = 0
+        self.closed = False
+        self.state = bytearray(self.total)  # _NODE_* per node
+        # Unmet dependencies per AND-join node; failed dependencies per OR-join node.
+        self.waiting = array("i", graph.in_degree)
+        self.failed_deps = array("i", bytes(4 * self.total))
+        # Streaming producers release their dependents when they start.
+        self.released_early = bytearray(self.total)
+        # Channels of streaming producers that are still running;
+        # their dependents may start consuming before they finish.
+        self.streams: Dict[int, Channel] = {}
+        self.gathers: Dict[int, _Gather] = {}
+
+    @property
+    def done(self) -> bool:
+        return self.finished >= self.total
+
+    def start(self, reused=()):
+        # Tasks named in ``reused`` count as succeeded without running.
+        if reused:
+            lookup = {task.name: node for node, task in enumerate(self.tasks)}
+            reused = [lookup[name] for name in reused if name in lookup]
+        for node in reused:
+            self.state[node] = _NODE_SUCCEEDED
+            self.finished += 1
+        for node in reused:
+            self.release_dependents(node)
+        for node in range(self.total):
+            if self.graph.in_degree[node] == 0 and self.state[node] == _NODE_PENDING:
+                self.enqueue(node)
+
+    def enqueue(self, node: int):
+        self.state[node] = _NODE_QUEUED
+        self.ready.append((self, node))
+
+    def release_dependents(self, node: int):
+        graph = self.graph
+        for nxt in graph.successors(node):
+            if self.state[nxt] != _NODE_PENDING:
+                continue
+            if graph.any_join[nxt]:
+                # OR-join: the first successful dependency is enough.
+                self.enqueue(nxt)
+            else:
+                self.waiting[nxt] -= 1
+                if self.waiting[nxt] == 0:
+                    self.enqueue(nxt)
+
+    def succeed(self, node: int):
+        self.state[node] = _NODE_SUCCEEDED
+        self.finished += 1
+        if not self.released_early[node]:
+            self.release_dependents(node)
+
+    def mark_failed(self, node: int):
+        # Fail `node` and propagate to dependents that cannot run any more.
+        graph, state, run_ctx = self.graph, self.state, self.ctx.run_context
+        state[node] = _NODE_FAILED
+        run_ctx.tasks[self.tasks[node].name] = TaskState.FAILED
+        self.finished += 1
+        stack = [node]
+        while stack:
+            cur = stack.pop()
+            for nxt in graph.successors(cur):
+                if state[nxt] != _NODE_PENDING:
+                    continue
+                if graph.any_join[nxt]:
+                    self.failed_deps[nxt] += 1
+                    if self.failed_deps[nxt] < graph.in_degree[nxt]:
+                        continue
+                elif not (graph.isolate[nxt] or graph.isolate[cur]):
+                    # fail=stop dependencies abort the run instead
+                    continue
+                state[nxt] = _NODE_FAILED
+                run_ctx.tasks[self.tasks[nxt].name] = TaskState.FAILED
+                self.finished += 1
+                stack.append(nxt)
+
+    def release_drained_streams(self):
+        # Release producers whose consumers have all finished
+        for node, channel in list(self.streams.items()):
+            if all(self.state[nxt] >= _NODE_SUCCEEDED for nxt in self.graph.successors(node)):
+                self.streams.pop(node).cancel()
+
+    def cancel_streams(self):
+        for channel in self.streams.values():
+            channel.cancel()
+
+
+class RunHandle:
+    """
+    A run submitted with ``Engine.submit``. ``result()`` waits for the run
+    and returns its Context (re-raising the error of a failed run).
+    """
+
+    def __init__(self, run_context: RunContext, future: concurrent.futures.Future):
+        self.run_context = run_context
+        self.future = future
+
+    @property
+    def run_id(self) -> str:
+        return self.run_context.run_id
+
+    @property
+    def status(self) -> RunStatus:
+        return self.run_context.status
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Context:
+        return self.future.result(timeout)
+
+    def cancel(self):
+        """Cancel the run, whether it is still queued or already running."""
+        if self.future.cancel():
+            self.run_context.status = RunStatus.CANCELLED
+            self.run_context.end_time = time.time()
+        elif self.run_context.status in (RunStatus.PENDING, RunStatus.RUNNING):
+            self.run_context.status = RunStatus.CANCELLING
 
-    def getvalue(self):
-        return self.buffer.getvalue()
 
 class Engine:
     """
@@ -39,12 +502,78 @@ class Engine:
     - Delegating logging to the TraceBackend
     
     Intentionally keeps scheduling logic simple (no distributed queue, no external DB).
+
+    ``run`` blocks for one run; ``submit`` and ``map`` run many at once,
+    up to ``max_concurrent_runs``, on a thread pool shared by the engine.
+    Each run keeps its own RunContext and Context.
+
+    Tasks of all runs execute on one set of up to ``max_workers`` threads
+    that live as long as the engine, with ready tasks taken from the runs in
+    turn. ``close()`` (or leaving a ``with Engine() as engine:`` block)
+    stops them; a closed engine refuses new runs. Tasks marked ``inline``
+    (and, with ``auto_inline_ms``, tasks observed to be that fast) run on
+    the scheduler thread instead.
+
+    With ``adaptive=True`` the number of tasks running at once is tuned
+    between ``min_workers`` and ``max_workers`` by a ConcurrencyController
+    fed with task latencies, timeouts and retries; every new limit is
+    reported to the trace backend's ``on_concurrency_change``.
     """
-    def __init__(self, trace_backend: TraceBackend = None):
+    def __init__(self, trace_backend: TraceBackend = None, max_concurrent_runs: int = 8,
+                 max_workers: int = DEFAULT_MAX_WORKERS, auto_inline_ms: Optional[float] = None,
+                 adaptive: bool = False, min_workers: int = 1):
         self.trace = trace_backend or ConsoleTraceBackend()
         # Track active runs: run_id -> RunContext
         from .models import RunContext
         self.active_runs: Dict[str, RunContext] = {}
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_workers = max_workers
+        # Tasks averaging under this many ms (after a few runs) are run inline.
+        self.auto_inline_ms = auto_inline_ms
+        self._task_ms: Dict[Any, Tuple[int, float]] = {}  # func -> (calls, average ms)
+        self._concurrency: Optional[ConcurrencyController] = None
+        if adaptive:
+            self._concurrency = ConcurrencyController(
+                min_workers, max_workers, on_change=self._concurrency_changed
+            )
+        self._executor = _SharedExecutor(max_workers, self._concurrency)
+        # Idle workers of an engine that is dropped without close() go with it.
+        self._finalizer = weakref.finalize(self, self._executor.shutdown, False)
+        self._closed = False
+        self._run_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._run_pool_lock = threading.Lock()
+        # run_id -> SweepShare of runs started by map(share_results=True)
+        self._shares: Dict[str, SweepShare] = {}
+
+    def close(self):
+        """Wait for submitted runs, then stop the engine's worker threads."""
+        with self._run_pool_lock:
+            self._closed = True
+            run_pool, self._run_pool = self._run_pool, None
+        if run_pool is not None:
+            run_pool.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        self._finalizer.detach()
+
+    @property
+    def concurrency_limit(self) -> int:
+        """How many tasks of this engine's runs may execute at once right now."""
+        return self._executor.limit
+
+    def _concurrency_changed(self, limit: int):
+        self._executor.resize()
+        self.trace.on_concurrency_change(limit)
+
+    def _congestion(self):
+        # A task timed out or is being retried.
+        if self._concurrency is not None:
+            self._concurrency.congestion()
+
+    def __enter__(self) -> "Engine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def get_run(self, run_id: str) -> Any:
         # Return RunContext if active, else None (for now)
@@ -61,7 +590,83 @@ class Engine:
                 run_ctx.status = RunStatus.CANCELLING
                 # We don't force kill threads here, the loop will handle it.
 
-    def run(self, flow: Flow, params: Dict[str, Any] = None, run_context: Optional[RunContext] = None) -> Context:
+    def submit(
+        self,
+        flow: Flow,
+        params: Dict[str, Any] = None,
+        run_context: Optional[RunContext] = None,
+    ) -> RunHandle:
+        """Start ``flow`` in the background and return a handle to the run."""
+        run_ctx = run_context or RunContext()
+        with self._run_pool_lock:
+            if self._closed:
+                raise RuntimeError("Engine is closed.")
+            if self._run_pool is None:
+                self._run_pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_runs, thread_name_prefix="pyoco-run"
+                )
+            future = self._run_pool.submit(self.run, flow, params, run_ctx)
+        return RunHandle(run_ctx, future)
+
+    def map(
+        self,
+        flow: Flow,
+        params_list: Iterable[Dict[str, Any]],
+        max_concurrent_runs: Optional[int] = None,
+        share_results: bool = False,
+    ) -> List[RunHandle]:
+        """
+        Run ``flow`` once per params dict, at most ``max_concurrent_runs`` at a
+        time, and wait for all of them. Returns the finished handles in input
+        order; a failed run does not stop the others.
+
+        With ``share_results`` a task whose inputs come out the same in several
+        runs (see ``SweepShare``) is executed once and its result (or error) is
+        used by all of them.
+        """
+        limit = threading.BoundedSemaphore(max_concurrent_runs or self.max_concurrent_runs)
+        share = SweepShare(flow) if share_results else None
+        handles = []
+        for params in params_list:
+            limit.acquire()
+            run_ctx = RunContext()
+            if share is not None:
+                self._shares[run_ctx.run_id] = share
+
+            def finished(_, run_id=run_ctx.run_id):
+                self._shares.pop(run_id, None)
+                limit.release()
+
+            try:
+                handle = self.submit(flow, params, run_context=run_ctx)
+            except BaseException:
+                finished(None)  # The run never started; free its slot and share.
+                raise
+            handle.future.add_done_callback(finished)
+            handles.append(handle)
+        concurrent.futures.wait([handle.future for handle in handles])
+        return handles
+
+    def run(
+        self,
+        flow: Flow,
+        params: Dict[str, Any] = None,
+        run_context: Optional[RunContext] = None,
+        reuse: Optional[Dict[str, Any]] = None,
+    ) -> Context:
+        """
+        Run ``flow`` to completion and return its Context.
+
+        ``reuse`` maps task names to results from an earlier run; those tasks
+        are marked SUCCEEDED with the given result and not executed, while
+        their dependents run as usual. Only DAG flows support it.
+        """
+        reused = {}
+        if reuse:
+            reused = {task.name: task for task in flow.tasks if task.name in reuse}
+        if reused and flow.has_control_flow():
+            raise ValueError("Reusing task results is not supported for flows with control flow.")
+
         # Initialize RunContext (v0.2.0)
         if run_context is None:
             run_context = RunContext()
@@ -76,6 +681,14 @@ class Engine:
             run_ctx.ensure_task_record(task.name)
             
         ctx = Context(params=params or {}, run_context=run_ctx)
+        for name, task in reused.items():
+            value = reuse[name]
+            ctx.set_result(name, value)
+            self._save_outputs(task, ctx, value)
+            run_ctx.tasks[name] = TaskState.SUCCEEDED
+            record = run_ctx.ensure_task_record(name)
+            record.state = TaskState.SUCCEEDED
+            record.output = value
         self.trace.on_flow_start(flow.name, run_id=run_ctx.run_id)
         
         # Register active run
@@ -85,202 +698,24 @@ class Engine:
             try:
                 program = flow.build_program()
                 self._execute_subflow(program, ctx)
-                run_ctx.status = RunStatus.COMPLETED
+                if run_ctx.status in [RunStatus.CANCELLING, RunStatus.CANCELLED]:
+                    for t_name, t_state in run_ctx.tasks.items():
+                        if t_state == TaskState.PENDING:
+                            run_ctx.tasks[t_name] = TaskState.CANCELLED
+                    run_ctx.status = RunStatus.CANCELLED
+                else:
+                    run_ctx.status = RunStatus.COMPLETED
             except Exception:
                 run_ctx.status = RunStatus.FAILED
-                run_ctx.end_time = time.time()
+                run_ctx.end_time = self._now()
                 raise
-            run_ctx.end_time = time.time()
+            finally:
+                self.active_runs.pop(run_ctx.run_id, None)
+            run_ctx.end_time = self._now()
             return ctx
         
         try:
-            executed: Set[Task] = set()
-            running: Set[Any] = set() # Set of Futures
-            
-            import concurrent.futures
-        
-            # Use ThreadPoolExecutor for parallel execution
-            # Max workers could be configurable, default to something reasonable
-            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-                future_to_task = {}
-                task_deadlines: Dict[Task, float] = {}
-                
-                failed: Set[Task] = set()
-
-                while len(executed) + len(failed) < len(flow.tasks):
-                    # Check for cancellation
-                    if run_ctx.status in [RunStatus.CANCELLING, RunStatus.CANCELLED]:
-                        # Stop submitting new tasks
-                        # Mark all PENDING tasks as CANCELLED
-                        for t_name, t_state in run_ctx.tasks.items():
-                            if t_state == TaskState.PENDING:
-                                run_ctx.tasks[t_name] = TaskState.CANCELLED
-                        
-                        # If no running tasks, we are done
-                        if not running:
-                            run_ctx.status = RunStatus.CANCELLED
-                            break
-                        # Else continue loop to wait for running tasks (graceful shutdown)
-                        # We still need to wait, so we fall through to the wait logic,
-                        # but 'runnable' will be empty because we won't add anything.
-                    
-                    # Identify runnable tasks
-                    runnable = []
-                    if run_ctx.status == RunStatus.RUNNING:
-                        for task in flow.tasks:
-                            if task in executed or task in failed or task in [future_to_task[f] for f in running]:
-                                continue
-                            
-                            # Check dependencies
-                            deps_met = True
-                            
-                            if task.trigger_policy == "ANY":
-                                # OR-join: Run if ANY dependency is executed (and successful)
-                                # But what if all failed? Then we can't run.
-                                # If at least one succeeded, we run.
-                                # If none succeeded yet, we wait.
-                                # If all failed, we fail (or skip).
-                                
-                                any_success = False
-                                all_failed = True
-                                
-                                if not task.dependencies:
-                                    # No deps = ready
-                                    any_success = True
-                                    all_failed = False
-                                else:
-                                    for dep in task.dependencies:
-                                        if dep in executed:
-                                            any_success = True
-                                            all_failed = False
-                                            break # Found one success
-                                        if dep not in failed:
-                                            all_failed = False # At least one is still running/pending
-                                
-                                if any_success:
-                                    deps_met = True
-                                elif all_failed:
-                                    # All deps failed, so we fail/skip
-                                    failed.add(task)
-                                    run_ctx.tasks[task.name] = TaskState.FAILED
-                                    deps_met = False
-                                    # Continue to next task loop to avoid adding to runnable
-                                    continue 
-                                else:
-                                    # Still waiting
-                                    deps_met = False
-
-                            else:
-                                # ALL (AND-join) - Default
-                                for dep in task.dependencies:
-                                    if dep in failed:
-                                        # Dependency failed
-                                        if task.fail_policy == "isolate" or dep.fail_policy == "isolate": 
-                                            failed.add(task)
-                                            run_ctx.tasks[task.name] = TaskState.FAILED # Mark as FAILED (or SKIPPED if we had it)
-                                            deps_met = False
-                                            break
-                                        else:
-                                            pass # fail=stop handled elsewhere
-                                    
-                                    if dep not in executed:
-                                        deps_met = False
-                                        break
-                            
-                            if deps_met and task not in failed:
-                                runnable.append(task)
-                    
-                    # If no runnable tasks and no running tasks, we are stuck
-                    # But if we have failed tasks, maybe that's why?
-                    if not runnable and not running:
-                        if len(executed) + len(failed) == len(flow.tasks):
-                            # All done (some failed)
-                            break
-                        
-                        run_ctx.status = RunStatus.FAILED
-                        run_ctx.end_time = time.time()
-                        raise RuntimeError("Deadlock or cycle detected in workflow")
-                    
-                    # Submit runnable tasks
-                    for task in runnable:
-                        future = executor.submit(self._execute_task, task, ctx)
-                        running.add(future)
-                        future_to_task[future] = task
-                        # Record start time for timeout tracking
-                        if task.timeout_sec:
-                             task_deadlines[task] = time.time() + task.timeout_sec
-
-                    # Calculate wait timeout
-                    wait_timeout = None
-                    if task_deadlines:
-                        now = time.time()
-                        min_deadline = min(task_deadlines.values())
-                        wait_timeout = max(0, min_deadline - now)
-                    
-                    # Wait for at least one task to complete or timeout
-                    if running:
-                        done, _ = concurrent.futures.wait(
-                            running, 
-                            timeout=wait_timeout,
-                            return_when=concurrent.futures.FIRST_COMPLETED
-                        )
-                        
-                        # Check for timeouts first
-                        now = time.time()
-                        timed_out_tasks = []
-                        for task, deadline in list(task_deadlines.items()):
-                            if now >= deadline:
-                                # Task timed out
-                                # Find the future for this task
-                                found_future = None
-                                for f, t in future_to_task.items():
-                                    if t == task and f in running:
-                                        found_future = f
-                                        break
-                                
-                                if found_future:
-                                    timed_out_tasks.append(found_future)
-                                    # Remove from tracking
-                                    running.remove(found_future)
-                                    del task_deadlines[task]
-                                    
-                                    # Handle failure
-                                    if task.fail_policy == "isolate":
-                                        failed.add(task)
-                                        run_ctx.tasks[task.name] = TaskState.FAILED
-                                        self.trace.on_node_error(task.name, TimeoutError(f"Task exceeded timeout of {task.timeout_sec}s"))
-                                    else:
-                                        run_ctx.status = RunStatus.FAILED
-                                        run_ctx.end_time = time.time()
-                                        raise TimeoutError(f"Task '{task.name}' exceeded timeout of {task.timeout_sec}s")
-
-                        for future in done:
-                            if future in running: # Might have been removed by timeout check above
-                                running.remove(future)
-                                task = future_to_task[future]
-                                if task in task_deadlines:
-                                    del task_deadlines[task]
-                                    
-                                try:
-                                    future.result() # Re-raise exception if any
-                                    executed.add(task)
-                                except Exception as e:
-                                    if task.fail_policy == "isolate":
-                                        failed.add(task)
-                                        # TaskState update is handled in _execute_task on exception? 
-                                        # No, _execute_task raises. So we need to update here if it failed.
-                                        # Actually _execute_task updates to FAILED before raising?
-                                        # Let's check _execute_task implementation below.
-                                        # If _execute_task raises, we catch it here.
-                                        # We should ensure FAILED state.
-                                        run_ctx.tasks[task.name] = TaskState.FAILED
-                                        self.trace.on_node_error(task.name, e) # Log it
-                                    else:
-                                        # fail=stop (default)
-                                        run_ctx.status = RunStatus.FAILED
-                                        run_ctx.end_time = time.time()
-                                        raise e
-
+            self._run_graph(flow.compile_graph(), ctx, reused)
         finally:
             # Cleanup active run
             if run_ctx.run_id in self.active_runs:
@@ -290,73 +725,465 @@ class Engine:
         
         # Update final run status
         if run_ctx.status == RunStatus.RUNNING:
-            if failed:
-                # Some tasks failed but were isolated
-                # Should run be COMPLETED or FAILED?
-                # Usually if flow finished (even with partial failures), it's COMPLETED (or PARTIAL_SUCCESS?)
-                # For now let's say COMPLETED if it didn't crash.
-                run_ctx.status = RunStatus.COMPLETED # Or maybe FAILED if strict?
-            else:
-                run_ctx.status = RunStatus.COMPLETED
+            # Isolated failures still count as a finished run (no PARTIAL_SUCCESS status yet).
+            run_ctx.status = RunStatus.COMPLETED
+        elif run_ctx.status == RunStatus.CANCELLING:
+            # Cancelled while the last running tasks were finishing.
+            run_ctx.status = RunStatus.CANCELLED
         
-        run_ctx.end_time = time.time()
+        run_ctx.end_time = self._now()
         return ctx
 
+    def _run_graph(self, graph, ctx: Context, reused=()):
+        """Schedule ``graph`` on the engine's workers until it finishes, fails or is cancelled."""
+        root = _DagRun(graph, ctx, deque())
+        root.start(reused)
+        if getattr(_worker_local, "shared", False):
+            # A graph nested in a task (control-flow sub-flow) would block a
+            # shared worker while waiting for others; give it its own threads.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                self._schedule(root, executor)
+            return
+        lane = self._executor.lane()
+        try:
+            self._schedule(root, lane)
+        finally:
+            lane.join()
+
+    def _now(self) -> float:
+        return time.time()
+
+    def _runs_inline(self, task: Task) -> bool:
+        if task.timeout_sec or task.stream:
+            return False
+        if task.inline:
+            return True
+        if self.auto_inline_ms is None or task.retries:
+            return False
+        calls, average_ms = self._task_ms.get(task.func, (0, 0.0))
+        return calls >= _AUTO_INLINE_MIN_CALLS and average_ms < self.auto_inline_ms
+
+    def _observe_duration(self, task: Task, duration_ms: float):
+        try:
+            calls, average_ms = self._task_ms.get(task.func, (0, 0.0))
+        except TypeError:
+            return  # unhashable callable
+        calls += 1
+        # Running mean for the first calls, then an exponential moving average.
+        weight = max(1.0 / calls, 0.2)
+        self._task_ms[task.func] = (calls, average_ms + (duration_ms - average_ms) * weight)
+
+    def _start_producer(self, executor, task: Task, fn, *args) -> concurrent.futures.Future:
+        # A producer blocks on its channel until consumers drain it. In a worker
+        # slot it could leave none for them, so it gets a thread of its own.
+        future = concurrent.futures.Future()
+
+        def produce():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=produce, name=f"pyoco-stream-{task.name}", daemon=True).start()
+        return future
+
+    def _wait(self, futures, timeout: Optional[float]):
+        # Wait for at least one task to complete or timeout
+        done, _ = concurrent.futures.wait(
+            futures,
+            timeout=timeout,
+            return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        return done
+
+    def _schedule(self, root: _DagRun, executor):
+        """
+        Event loop of the DAG scheduler.
+
+        Submits ready nodes of ``root`` and of any nested sub-flow graphs to
+        ``executor``, and reacts to completions, failures, timeouts and
+        cancellation until ``root`` has finished.
+        """
+        run_ctx = root.ctx.run_context
+        ready = root.ready
+        frames: List[_DagRun] = [root]
+        running: Dict[Any, Any] = {}  # Future -> (frame, node)
+        task_deadlines: Dict[Any, float] = {}  # Future -> deadline
+        # Mapped instances: future -> (slot, instance); control-flow sub-flows: future -> program
+        map_slots: Dict[Any, Any] = {}
+        programs: Dict[Any, _Program] = {}
+        # Programs waiting in a deferrable loop: heap of (monotonic wake time, seq, frame, node, program)
+        parked: List[Tuple[float, int, _DagRun, int, _Program]] = []
+        order = itertools.count()
+
+        def submit(frame: _DagRun, node: int, task: Task, *args, inline: bool = False,
+                   producer: bool = False, deadline: Optional[float] = None):
+            if producer:
+                future = self._start_producer(executor, task, *args)
+            elif inline:
+                # Completed before it is registered; picked up by the next _wait().
+                future = concurrent.futures.Future()
+                try:
+                    future.set_result(args[0](*args[1:]))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = executor.submit(*args)
+            running[future] = (frame, node)
+            # Record start time for timeout tracking
+            if deadline is None and task.timeout_sec:
+                deadline = self._now() + task.timeout_sec
+            if deadline is not None:
+                task_deadlines[future] = deadline
+            return future
+
+        def step(frame: _DagRun, node: int, program: _Program):
+            # Run the program up to its next park (or its end) on a worker.
+            future = submit(frame, node, frame.tasks[node], self._step_program, program,
+                            deadline=program.timeout_at)
+            program.timeout_at = task_deadlines.get(future)
+            programs[future] = program
+
+        def expire(frame: _DagRun, node: int, task: Task, slot=None, program: Optional[_Program] = None):
+            if node in frame.streams:
+                frame.streams.pop(node).cancel()
+            error = TimeoutError(f"Task '{task.name}' exceeded timeout of {task.timeout_sec}s")
+            self._congestion()
+            if slot:
+                self._fail_composite(frame.tasks[node], frame.ctx, error)
+            elif program is not None:
+                self._finish_subflow(task, frame.ctx, program.ctx, error)
+            fail(frame, node, error)
+
+        def settle(frame: _DagRun):
+            # A finished nested graph completes the sub-flow task that owns it.
+            while frame.parent is not None and frame.done and not frame.closed:
+                frame.closed = True
+                frames.remove(frame)
+                parent = frame.parent
+                self._finish_subflow(parent.tasks[frame.parent_node], parent.ctx, frame.ctx)
+                parent.succeed(frame.parent_node)
+                frame = parent
+
+        def succeed(frame: _DagRun, node: int):
+            frame.succeed(node)
+            settle(frame)
+
+        def fail(frame: _DagRun, node: int, error: Exception):
+            # Isolate the failure, or abort the (sub-)flow for fail=stop tasks.
+            if frame.graph.isolate[node]:
+                frame.mark_failed(node)
+                self.trace.on_node_error(frame.tasks[node].name, error)
+                settle(frame)
+                return
+            frame.closed = True
+            frame.cancel_streams()
+            if frame.parent is None:
+                run_ctx.status = RunStatus.FAILED
+                run_ctx.end_time = self._now()
+                for other in frames:
+                    other.cancel_streams()
+                raise error
+            frames.remove(frame)
+            parent = frame.parent
+            self._finish_subflow(parent.tasks[frame.parent_node], parent.ctx, frame.ctx, error)
+            fail(parent, frame.parent_node, error)
+
+        def expire_graph(frame: _DagRun):
+            # Close a timed-out nested graph (and the graphs nested in it), then fail its task.
+            for other in list(frames):
+                ancestor = other
+                while ancestor is not None and ancestor is not frame:
+                    ancestor = ancestor.parent
+                if ancestor is frame:
+                    other.closed = True
+                    other.cancel_streams()
+                    frames.remove(other)
+            parent = frame.parent
+            task = parent.tasks[frame.parent_node]
+            error = TimeoutError(f"Task '{task.name}' exceeded timeout of {task.timeout_sec}s")
+            self._congestion()
+            self._finish_subflow(task, parent.ctx, frame.ctx, error)
+            fail(parent, frame.parent_node, error)
+
+        while not root.done:
+            # Resume parked programs that are due; on cancellation all of them,
+            # so they can observe it and wind down.
+            while parked and (parked[0][0] <= time.monotonic() or run_ctx.cancel_requested):
+                _, _, frame, node, program = heapq.heappop(parked)
+                if frame.closed or frame.state[node] != _NODE_RUNNING:
+                    program.steps.close()
+                    continue  # The node or its graph already failed
+                if program.timeout_at is not None and self._now() >= program.timeout_at:
+                    program.steps.close()
+                    expire(frame, node, frame.tasks[node], program=program)
+                    continue
+                step(frame, node, program)
+
+            # Check for cancellation (of this run or, for sub-flows, a parent run)
+            if run_ctx.cancel_requested:
+                # Stop submitting new tasks and mark everything PENDING as CANCELLED
+                ready.clear()
+                for frame in frames:
+                    for t_name, t_state in frame.ctx.run_context.tasks.items():
+                        if t_state == TaskState.PENDING:
+                            frame.ctx.run_context.tasks[t_name] = TaskState.CANCELLED
+                    frame.cancel_streams()
+
+                # If no running tasks, we are done; otherwise wait for them (graceful shutdown)
+                if not running:
+                    for frame in reversed(frames[1:]):
+                        parent = frame.parent
+                        self._finish_subflow(parent.tasks[frame.parent_node], parent.ctx, frame.ctx, cancelled=True)
+                    run_ctx.status = RunStatus.CANCELLED
+                    break
+
+            # Submit runnable tasks
+            while ready and not run_ctx.cancel_requested:
+                frame, node = ready.popleft()
+                if frame.closed:
+                    continue
+                task = frame.tasks[node]
+                ctx = frame.ctx
+                frame.state[node] = _NODE_RUNNING
+                if task.subflow is not None:
+                    try:
+                        child_ctx = self._start_subflow(task, ctx)
+                    except Exception as e:
+                        self._fail_composite(task, ctx, e)
+                        fail(frame, node, e)
+                        continue
+                    plan = task.subflow
+                    if plan.control_flow:
+                        step(frame, node, _Program(self._iter_subflow(plan.program(), child_ctx), child_ctx))
+                        continue
+                    child = _DagRun(plan.graph(), child_ctx, ready, parent=frame, parent_node=node)
+                    if task.timeout_sec:
+                        child.deadline = self._now() + task.timeout_sec
+                    frames.append(child)
+                    child.start()
+                    settle(child)
+                    continue
+                if task.map_over is not None:
+                    try:
+                        instances = self._expand_mapped(task, ctx)
+                    except Exception as e:
+                        self._fail_composite(task, ctx, e)
+                        fail(frame, node, e)
+                        continue
+                    if not instances:
+                        self._finish_composite(task, ctx, [])
+                        succeed(frame, node)
+                        continue
+                    frame.gathers[node] = _Gather(len(instances))
+                    for slot, (instance, bound) in enumerate(instances):
+                        future = submit(frame, node, instance, self._execute_task, instance, ctx, None, bound,
+                                        inline=self._runs_inline(instance))
+                        map_slots[future] = (slot, instance)
+                    continue
+                channel = None
+                if task.stream and task.dependents:
+                    channel = Channel(capacity=task.stream, name=task.name)
+                    frame.streams[node] = channel
+                    ctx.set_result(task.name, channel)
+                    frame.released_early[node] = 1
+                    # Consumers of the new channel can start right away.
+                    frame.release_dependents(node)
+                submit(frame, node, task, self._execute_task, task, ctx, channel,
+                       inline=channel is None and self._runs_inline(task), producer=channel is not None)
+
+            # Nothing runnable and nothing running: the remaining tasks can never start
+            if not running and not parked:
+                if root.done or run_ctx.cancel_requested:
+                    continue
+                run_ctx.status = RunStatus.FAILED
+                run_ctx.end_time = self._now()
+                raise RuntimeError("Deadlock or cycle detected in workflow")
+
+            # Calculate wait timeout
+            wait_timeout = None
+            deadlines = [frame.deadline for frame in frames if frame.deadline is not None]
+            deadlines.extend(task_deadlines.values())
+            if deadlines:
+                wait_timeout = max(0, min(deadlines) - self._now())
+            if parked:
+                # Also poll for cancellation while programs are parked.
+                wake = min(parked[0][0] - time.monotonic(), _CANCEL_POLL_INTERVAL)
+                wait_timeout = max(0, wake if wait_timeout is None else min(wait_timeout, wake))
+
+            if running:
+                done = self._wait(running, wait_timeout)
+            else:
+                time.sleep(wait_timeout)  # Only parked programs left
+                done = ()
+
+            # Check for timeouts first
+            now = self._now()
+            for future, deadline in list(task_deadlines.items()):
+                if now < deadline:
+                    continue
+                del task_deadlines[future]
+                frame, node = running.pop(future)
+                slot = map_slots.pop(future, None)
+                program = programs.pop(future, None)
+                if frame.closed or frame.state[node] != _NODE_RUNNING:
+                    continue  # The node or its graph already failed
+                expire(frame, node, slot[1] if slot else frame.tasks[node], slot, program)
+            for frame in list(frames):
+                if frame.deadline is not None and now >= frame.deadline and not frame.closed:
+                    expire_graph(frame)
+
+            for future in done:
+                entry = running.pop(future, None)
+                if entry is None:
+                    continue  # Already handled as a timeout above
+                frame, node = entry
+                task_deadlines.pop(future, None)
+                slot = map_slots.pop(future, None)
+                program = programs.pop(future, None)
+                if frame.closed or frame.state[node] != _NODE_RUNNING:
+                    continue  # The node or its graph already failed
+                task = frame.tasks[node]
+                frame.streams.pop(node, None)
+
+                try:
+                    request = future.result() # Re-raise exception if any
+                except Exception as e:
+                    # _execute_task raises after recording the failure.
+                    if slot:
+                        self._fail_composite(task, frame.ctx, e)
+                    elif program is not None:
+                        self._finish_subflow(task, frame.ctx, program.ctx, e)
+                    fail(frame, node, e)
+                    continue
+                if program is not None and request is not None:
+                    # Parked in a deferrable loop: free the worker until it is due.
+                    wake = request.deadline
+                    if program.timeout_at is not None:
+                        wake = min(wake, time.monotonic() + program.timeout_at - self._now())
+                    heapq.heappush(parked, (wake, next(order), frame, node, program))
+                    continue
+                if slot:
+                    gather = frame.gathers[node]
+                    index, instance = slot
+                    gather.outputs[index] = frame.ctx.results.get(instance.name)
+                    gather.remaining -= 1
+                    if gather.remaining:
+                        continue
+                    del frame.gathers[node]
+                    self._finish_composite(task, frame.ctx, gather.outputs)
+                elif program is not None:
+                    self._finish_subflow(task, frame.ctx, program.ctx, cancelled=program.ctx.is_cancelled)
+                succeed(frame, node)
+
+            for frame in frames:
+                frame.release_drained_streams()
+
+        for entry in parked:
+            entry[-1].steps.close()
+
     def _execute_subflow(self, subflow, ctx: Context):
+        """
+        Drive a control-flow program to completion on the calling thread.
+
+        The program is interpreted by the ``_iter_*`` generators, which yield a
+        ``_Park`` request whenever a deferrable loop wants to wait. Parking is
+        owned by the driver rather than by the loop, so schedulers that
+        multiplex several programs can resume other work in the meantime.
+        """
+        steps = self._iter_subflow(subflow, ctx)
+        try:
+            for request in steps:
+                self._park(request.deadline, ctx)
+        finally:
+            steps.close()
+
+    def _step_program(self, program: _Program) -> Optional[_Park]:
+        """Run ``program`` to its next ``_Park`` request; None once it has finished."""
+        return next(program.steps, None)
+
+    def _iter_subflow(self, subflow, ctx: Context):
         for node in subflow.steps:
-            self._execute_node(node, ctx)
+            if ctx.is_cancelled:
+                return
+            yield from self._iter_node(node, ctx)
 
-    def _execute_node(self, node, ctx: Context):
+    def _iter_node(self, node, ctx: Context):
         if isinstance(node, TaskNode):
-            self._execute_task(node.task, ctx)
+            if node.task.subflow is not None:
+                self._execute_subflow_task(node.task, ctx)
+            elif node.task.map_over is not None:
+                self._execute_mapped(node.task, ctx)
+            else:
+                self._execute_task(node.task, ctx)
         elif isinstance(node, RepeatNode):
-            self._execute_repeat(node, ctx)
+            yield from self._iter_repeat(node, ctx)
         elif isinstance(node, ForEachNode):
-            self._execute_foreach(node, ctx)
+            yield from self._iter_foreach(node, ctx)
         elif isinstance(node, UntilNode):
-            self._execute_until(node, ctx)
+            yield from self._iter_until(node, ctx)
         elif isinstance(node, SwitchNode):
-            self._execute_switch(node, ctx)
+            yield from self._iter_switch(node, ctx)
+        elif isinstance(node, ParallelNode):
+            yield from self._iter_parallel(node, ctx)
         else:
             raise TypeError(f"Unknown node type: {type(node)}")
 
-    def _execute_repeat(self, node: RepeatNode, ctx: Context):
+    def _iter_repeat(self, node: RepeatNode, ctx: Context):
         count_value = self._resolve_repeat_count(node.count, ctx)
         for index in range(count_value):
             frame = LoopFrame(name="repeat", type="repeat", index=index, iteration=index + 1, count=count_value)
             ctx.push_loop(frame)
             try:
-                self._execute_subflow(node.body, ctx)
+                yield from self._iter_subflow(node.body, ctx)
             finally:
                 ctx.pop_loop()
 
-    def _execute_foreach(self, node: ForEachNode, ctx: Context):
-        sequence = self._eval_expression(node.source, ctx)
-        if not isinstance(sequence, (list, tuple)):
-            raise TypeError("ForEach source must evaluate to a list or tuple.")
+    def _iter_foreach(self, node: ForEachNode, ctx: Context):
+        source = self._eval_expression(node.source, ctx)
+        if isinstance(source, (str, bytes, Mapping)) or not isinstance(source, Iterable):
+            raise TypeError("ForEach source must evaluate to an iterable (list, tuple, generator, ...).")
 
-        total = len(sequence)
+        # Sized sources report their length; iterators/generators are consumed
+        # lazily and leave LoopFrame.count unset.
+        total = len(source) if isinstance(source, Sized) else None
         label = node.alias or node.source.source
-        for index, item in enumerate(sequence):
-            frame = LoopFrame(
-                name=f"foreach:{label}",
-                type="foreach",
-                index=index,
-                iteration=index + 1,
-                count=total,
-                item=item,
-            )
-            ctx.push_loop(frame)
-            if node.alias:
-                ctx.set_var(node.alias, item)
-            try:
-                self._execute_subflow(node.body, ctx)
-            finally:
+        if node.chunk:
+            items = _iter_chunks(source, node.chunk)
+            if total is not None:
+                total = -(-total // node.chunk)
+        else:
+            items = iter(source)
+        if node.prefetch:
+            items = _prefetch(items, node.prefetch)
+        try:
+            for index, item in enumerate(items):
+                frame = LoopFrame(
+                    name=f"foreach:{label}",
+                    type="foreach",
+                    index=index,
+                    iteration=index + 1,
+                    count=total,
+                    item=item,
+                )
+                ctx.push_loop(frame)
                 if node.alias:
-                    ctx.clear_var(node.alias)
-                ctx.pop_loop()
+                    ctx.set_var(node.alias, item)
+                try:
+                    yield from self._iter_subflow(node.body, ctx)
+                finally:
+                    if node.alias:
+                        ctx.clear_var(node.alias)
+                    ctx.pop_loop()
+        finally:
+            if node.prefetch:
+                items.close()
 
-    def _execute_until(self, node: UntilNode, ctx: Context):
+    def _iter_until(self, node: UntilNode, ctx: Context):
         max_iter = node.max_iter or 1000
         iteration = 0
         last_condition = None
@@ -372,7 +1199,7 @@ class Engine:
             )
             ctx.push_loop(frame)
             try:
-                self._execute_subflow(node.body, ctx)
+                yield from self._iter_subflow(node.body, ctx)
                 condition_result = bool(self._eval_expression(node.condition, ctx))
             finally:
                 ctx.pop_loop()
@@ -382,8 +1209,17 @@ class Engine:
                 break
             if iteration >= max_iter:
                 raise UntilMaxIterationsExceeded(node.condition.source, max_iter)
+            if node.interval:
+                deadline = time.monotonic() + node.interval
+                if node.deferrable:
+                    # Hand the wait to the driver instead of holding this thread.
+                    yield _Park(deadline)
+                else:
+                    self._park(deadline, ctx)
+            if ctx.is_cancelled:
+                return
 
-    def _execute_switch(self, node: SwitchNode, ctx: Context):
+    def _iter_switch(self, node: SwitchNode, ctx: Context):
         value = self._eval_expression(node.expression, ctx)
         default_case = None
         for case in node.cases:
@@ -392,10 +1228,72 @@ class Engine:
                     default_case = case
                 continue
             if case.value == value:
-                self._execute_subflow(case.target, ctx)
+                yield from self._iter_subflow(case.target, ctx)
                 return
         if default_case:
-            self._execute_subflow(default_case.target, ctx)
+            yield from self._iter_subflow(default_case.target, ctx)
+
+    def _iter_parallel(self, node: ParallelNode, ctx: Context):
+        """
+        Fork/join: run every branch concurrently and finish when all are done.
+
+        Each branch is a suspended interpreter generator. A pool thread only
+        advances a branch until it completes or parks; parked branches wait in
+        a deadline heap without holding a thread, and when every branch is
+        parked the wait is handed further up to this program's own driver.
+        """
+        branches = [self._iter_subflow(branch, ctx.fork()) for branch in node.branches]
+        if not branches:
+            return
+        parked: List[Any] = []  # heap of (deadline, seq, branch)
+        order = itertools.count()
+        error: Optional[BaseException] = None
+        workers = min(len(branches), _MAX_PARALLEL_BRANCH_WORKERS)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyoco-parallel") as pool:
+            pending = {pool.submit(next, branch, None): branch for branch in branches}
+            try:
+                while pending or parked:
+                    if error is not None or ctx.is_cancelled:
+                        for _, _, branch in parked:
+                            branch.close()
+                        parked.clear()
+                    now = time.monotonic()
+                    while parked and parked[0][0] <= now:
+                        _, _, branch = heapq.heappop(parked)
+                        pending[pool.submit(next, branch, None)] = branch
+                    if not pending:
+                        if parked:
+                            yield _Park(parked[0][0])
+                        continue
+
+                    timeout = max(0.0, parked[0][0] - now) if parked else None
+                    done, _ = concurrent.futures.wait(
+                        pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        branch = pending.pop(future)
+                        try:
+                            request = future.result()
+                        except Exception as exc:
+                            if error is None:
+                                error = exc
+                            continue
+                        if request is not None:
+                            heapq.heappush(parked, (request.deadline, next(order), branch))
+            finally:
+                for _, _, branch in parked:
+                    branch.close()
+        if error is not None:
+            raise error
+
+    def _park(self, deadline: float, ctx: Context):
+        # Wait until the monotonic deadline, waking early if the run is cancelled.
+        while not ctx.is_cancelled:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, _CANCEL_POLL_INTERVAL))
+
     def _resolve_repeat_count(self, count_value, ctx: Context) -> int:
         if isinstance(count_value, Expression):
             resolved = self._eval_expression(count_value, ctx)
@@ -412,7 +1310,240 @@ class Engine:
             return expression.evaluate(ctx=ctx.expression_data(), env=ctx.env_data())
         return expression
 
-    def _execute_task(self, task: Task, ctx: Context):
+    def _expand_mapped(self, task: Task, ctx: Context) -> List[Any]:
+        """
+        Resolve ``task.map_over`` and return ``(instance, bound_args)`` pairs,
+        one per item, registering each instance with the run context.
+        """
+        items = ctx.resolve(task.map_over)
+        if isinstance(items, (str, bytes, Mapping)) or not isinstance(items, Iterable):
+            raise TypeError(
+                f"Task '{task.name}' can only be mapped over a list, got {type(items).__name__}."
+            )
+        return self._map_instances(task, ctx, items)
+
+    def _map_instances(self, task: Task, ctx: Context, items: Iterable) -> List[Any]:
+        arg = _mapped_arg(task)
+        run_ctx = ctx.run_context
+        self._begin_composite(task, ctx)
+        instances = []
+        for index, item in enumerate(items):
+            instance = Task(
+                func=task.func,
+                name=f"{task.name}[{index}]",
+                inputs=task.inputs,
+                fail_policy=task.fail_policy,
+                retries=task.retries,
+                timeout_sec=task.timeout_sec,
+            )
+            if run_ctx:
+                run_ctx.tasks[instance.name] = TaskState.PENDING
+                run_ctx.ensure_task_record(instance.name)
+            instances.append((instance, {arg: item}))
+        return instances
+
+    def _begin_composite(self, task: Task, ctx: Context):
+        # Mapped and sub-flow tasks do not go through _execute_task themselves.
+        if ctx.run_context:
+            ctx.run_context.tasks[task.name] = TaskState.RUNNING
+            record = ctx.run_context.ensure_task_record(task.name)
+            record.state = TaskState.RUNNING
+            record.started_at = self._now()
+
+    def _finish_composite(self, task: Task, ctx: Context, output: Any):
+        ctx.set_result(task.name, output)
+        self._save_outputs(task, ctx, output)
+        if ctx.run_context:
+            ctx.run_context.tasks[task.name] = TaskState.SUCCEEDED
+            record = ctx.run_context.ensure_task_record(task.name)
+            record.state = TaskState.SUCCEEDED
+            record.ended_at = self._now()
+            record.duration_ms = (record.ended_at - (record.started_at or record.ended_at)) * 1000
+            record.output = output
+
+    def _fail_composite(self, task: Task, ctx: Context, error: Exception):
+        if ctx.run_context:
+            ctx.run_context.tasks[task.name] = TaskState.FAILED
+            record = ctx.run_context.ensure_task_record(task.name)
+            record.state = TaskState.FAILED
+            record.ended_at = self._now()
+            record.error = str(error)
+
+    def _execute_mapped(self, task: Task, ctx: Context):
+        """Run a mapped task's instances in parallel and gather their outputs in order."""
+        try:
+            instances = self._expand_mapped(task, ctx)
+            workers = min(_MAX_PARALLEL_BRANCH_WORKERS, len(instances)) or 1
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._execute_task, instance, ctx, None, bound)
+                    for instance, bound in instances
+                ]
+                for future in futures:
+                    future.result()
+        except Exception as e:
+            self._fail_composite(task, ctx, e)
+            raise
+        self._finish_composite(task, ctx, [ctx.results.get(instance.name) for instance, _ in instances])
+
+    def _start_subflow(self, task: Task, ctx: Context) -> Context:
+        """Create the child context a sub-flow task's flow runs in."""
+        plan = task.subflow
+        params = dict(ctx.params)
+        for key, value in plan.params.items():
+            params[key] = ctx.resolve(value)
+        parent_run = ctx.run_context
+        child_run = RunContext(
+            run_id=parent_run.run_id if parent_run else RunContext().run_id,
+            flow_name=plan.flow.name,
+            params=params,
+            parent=parent_run,
+        )
+        for sub_task in plan.flow.tasks:
+            child_run.tasks[sub_task.name] = TaskState.PENDING
+            child_run.ensure_task_record(sub_task.name)
+        self._begin_composite(task, ctx)
+        return Context(
+            params=params,
+            env=ctx.env,
+            artifact_dir=ctx.artifact_dir,
+            run_context=child_run,
+        )
+
+    def _finish_subflow(
+        self,
+        task: Task,
+        ctx: Context,
+        child_ctx: Context,
+        error: Optional[Exception] = None,
+        cancelled: bool = False,
+    ):
+        """
+        Close a sub-flow invocation: copy the child's task states, records and
+        logs into the parent run under ``<task>.<child task>`` and publish the
+        sub-flow output (or failure) as the task's own result.
+        """
+        child_run = child_ctx.run_context
+        child_run.end_time = self._now()
+        if cancelled:
+            child_run.status = RunStatus.CANCELLED
+        elif error is not None:
+            child_run.status = RunStatus.FAILED
+        elif child_run.status == RunStatus.RUNNING:
+            child_run.status = RunStatus.COMPLETED
+        run_ctx = ctx.run_context
+        if run_ctx:
+            prefix = f"{task.name}."
+            for name, state in child_run.tasks.items():
+                run_ctx.tasks[prefix + name] = state
+            for name, record in child_run.task_records.items():
+                run_ctx.task_records[prefix + name] = record
+            for entry in child_run.logs:
+                run_ctx.append_log(prefix + entry["task"], entry["stream"], entry["text"])
+        if cancelled:
+            if run_ctx:
+                run_ctx.tasks[task.name] = TaskState.CANCELLED
+                run_ctx.ensure_task_record(task.name).state = TaskState.CANCELLED
+        elif error is not None:
+            self._fail_composite(task, ctx, error)
+        else:
+            self._finish_composite(task, ctx, task.subflow.collect(child_ctx.results))
+
+    def _execute_subflow_task(self, task: Task, ctx: Context):
+        """Run a sub-flow task to completion on the calling thread (control-flow programs)."""
+        plan = task.subflow
+        child_ctx = self._start_subflow(task, ctx)
+        try:
+            if plan.control_flow:
+                self._execute_subflow(plan.program(), child_ctx)
+            else:
+                self._run_graph(plan.graph(), child_ctx)
+        except Exception as e:
+            self._finish_subflow(task, ctx, child_ctx, e)
+            raise
+        self._finish_subflow(task, ctx, child_ctx, cancelled=child_ctx.is_cancelled)
+
+    def _save_outputs(self, task: Task, ctx: Context, result: Any):
+        for target_path in task.outputs:
+            parts = target_path.split(".")
+            root_name = parts[0]
+            root_obj = None
+            if root_name == "scratch":
+                root_obj = ctx.scratch
+            elif root_name == "results":
+                root_obj = ctx.results
+            elif root_name == "params":
+                root_obj = ctx.params
+
+            if root_obj is not None:
+                current = root_obj
+                for i, part in enumerate(parts[1:-1]):
+                    if part not in current:
+                        current[part] = {}
+                    current = current[part]
+                    if not isinstance(current, dict):
+                            break
+                else:
+                    current[parts[-1]] = result
+
+    def _execute_task(
+        self,
+        task: Task,
+        ctx: Context,
+        channel: Optional[Channel] = None,
+        bound: Optional[Dict[str, Any]] = None,
+    ):
+        share = None
+        if ctx.run_context is not None and channel is None and bound is None:
+            share = self._shares.get(ctx.run_context.run_id)
+        key = share.key(task, ctx.params) if share is not None else None
+        if key is None:
+            return self._run_task(task, ctx, channel, bound)
+        future, leader = share.claim(key)
+        if leader:
+            try:
+                self._run_task(task, ctx)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            future.set_result(ctx.get_result(task.name))
+            return
+        self._adopt_shared(task, ctx, future)
+
+    def _adopt_shared(self, task: Task, ctx: Context, future: concurrent.futures.Future):
+        # Another run of the sweep executes the same work; take its outcome.
+        run_ctx = ctx.run_context
+        run_ctx.tasks[task.name] = TaskState.RUNNING
+        record = run_ctx.ensure_task_record(task.name)
+        record.state = TaskState.RUNNING
+        record.started_at = time.time()
+        self.trace.on_node_start(task.name)
+        try:
+            result = future.result()
+        except Exception as e:
+            record.state = TaskState.FAILED
+            record.ended_at = time.time()
+            record.duration_ms = (record.ended_at - record.started_at) * 1000
+            record.error = str(e)
+            self.trace.on_node_error(task.name, e)
+            run_ctx.tasks[task.name] = TaskState.FAILED
+            raise
+        ctx.set_result(task.name, result)
+        self._save_outputs(task, ctx, result)
+        record.ended_at = time.time()
+        record.duration_ms = (record.ended_at - record.started_at) * 1000
+        self.trace.on_node_end(task.name, record.duration_ms)
+        run_ctx.tasks[task.name] = TaskState.SUCCEEDED
+        record.state = TaskState.SUCCEEDED
+        record.output = result
+
+    def _run_task(
+        self,
+        task: Task,
+        ctx: Context,
+        channel: Optional[Channel] = None,
+        bound: Optional[Dict[str, Any]] = None,
+    ):
         # Update state to RUNNING
         from .models import TaskState
         run_ctx = ctx.run_context
@@ -430,15 +1561,20 @@ class Engine:
         start_time = time.time()
         # Retry loop
         retries_left = task.retries
+        if channel is not None:
+            # Items may already have been consumed, so streams are never replayed.
+            retries_left = 0
         while True:
             try:
                 # Resolve inputs from task configuration
                 kwargs = {}
                 for key, value in task.inputs.items():
                     kwargs[key] = ctx.resolve(value)
+                # Mapped instances receive their item as-is, never resolved.
+                if bound:
+                    kwargs.update(bound)
                 
                 # Inspect function signature to inject 'ctx' if needed
-                import inspect
                 sig = inspect.signature(task.func)
                 
                 # Inject 'ctx' if requested
@@ -460,40 +1596,26 @@ class Engine:
                 if record:
                     record.inputs = {k: v for k, v in kwargs.items() if k != "ctx"}
 
-                stdout_capture = TeeStream(sys.stdout)
-                stderr_capture = TeeStream(sys.stderr)
-                with contextlib.redirect_stdout(stdout_capture), contextlib.redirect_stderr(stderr_capture):
-                    result = task.func(**kwargs)
+                with _task_stdout.capture() as stdout_capture, _task_stderr.capture() as stderr_capture:
+                    if task.coalesce and channel is None:
+                        result = _single_flight.call(task, kwargs)
+                    else:
+                        result = task.func(**kwargs)
+                    if channel is not None:
+                        pump(result, channel)
+                        result = channel
                 ctx.set_result(task.name, result)
                 if run_ctx:
                     run_ctx.append_log(task.name, "stdout", stdout_capture.getvalue())
                     run_ctx.append_log(task.name, "stderr", stderr_capture.getvalue())
                 
                 # Handle outputs saving
-                for target_path in task.outputs:
-                    parts = target_path.split(".")
-                    root_name = parts[0]
-                    root_obj = None
-                    if root_name == "scratch":
-                        root_obj = ctx.scratch
-                    elif root_name == "results":
-                        root_obj = ctx.results
-                    elif root_name == "params":
-                        root_obj = ctx.params
-                    
-                    if root_obj is not None:
-                        current = root_obj
-                        for i, part in enumerate(parts[1:-1]):
-                            if part not in current:
-                                current[part] = {}
-                            current = current[part]
-                            if not isinstance(current, dict):
-                                    break
-                        else:
-                            current[parts[-1]] = result
+                self._save_outputs(task, ctx, result)
 
                 duration = (time.time() - start_time) * 1000
                 self.trace.on_node_end(task.name, duration)
+                if self.auto_inline_ms is not None:
+                    self._observe_duration(task, duration)
                 
                 # Update state to SUCCEEDED
                 if ctx.run_context:
@@ -518,6 +1640,7 @@ class Engine:
                     record.traceback = traceback.format_exc()
                 if retries_left > 0:
                     retries_left -= 1
+                    self._congestion()
                     # Log retry?
                     # self.trace.on_node_retry(task.name, e, retries_left) # If method exists
                     # For now just continue
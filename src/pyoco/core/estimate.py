@@ -0,0 +1,183 @@
+import heapq
+import json
+import statistics
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+from .graph import CompactGraph, analyze_graph, topological_order
+
+
+@dataclass
+class LevelUsage:
+    """
+    Work on one dependency level. ``span_ms`` is the shortest time the level
+    can take on the given workers (its longest task, or its total work spread
+    evenly), and ``utilization`` the share of worker time that is busy then.
+    """
+    level: int
+    tasks: int
+    work_ms: float
+    span_ms: float
+    utilization: float
+
+
+@dataclass
+class MakespanEstimate:
+    jobs: int
+    makespan_ms: float
+    total_work_ms: float
+    critical_path_ms: float
+    critical_path: List[str] = field(default_factory=list)
+    utilization: float = 0.0
+    levels: List[LevelUsage] = field(default_factory=list)
+    # Tasks without history; they were costed at the default duration.
+    missing: List[str] = field(default_factory=list)
+
+
+def durations_from_runs(runs: Iterable[Any], flow_name: Optional[str] = None) -> Dict[str, float]:
+    """
+    Median successful ``duration_ms`` per task across ``runs``.
+
+    Accepts ``RunContext`` objects or exported run dicts (as archived by the
+    server). Runs of other flows are skipped when ``flow_name`` is given.
+    """
+    samples: Dict[str, List[float]] = {}
+    for run in runs:
+        if isinstance(run, Mapping):
+            run_flow = run.get("flow_name")
+            records = run.get("task_records") or {}
+        else:
+            run_flow = run.flow_name
+            records = run.task_records
+        if flow_name is not None and run_flow not in (None, flow_name):
+            continue
+        for name, record in records.items():
+            if isinstance(record, Mapping):
+                state, duration = record.get("state"), record.get("duration_ms")
+            else:
+                state, duration = record.state, record.duration_ms
+            state = getattr(state, "value", state)
+            if duration is None or state != "SUCCEEDED":
+                continue
+            samples.setdefault(name, []).append(float(duration))
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+def load_run_history(paths: Iterable[Union[str, Path]]) -> List[Dict[str, Any]]:
+    """Read archived run JSON files; directories contribute every ``*.json`` inside."""
+    runs = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            try:
+                with file.open("r", encoding="utf-8") as fp:
+                    payload = json.load(fp)
+            except (OSError, ValueError):
+                continue
+            if isinstance(payload, list):
+                runs.extend(item for item in payload if isinstance(item, dict))
+            elif isinstance(payload, dict):
+                runs.append(payload)
+    return runs
+
+
+def estimate_makespan(
+    graph: CompactGraph,
+    durations: Mapping[str, float],
+    jobs: int,
+    default_ms: Optional[float] = None,
+) -> MakespanEstimate:
+    """
+    Predict wall-clock time of one run of ``graph`` on ``jobs`` workers.
+
+    Replays the DAG scheduler without running anything: ready tasks start in
+    release order (FIFO, like the engine) whenever a worker is free, OR-joins
+    start on their first finished dependency. Tasks missing from
+    ``durations`` cost ``default_ms``, which defaults to the median of the
+    known durations (1 ms without any history).
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1.")
+    order = topological_order(graph)
+    if order is None:
+        raise ValueError("Cannot estimate a flow with cycles.")
+
+    count = len(graph)
+    if default_ms is None:
+        known = [durations[task.name] for task in graph.tasks if task.name in durations]
+        default_ms = statistics.median(known) if known else 1.0
+    cost = array("d", bytes(8 * count))
+    missing = []
+    for i, task in enumerate(graph.tasks):
+        if task.name in durations:
+            cost[i] = durations[task.name]
+        else:
+            cost[i] = default_ms
+            missing.append(task.name)
+
+    makespan = _simulate(graph, cost, jobs)
+    stats = analyze_graph(graph, cost)
+    total_work = sum(cost)
+    estimate = MakespanEstimate(
+        jobs=jobs,
+        makespan_ms=makespan,
+        total_work_ms=total_work,
+        critical_path_ms=stats.critical_path_length or 0.0,
+        critical_path=[graph.tasks[i].name for i in stats.critical_path],
+        utilization=total_work / (jobs * makespan) if makespan else 0.0,
+        missing=sorted(missing),
+    )
+    estimate.levels = _level_usage(graph, order, cost, jobs)
+    return estimate
+
+
+def _simulate(graph: CompactGraph, cost: array, jobs: int) -> float:
+    count = len(graph)
+    waiting = array("i", (graph.pred_offsets[i + 1] - graph.pred_offsets[i] for i in range(count)))
+    started = bytearray(count)
+    ready = deque(i for i in range(count) if waiting[i] == 0)
+    for node in ready:
+        started[node] = 1
+    running: List = []  # (finish time, node)
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < jobs:
+            node = ready.popleft()
+            heapq.heappush(running, (now + cost[node], node))
+        now, node = heapq.heappop(running)
+        for nxt in graph.successors(node):
+            if started[nxt]:
+                continue
+            waiting[nxt] -= 1
+            if graph.any_join[nxt] or waiting[nxt] == 0:
+                started[nxt] = 1
+                ready.append(nxt)
+    return now
+
+
+def _level_usage(graph: CompactGraph, order: array, cost: array, jobs: int) -> List[LevelUsage]:
+    level = array("i", bytes(4 * len(graph)))
+    for node in order:
+        for pred in graph.predecessors(node):
+            if level[pred] + 1 > level[node]:
+                level[node] = level[pred] + 1
+    grouped: Dict[int, List[float]] = {}
+    for node in range(len(graph)):
+        grouped.setdefault(level[node], []).append(cost[node])
+    usage = []
+    for depth in sorted(grouped):
+        costs = grouped[depth]
+        work = sum(costs)
+        span = max(max(costs), work / jobs)
+        usage.append(LevelUsage(
+            level=depth + 1,
+            tasks=len(costs),
+            work_ms=work,
+            span_ms=span,
+            utilization=work / (jobs * span) if span else 0.0,
+        ))
+    return usage
@@ -0,0 +1,259 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .models import Task
+
+
+class CompactGraph:
+    """
+    Integer-indexed snapshot of a flow's task DAG.
+
+    Nodes are numbered ``0..n-1`` and adjacency is stored CSR-style in
+    ``array('i')`` buffers (``succ_offsets``/``succ_targets`` and the
+    predecessor equivalents), with the per-node scheduling flags the engine
+    needs kept in flat byte arrays. ``tasks[i]`` is the ``Task`` object for
+    node ``i``, so user-facing code keeps working with tasks while the
+    scheduler walks integers.
+
+    Dependencies on tasks outside the snapshot still count towards
+    ``in_degree`` (they can never be satisfied) but have no edge.
+
+    The snapshot is built from the tasks' ``dependencies`` sets and lives
+    alongside them, so it adds to a flow's memory (about 35 bytes per task on
+    a chain) rather than replacing it. What it buys is scheduling speed: the
+    engine and the analyses walk flat integer arrays instead of hashing Task
+    objects per edge.
+    """
+
+    __slots__ = (
+        "tasks",
+        "in_degree",
+        "succ_offsets",
+        "succ_targets",
+        "pred_offsets",
+        "pred_targets",
+        "any_join",
+        "isolate",
+    )
+
+    def __init__(self, tasks: Iterable[Task]):
+        self.tasks: List[Task] = list(tasks)
+        count = len(self.tasks)
+
+        self.in_degree = array("i", bytes(4 * count))
+        self.any_join = bytearray(count)
+        self.isolate = bytearray(count)
+        # Flat arrays only: per-node lists would keep ~2 containers per task
+        # alive and make the cyclic GC rescan large graphs while we build.
+        self.pred_offsets = array("i", [0])
+        self.pred_targets = array("i")
+        edge_dst = array("i")
+        # Tasks compare by name; looking names up avoids Task.__hash__/__eq__ per edge.
+        lookup = {task.name: i for i, task in enumerate(self.tasks)}.get
+        for i, task in enumerate(self.tasks):
+            self.in_degree[i] = len(task.dependencies)
+            self.any_join[i] = task.trigger_policy == "ANY"
+            self.isolate[i] = task.fail_policy == "isolate"
+            preds = [src for src in map(lookup, [dep.name for dep in task.dependencies]) if src is not None]
+            self.pred_targets.extend(preds)
+            edge_dst.extend([i] * len(preds))
+            self.pred_offsets.append(len(self.pred_targets))
+
+        # Successors: counting sort of the same edges by source.
+        out_counts = [0] * count
+        for src in self.pred_targets:
+            out_counts[src] += 1
+        self.succ_offsets = array("i", [0])
+        total = 0
+        for n in out_counts:
+            total += n
+            self.succ_offsets.append(total)
+        self.succ_targets = array("i", bytes(4 * total))
+        cursor = self.succ_offsets.tolist()
+        for src, dst in zip(self.pred_targets, edge_dst):
+            self.succ_targets[cursor[src]] = dst
+            cursor[src] += 1
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    @property
+    def index(self) -> Dict[Task, int]:
+        """Task -> node id; built on each access, so keep the result if used repeatedly."""
+        return {task: i for i, task in enumerate(self.tasks)}
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.succ_targets)
+
+    def successors(self, node: int) -> array:
+        return self.succ_targets[self.succ_offsets[node]:self.succ_offsets[node + 1]]
+
+    def predecessors(self, node: int) -> array:
+        return self.pred_targets[self.pred_offsets[node]:self.pred_offsets[node + 1]]
+
+
+@dataclass
+class GraphStats:
+    """
+    Shape of a task DAG, as reported by ``pyoco check``.
+
+    ``depth`` is the number of levels on the longest dependency chain and
+    ``max_width`` the largest number of tasks on one level, i.e. how many
+    could run at once with unlimited workers. The critical path is weighted
+    by per-task cost when weights are given, otherwise every task costs 1.
+    Level-based fields are ``None`` when the graph has cycles.
+    """
+    nodes: int
+    edges: int
+    depth: Optional[int] = None
+    max_width: Optional[int] = None
+    critical_path_length: Optional[float] = None
+    critical_path: List[int] = field(default_factory=list)
+
+
+def _tarjan(graph: CompactGraph):
+    """
+    Tarjan's algorithm over the successor CSR arrays, with an explicit work
+    stack so arbitrarily deep chains do not hit the recursion limit.
+
+    Returns ``(members, bounds)``: component ``k`` is
+    ``members[bounds[k]:bounds[k + 1]]``, in reverse topological order. The
+    work stacks hold plain ints rather than tuples so a large graph does not
+    trigger repeated cyclic GC passes.
+    """
+    count = len(graph)
+    offsets, targets = graph.succ_offsets, graph.succ_targets
+    index = array("i", [-1]) * count
+    low = array("i", bytes(4 * count))
+    on_stack = bytearray(count)
+    stack: List[int] = []
+    work_nodes: List[int] = []
+    work_pos: List[int] = []
+    members = array("i")
+    bounds = array("i", [0])
+    counter = 0
+
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work_nodes.append(root)
+        work_pos.append(offsets[root])
+        while work_nodes:
+            node = work_nodes[-1]
+            pos = work_pos[-1]
+            end = offsets[node + 1]
+            while pos < end:
+                nxt = targets[pos]
+                pos += 1
+                if index[nxt] == -1:
+                    # Descend; resume `node` at `pos` afterwards.
+                    work_pos[-1] = pos
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack[nxt] = 1
+                    work_nodes.append(nxt)
+                    work_pos.append(offsets[nxt])
+                    break
+                if on_stack[nxt] and index[nxt] < low[node]:
+                    low[node] = index[nxt]
+            else:
+                work_nodes.pop()
+                work_pos.pop()
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        members.append(member)
+                        if member == node:
+                            break
+                    bounds.append(len(members))
+                if work_nodes:
+                    parent = work_nodes[-1]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+    return members, bounds
+
+
+def strongly_connected_components(graph: CompactGraph) -> List[List[int]]:
+    """Strongly connected components as node-id lists, in reverse topological order."""
+    members, bounds = _tarjan(graph)
+    return [members[bounds[k]:bounds[k + 1]].tolist() for k in range(len(bounds) - 1)]
+
+
+def find_cycles(graph: CompactGraph) -> List[List[int]]:
+    """Every cycle of the graph as a strongly connected component (self-loops included)."""
+    members, bounds = _tarjan(graph)
+    cycles = []
+    for k in range(len(bounds) - 1):
+        start, stop = bounds[k], bounds[k + 1]
+        if stop - start > 1 or members[start] in graph.successors(members[start]):
+            cycles.append(sorted(members[start:stop]))
+    return cycles
+
+
+def topological_order(graph: CompactGraph) -> Optional[array]:
+    """Kahn's algorithm over edges inside the graph; ``None`` if there is a cycle."""
+    count = len(graph)
+    offsets, targets = graph.succ_offsets, graph.succ_targets
+    pending = array("i", (graph.pred_offsets[i + 1] - graph.pred_offsets[i] for i in range(count)))
+    order = array("i", (i for i in range(count) if pending[i] == 0))
+    head = 0
+    while head < len(order):
+        node = order[head]
+        head += 1
+        for pos in range(offsets[node], offsets[node + 1]):
+            nxt = targets[pos]
+            pending[nxt] -= 1
+            if pending[nxt] == 0:
+                order.append(nxt)
+    return order if len(order) == count else None
+
+
+def analyze_graph(graph: CompactGraph, weights: Optional[Sequence[float]] = None) -> GraphStats:
+    """Compute ``GraphStats`` in a single topological sweep (O(nodes + edges))."""
+    stats = GraphStats(nodes=len(graph), edges=graph.edge_count)
+    order = topological_order(graph)
+    if order is None or not len(order):
+        return stats
+
+    pred_offsets, pred_targets = graph.pred_offsets, graph.pred_targets
+    level = array("i", bytes(4 * len(graph)))
+    cost = array("d", bytes(8 * len(graph)))
+    via = array("i", [-1]) * len(graph)
+    for node in order:
+        best_level = 0
+        best_cost = 0.0
+        best_pred = -1
+        for pos in range(pred_offsets[node], pred_offsets[node + 1]):
+            pred = pred_targets[pos]
+            if level[pred] > best_level:
+                best_level = level[pred]
+            if best_pred == -1 or cost[pred] > best_cost:
+                best_cost = cost[pred]
+                best_pred = pred
+        level[node] = best_level + 1
+        cost[node] = best_cost + (weights[node] if weights is not None else 1.0)
+        via[node] = best_pred
+
+    widths: Dict[int, int] = {}
+    for value in level:
+        widths[value] = widths.get(value, 0) + 1
+    stats.depth = max(widths)
+    stats.max_width = max(widths.values())
+
+    tail = max(range(len(graph)), key=cost.__getitem__)
+    stats.critical_path_length = cost[tail]
+    path = []
+    while tail != -1:
+        path.append(tail)
+        tail = via[tail]
+    path.reverse()
+    stats.critical_path = path
+    return stats
@@ -5,13 +5,15 @@ import time
 import uuid
 import json
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """
     Represents a single unit of work in the workflow.
     
     Designed to be lightweight and serializable.
     Contains metadata about the task, its dependencies, and execution policies.
+    Slotted (no per-instance ``__dict__``), which saves about 110 bytes per task
+    in large flows.
     """
     func: Callable
     name: str
@@ -31,6 +33,23 @@ class Task:
     # Trigger policy
     trigger_policy: str = "ALL" # ALL (AND-join), ANY (OR-join)
 
+    # Streaming: channel capacity for generator tasks (0 = disabled)
+    stream: int = 0
+
+    # Dynamic mapping: list (or `$node`/`$ctx` reference to one) expanded into
+    # one instance per item at runtime; `map_arg` receives the item.
+    map_over: Any = None
+    map_arg: Optional[str] = None
+
+    # Sub-flow task: SubflowPlan of the embedded flow (func is unused)
+    subflow: Any = None
+
+    # Share one execution between concurrent calls with equal inputs
+    coalesce: bool = False
+
+    # Run on the scheduler thread instead of a worker (tiny, non-blocking tasks)
+    inline: bool = False
+
     def __hash__(self):
         return hash(self.name)
 
@@ -91,6 +110,17 @@ class RunContext:
     metrics_recorded_tasks: Set[str] = field(default_factory=set, repr=False)
     metrics_run_observed: bool = field(default=False, repr=False)
     webhook_notified_status: Optional[str] = field(default=None, repr=False)
+    # Set for sub-flow runs; cancelling the parent run cancels them too.
+    parent: Optional["RunContext"] = field(default=None, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        run = self
+        while run is not None:
+            if run.status in (RunStatus.CANCELLING, RunStatus.CANCELLED):
+                return True
+            run = run.parent
+        return False
 
     def ensure_task_record(self, task_name: str) -> TaskRecord:
         if task_name not in self.task_records:
@@ -166,9 +196,9 @@ class Flow:
 
         if hasattr(other, "to_subflow"):
             fragment = other if isinstance(other, FlowFragment) else ensure_fragment(other)
-            self._record_fragment(fragment)
+            steps = self._record_fragment(fragment)
             if not self._has_control_flow and not fragment.has_control_flow():
-                self._append_linear_fragment(fragment)
+                self._append_linear_fragment(steps)
             else:
                 self._has_control_flow = True
             return self
@@ -246,30 +276,66 @@ class Flow:
         return self
 
     def add_task(self, task: Task):
+        # Tasks compare by name; a re-added name (e.g. a `.map(...)` copy) replaces the old object.
+        self.tasks.discard(task)
         self.tasks.add(task)
 
     def has_control_flow(self) -> bool:
         return self._has_control_flow
 
+    def compile_graph(self):
+        """
+        Snapshot the task DAG into a CompactGraph (integer ids, CSR adjacency).
+
+        Nodes are numbered in task-name order so scheduling order does not
+        depend on set iteration (and hash seeds). A streaming task may feed
+        only one dependent, since its channel delivers each item once.
+        """
+        from .graph import CompactGraph
+        for task in self.tasks:
+            if task.stream and len(task.dependents) > 1:
+                names = ", ".join(sorted(dep.name for dep in task.dependents))
+                raise ValueError(
+                    f"Streaming task '{task.name}' has several dependents ({names}); "
+                    "a stream can feed only one consumer."
+                )
+        return CompactGraph(sorted(self.tasks, key=lambda task: task.name))
+
     def build_program(self):
         from ..dsl.nodes import SubFlowNode
         return SubFlowNode(list(self._definition))
 
     def _record_fragment(self, fragment):
-        from ..dsl.nodes import TaskNode
-        subflow = fragment.to_subflow()
-        self._definition.extend(subflow.steps)
+        # Uses the fragment's cached task list / control-flow flag so that
+        # appending stays proportional to the fragment, not the whole flow.
+        steps = fragment.to_subflow().steps
+        self._definition.extend(steps)
         for task in fragment.task_nodes():
             self.add_task(task)
-        if any(not isinstance(step, TaskNode) for step in subflow.steps):
+        if fragment.has_control_flow():
             self._has_control_flow = True
+        return steps
 
-    def _append_linear_fragment(self, fragment):
-        subflow = fragment.to_subflow()
-        for step in subflow.steps:
-            if hasattr(step, "task"):
+    def _append_linear_fragment(self, steps):
+        from ..dsl.nodes import ParallelNode
+        for step in steps:
+            if isinstance(step, ParallelNode):
+                self._append_parallel(step)
+            elif hasattr(step, "task"):
                 self._append_task(step.task)
 
+    def _append_parallel(self, node):
+        # Fork from the current tail into every branch head; branch tails
+        # become the new tail so the next step joins on all of them.
+        from ..dsl.syntax import _collect_tasks, _entry_tasks, _exit_tasks
+        for task in _collect_tasks(node):
+            self.add_task(task)
+        for head in _entry_tasks(node):
+            for tail_task in self._tail:
+                tail_task.dependents.add(head)
+                head.dependencies.add(tail_task)
+        self._tail = set(_exit_tasks(node))
+
     def _append_task(self, task: Task):
         self.add_task(task)
         if self._has_control_flow:
@@ -0,0 +1,294 @@
+import concurrent.futures
+import heapq
+import itertools
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+from .context import Context
+from .engine import Engine, _DagRun
+from .models import Flow, RunContext, RunStatus, TaskState
+from ..trace.backend import TraceBackend
+
+# Engine._execute_task sleeps this long between attempts.
+RETRY_BACKOFF_MS = 100.0
+
+DurationSource = Union[Mapping[str, float], Callable[[str, random.Random], Optional[float]]]
+
+
+class SimulatedTaskFailure(RuntimeError):
+    """Raised for a task whose sampled attempts all failed."""
+
+    def __init__(self, task_name: str, attempts: int):
+        super().__init__(f"Simulated failure of task '{task_name}' after {attempts} attempt(s).")
+        self.task_name = task_name
+        self.attempts = attempts
+
+
+class NullTraceBackend(TraceBackend):
+    def on_flow_start(self, flow_name: str, run_id: str = None):
+        pass
+
+    def on_flow_end(self, flow_name: str):
+        pass
+
+    def on_node_start(self, node_name: str):
+        pass
+
+    def on_node_end(self, node_name: str, duration_ms: float):
+        pass
+
+    def on_node_error(self, node_name: str, error: Exception):
+        pass
+
+
+@dataclass
+class SimulationReport:
+    jobs: int
+    status: RunStatus
+    makespan_ms: float
+    busy_ms: float
+    utilization: float
+    tasks_run: int
+    tasks_failed: int
+    retries: int
+    # Most tasks waiting for a free worker at any point in time.
+    max_queue: int
+    error: Optional[str] = None
+    run_context: Optional[RunContext] = field(default=None, repr=False)
+
+
+class VirtualExecutor:
+    """
+    Executor stand-in that runs nothing: each submitted call is costed by
+    ``plan(fn, args, now)`` and completes on a virtual clock (seconds). Calls
+    beyond ``workers`` queue in submission order, like ThreadPoolExecutor.
+    """
+
+    def __init__(self, workers: int, plan: Callable):
+        self.workers = workers
+        self.now = 0.0
+        self.busy = 0.0
+        self.max_queue = 0
+        self._plan = plan
+        self._queue: deque = deque()
+        self._running: List = []  # heap of (finish, seq, start, future, complete)
+        self._seq = itertools.count()
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        self._queue.append((future, fn, args))
+        self._dispatch()
+        return future
+
+    def _dispatch(self):
+        while self._queue and len(self._running) < self.workers:
+            future, fn, args = self._queue.popleft()
+            future.set_running_or_notify_cancel()
+            duration, complete = self._plan(fn, args, self.now)
+            heapq.heappush(self._running, (self.now + duration, next(self._seq), self.now, future, complete))
+        if len(self._queue) > self.max_queue:
+            self.max_queue = len(self._queue)
+
+    def wait(self, timeout: Optional[float]):
+        """Advance to the next completion (or by ``timeout``) and return the futures that finished."""
+        if not self._running or (timeout is not None and self.now + timeout < self._running[0][0]):
+            self.now += timeout or 0.0
+            return set()
+        self.now = self._running[0][0]
+        done = set()
+        while self._running and self._running[0][0] <= self.now:
+            finish, _, start, future, complete = heapq.heappop(self._running)
+            self.busy += finish - start
+            try:
+                future.set_result(complete())
+            except Exception as exc:
+                future.set_exception(exc)
+            done.add(future)
+        self._dispatch()
+        return done
+
+
+class SimulatedEngine(Engine):
+    """
+    Engine mode that replays scheduling on a virtual clock without calling
+    task functions.
+
+    The DAG scheduler loop is the real one; only the executor and the clock
+    are replaced, so results track the engine's actual decisions (ready
+    order, joins, fail policies, timeouts, mapped and sub-flow tasks).
+    Task durations come from ``durations`` (milliseconds by task name, or a
+    ``(name, rng) -> ms`` sampler), falling back to ``default_ms``; mapped
+    instances (``name[i]``) fall back to their task's duration. ``jitter``
+    scales every sample by a log-normal factor. Each attempt fails with
+    ``failure_rate`` (a probability, or one per task name) and failed
+    attempts are retried up to ``task.retries`` with the engine's backoff.
+    Runs with the same ``seed`` are identical.
+    """
+
+    def __init__(
+        self,
+        jobs: int = 8,
+        durations: Optional[DurationSource] = None,
+        default_ms: float = 1.0,
+        jitter: float = 0.0,
+        failure_rate: Union[float, Mapping[str, float]] = 0.0,
+        map_sizes: Optional[Mapping[str, int]] = None,
+        seed: int = 0,
+        trace_backend: Optional[TraceBackend] = None,
+    ):
+        super().__init__(trace_backend=trace_backend or NullTraceBackend())
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1.")
+        self.jobs = jobs
+        self.durations = durations if durations is not None else {}
+        self.default_ms = default_ms
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.map_sizes = dict(map_sizes or {})
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._virtual: Optional[VirtualExecutor] = None
+        self._clock = 0.0
+        self._stats: Dict[str, int] = {}
+
+    def simulate(self, flow: Flow, params: Optional[Dict[str, Any]] = None) -> SimulationReport:
+        """Run ``flow`` once in simulation and summarize the schedule."""
+        if flow.has_control_flow():
+            raise ValueError("Simulation supports DAG flows only.")
+        self._rng = random.Random(self.seed)
+        self._clock = 0.0
+        self._stats = {"run": 0, "failed": 0, "retries": 0}
+        run_ctx = RunContext(start_time=0.0)
+        error = None
+        try:
+            self.run(flow, params, run_context=run_ctx)
+        except Exception as exc:
+            error = str(exc)
+        executor = self._virtual
+        makespan_ms = executor.now * 1000 if executor else 0.0
+        busy_ms = executor.busy * 1000 if executor else 0.0
+        return SimulationReport(
+            jobs=self.jobs,
+            status=run_ctx.status,
+            makespan_ms=makespan_ms,
+            busy_ms=busy_ms,
+            utilization=busy_ms / (self.jobs * makespan_ms) if makespan_ms else 0.0,
+            tasks_run=self._stats["run"],
+            tasks_failed=self._stats["failed"],
+            retries=self._stats["retries"],
+            max_queue=executor.max_queue if executor else 0,
+            error=error,
+            run_context=run_ctx,
+        )
+
+    def run(
+        self,
+        flow: Flow,
+        params: Dict[str, Any] = None,
+        run_context: Optional[RunContext] = None,
+        reuse: Optional[Dict[str, Any]] = None,
+    ) -> Context:
+        self._virtual = None
+        return super().run(flow, params, run_context=run_context, reuse=reuse)
+
+    def _run_graph(self, graph, ctx: Context, reused=()):
+        executor = VirtualExecutor(self.jobs, self._plan_call)
+        outer, self._virtual = self._virtual, executor
+        try:
+            root = _DagRun(graph, ctx, deque())
+            root.start(reused)
+            self._schedule(root, executor)
+        finally:
+            if outer is not None:
+                # Nested graphs share the caller's clock.
+                outer.now = executor.now
+                self._virtual = outer
+
+    def _start_producer(self, executor, task, fn, *args):
+        # Producers are costed like any other task.
+        return executor.submit(fn, *args)
+
+    def _runs_inline(self, task) -> bool:
+        # Every call goes through the virtual executor so it is costed.
+        return False
+
+    def _now(self) -> float:
+        return self._virtual.now if self._virtual else self._clock
+
+    def _wait(self, futures, timeout: Optional[float]):
+        return self._virtual.wait(timeout)
+
+    def _expand_mapped(self, task, ctx: Context) -> List[Any]:
+        # Upstream outputs are not computed, so fan-out comes from map_sizes.
+        return self._map_instances(task, ctx, [None] * self.map_sizes.get(task.name, 1))
+
+    def _plan_call(self, fn, args, now: float):
+        if fn == self._execute_task:
+            return self._plan_task(args[0], args[1], args[2] if len(args) > 2 else None, now)
+        if fn == self._step_program:
+            # Control-flow sub-flows are costed as one unit under the flow's name.
+            program = args[0]
+            program.steps.close()
+            return self._sample_ms(program.ctx.run_context.flow_name) / 1000, lambda: None
+        return 0.0, lambda: fn(*args)
+
+    def _plan_task(self, task, ctx: Context, channel, now: float):
+        attempts = 1
+        total_ms = self._sample_ms(task.name)
+        succeeded = self._rng.random() >= self._failure_probability(task.name)
+        while not succeeded and attempts <= task.retries:
+            attempts += 1
+            total_ms += RETRY_BACKOFF_MS + self._sample_ms(task.name)
+            succeeded = self._rng.random() >= self._failure_probability(task.name)
+        self._stats["run"] += 1
+        self._stats["retries"] += attempts - 1
+
+        run_ctx = ctx.run_context
+        record = run_ctx.ensure_task_record(task.name)
+        run_ctx.tasks[task.name] = TaskState.RUNNING
+        record.state = TaskState.RUNNING
+        record.started_at = now
+        self.trace.on_node_start(task.name)
+
+        def complete():
+            record.ended_at = self._now()
+            record.duration_ms = total_ms
+            if channel is not None:
+                channel.close()
+            if not succeeded:
+                self._stats["failed"] += 1
+                error = SimulatedTaskFailure(task.name, attempts)
+                record.state = TaskState.FAILED
+                record.error = str(error)
+                run_ctx.tasks[task.name] = TaskState.FAILED
+                self.trace.on_node_error(task.name, error)
+                raise error
+            ctx.set_result(task.name, None)
+            record.state = TaskState.SUCCEEDED
+            run_ctx.tasks[task.name] = TaskState.SUCCEEDED
+            self.trace.on_node_end(task.name, total_ms)
+
+        return total_ms / 1000, complete
+
+    def _sample_ms(self, name: str) -> float:
+        if callable(self.durations):
+            base = self.durations(name, self._rng)
+        else:
+            base = self.durations.get(name)
+            if base is None and name.endswith("]") and "[" in name:
+                base = self.durations.get(name[:name.rindex("[")])
+        if base is None:
+            base = self.default_ms
+        if self.jitter:
+            base *= self._rng.lognormvariate(0.0, self.jitter)
+        return max(0.0, float(base))
+
+    def _failure_probability(self, name: str) -> float:
+        if isinstance(self.failure_rate, Mapping):
+            rate = self.failure_rate.get(name)
+            if rate is None and name.endswith("]") and "[" in name:
+                rate = self.failure_rate.get(name[:name.rindex("[")])
+            return rate or 0.0
+        return self.failure_rate
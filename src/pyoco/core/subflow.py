@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Dict, Optional
+
+from .graph import CompactGraph
+from .models import Flow
+
+
+class SubflowPlan:
+    """
+    Execution plan of a flow embedded in another flow as a single task.
+
+    The embedded flow is compiled on first use (a ``CompactGraph`` for DAG
+    flows, a program for control-flow flows) and the result is reused for
+    every later invocation, so a shared segment is not rebuilt per run or per
+    loop iteration. ``params`` are resolved against the parent context when
+    the task starts and layered over the parent's params.
+    """
+
+    def __init__(self, flow: Flow, params: Optional[Dict[str, Any]] = None, output: Optional[str] = None):
+        self.flow = flow
+        self.params = dict(params or {})
+        self.output = output
+        self._graph: Optional[CompactGraph] = None
+        self._program = None
+        self._lock = threading.Lock()
+
+    @property
+    def control_flow(self) -> bool:
+        return self.flow.has_control_flow()
+
+    def graph(self) -> CompactGraph:
+        if self._graph is None:
+            with self._lock:
+                if self._graph is None:
+                    self._graph = self.flow.compile_graph()
+        return self._graph
+
+    def program(self):
+        if self._program is None:
+            with self._lock:
+                if self._program is None:
+                    self._program = self.flow.build_program()
+        return self._program
+
+    def collect(self, results: Dict[str, Any]) -> Any:
+        """
+        Output of one invocation: the ``output`` task's result if set, else the
+        result of the flow's only sink task, else a dict of all sink results.
+        """
+        if self.output:
+            return results.get(self.output)
+        tasks = self.flow.tasks
+        sinks = sorted(
+            task.name for task in tasks
+            if not any(dependent in tasks for dependent in task.dependents)
+        )
+        if len(sinks) == 1:
+            return results.get(sinks[0])
+        return {name: results.get(name) for name in sinks if name in results}
+
+    def __call__(self, ctx):
+        # Tasks need a callable; sub-flow tasks are always dispatched by the engine.
+        raise RuntimeError(f"Sub-flow '{self.flow.name}' must be run by the Engine.")
+
+    def __repr__(self):
+        return f"<SubflowPlan {self.flow.name}>"
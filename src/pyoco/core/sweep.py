@@ -0,0 +1,116 @@
+import concurrent.futures
+import inspect
+import threading
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from .models import Flow, Task
+
+_MISSING = object()
+_NODE_PREFIX = "$node."
+_PARAM_PREFIX = "$ctx.params."
+
+
+class SweepShare:
+    """
+    Task results shared between the runs of one parameter sweep.
+
+    For each task it works out which params the task can depend on: those
+    named by ``$ctx.params.*`` inputs and by auto-wired argument names, plus
+    everything its upstream tasks depend on. Runs whose values for those
+    params are equal execute the task once and share the result.
+
+    Tasks that take ``ctx`` (and so may read or write anything on it), mapped,
+    sub-flow and streaming tasks are never shared, and neither is anything
+    downstream of them. Shared tasks are assumed to be deterministic.
+    """
+
+    def __init__(self, flow: Flow):
+        self.tasks: Dict[str, Task] = {task.name: task for task in flow.tasks}
+        self.consumed: Dict[str, Optional[FrozenSet[str]]] = {}
+        for name in self.tasks:
+            self._analyze(name, set())
+        self._futures: Dict[Tuple, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def key(self, task: Task, params: Dict[str, Any]) -> Optional[Tuple]:
+        """Identity of ``task``'s work under ``params``, or None if it is not shared."""
+        consumed = self.consumed.get(task.name)
+        if consumed is None or self.tasks.get(task.name) is not task:
+            return None
+        try:
+            values = tuple((name, _freeze(params.get(name, _MISSING))) for name in sorted(consumed))
+            hash(values)
+        except TypeError:
+            return None
+        return (task.name, values)
+
+    def claim(self, key: Tuple) -> Tuple[concurrent.futures.Future, bool]:
+        """Return the future for ``key`` and whether the caller must produce it."""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                return future, False
+            future = self._futures[key] = concurrent.futures.Future()
+            return future, True
+
+    def _analyze(self, name: str, visiting: set) -> Optional[FrozenSet[str]]:
+        if name in self.consumed:
+            return self.consumed[name]
+        task = self.tasks[name]
+        if name in visiting:
+            return None
+        visiting.add(name)
+        consumed = self._own_params(task)
+        if consumed is not None:
+            upstream = {dep.name for dep in task.dependencies}
+            upstream.update(self._result_refs(task))
+            for dep in upstream:
+                dep_params = self._analyze(dep, visiting) if dep in self.tasks else None
+                if dep_params is None:
+                    consumed = None
+                    break
+                consumed |= dep_params
+        visiting.discard(name)
+        self.consumed[name] = frozenset(consumed) if consumed is not None else None
+        return self.consumed[name]
+
+    def _own_params(self, task: Task) -> Optional[set]:
+        if task.map_over is not None or task.subflow is not None or task.stream:
+            return None
+        try:
+            signature = inspect.signature(task.func)
+        except (TypeError, ValueError):
+            return None
+        if "ctx" in signature.parameters:
+            return None
+        params = set()
+        for value in task.inputs.values():
+            if isinstance(value, str) and value.startswith(_PARAM_PREFIX):
+                params.add(value[len(_PARAM_PREFIX):])
+        # Auto-wired arguments come from params first, then from results.
+        params.update(name for name in signature.parameters if name not in task.inputs)
+        return params
+
+    def _result_refs(self, task: Task):
+        refs = set()
+        for value in task.inputs.values():
+            if isinstance(value, str) and value.startswith(_NODE_PREFIX):
+                refs.add(value.split(".")[1])
+        try:
+            names = inspect.signature(task.func).parameters
+        except (TypeError, ValueError):
+            names = ()
+        refs.update(name for name in names if name not in task.inputs and name in self.tasks)
+        return refs
+
+
+def _freeze(value: Any) -> Any:
+    # Hashable stand-in; the type keeps 1, 1.0 and True apart.
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((_freeze(k), _freeze(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(_freeze(item) for item in value))
+    hash(value)
+    return (type(value).__name__, value)
@@ -1,20 +1,93 @@
 import importlib
+import importlib.util
 import pkgutil
 import sys
-from typing import Dict, List, Any, Set
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 from ..core.models import Task
 from ..dsl.syntax import TaskWrapper
-from .plugins import PluginRegistry, iter_entry_points
+from .manifest import TaskManifest
+from .plugins import PluginRegistry, entry_point_cache, iter_entry_points
+
+# Index marker for tasks declared with `callable:` in the config.
+_EXPLICIT = object()
+
+
+class _LazyTasks(dict):
+    """
+    Task map of a lazy loader. Holds the tasks imported so far; looking up
+    any other known name imports the module that defines it. ``values()``
+    and ``items()`` import everything.
+    """
+
+    def __init__(self, loader: "TaskLoader"):
+        super().__init__()
+        self._loader = loader
+
+    def __missing__(self, name: str) -> Task:
+        return self._loader._resolve(name)
+
+    def __contains__(self, name) -> bool:
+        return dict.__contains__(self, name) or name in self._loader._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self):
+        return list(dict.fromkeys([*dict.keys(self), *self._loader._index]))
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def values(self):
+        self._loader._load_remaining()
+        return dict.values(self)
+
+    def items(self):
+        self._loader._load_remaining()
+        return dict.items(self)
+
 
 class TaskLoader:
-    def __init__(self, config: Any, strict: bool = False):
+    """
+    Collects tasks from the config's explicit entries, discovery sources and
+    ``pyoco.tasks`` plug-ins.
+
+    With ``lazy`` (or ``discovery.lazy: true`` in the config) nothing is
+    imported up front: ``load()`` builds a task-name -> module index from a
+    ``TaskManifest`` and each module is imported on first lookup of one of
+    its tasks. Plug-in hooks are indexed by the task names they registered
+    in an earlier run (see ``EntryPointCache``). Names missing from the
+    index load the remaining plug-ins and modules.
+    """
+
+    def __init__(self, config: Any, strict: bool = False, lazy: Optional[bool] = None,
+                 manifest: Optional[TaskManifest] = None):
         self.config = config
         self.strict = strict
-        self.tasks: Dict[str, Task] = {}
+        if lazy is None:
+            lazy = bool(getattr(getattr(config, "discovery", None), "lazy", False))
+        self.lazy = lazy
+        self.manifest = manifest
+        self.tasks: Dict[str, Task] = _LazyTasks(self) if lazy else {}
         self._explicit_tasks: Set[str] = set()
         self.plugin_reports: List[Dict[str, Any]] = []
+        self._index: Dict[str, Any] = {}
+        self._modules: List[Tuple[str, Optional[str]]] = []
+        self._imported: Set[str] = set()
+        self._loaded_plugins: Set[Tuple[str, str]] = set()
+        self._complete = False
 
     def load(self):
+        if self.lazy:
+            self._build_index()
+            return
+
         # Load explicitly defined tasks in config FIRST (Higher priority)
         for task_name, task_conf in self.config.tasks.items():
             if task_conf.callable:
@@ -35,8 +108,99 @@ class TaskLoader:
 
         self._load_entry_point_plugins()
 
+    def _build_index(self):
+        if self.manifest is None:
+            self.manifest = TaskManifest()
+        discovery = self.config.discovery
+        for package in discovery.packages:
+            self._modules.extend(self._package_modules(package))
+        for ep in discovery.entry_points:
+            self._modules.append((ep, self._module_origin(ep)))
+        for pattern in discovery.glob_modules:
+            self._modules.extend(self._glob_module_names(pattern))
+
+        # Later sources overwrite earlier ones, as in eager loading.
+        for module_name, filename in self._modules:
+            names = self.manifest.tasks(module_name, filename) if filename else None
+            for name in names or ():
+                self._index[name] = module_name
+        # Plug-ins whose tasks are known from an earlier run load on demand.
+        plugins = entry_point_cache()
+        for ep in iter_entry_points():
+            for name in plugins.plugin_tasks(ep) or ():
+                self._index[name] = ep
+        for task_name, task_conf in self.config.tasks.items():
+            if task_conf.callable:
+                self._index[task_name] = _EXPLICIT
+        self.manifest.save()
+
+    def _resolve(self, name: str) -> Task:
+        source = self._index.get(name)
+        if source is _EXPLICIT:
+            self._load_explicit_task(name, self.config.tasks[name])
+            self._explicit_tasks.add(name)
+        elif isinstance(source, str):
+            self._import_indexed(source)
+        elif source is not None:
+            self._load_plugin(source)
+        if not dict.__contains__(self.tasks, name):
+            self._load_remaining()
+        task = dict.get(self.tasks, name)
+        if task is None:
+            raise KeyError(name)
+        return task
+
+    def _import_indexed(self, module_name: str):
+        if module_name in self._imported:
+            return
+        self._imported.add(module_name)
+        self._load_module(module_name)
+        mod = sys.modules.get(module_name)
+        if mod is not None:
+            names = [name for name, obj in vars(mod).items() if isinstance(obj, (TaskWrapper, Task))]
+            self.manifest.record(module_name, getattr(mod, "__file__", None), names)
+            self.manifest.save()
+
+    def _load_remaining(self):
+        if not self.lazy or self._complete:
+            return
+        self._complete = True
+        for task_name, task_conf in self.config.tasks.items():
+            if task_conf.callable and task_name not in self._explicit_tasks:
+                self._load_explicit_task(task_name, task_conf)
+                self._explicit_tasks.add(task_name)
+        for module_name, _ in self._modules:
+            self._import_indexed(module_name)
+        self._load_entry_point_plugins()
+
+    def _package_modules(self, package_name: str) -> List[Tuple[str, Optional[str]]]:
+        try:
+            spec = importlib.util.find_spec(package_name)
+        except (ImportError, ValueError) as e:
+            spec, error = None, e
+        else:
+            error = "not found"
+        if spec is None:
+            print(f"Warning: Could not import package {package_name}: {error}")
+            return []
+        if spec.submodule_search_locations is None:
+            return [(package_name, spec.origin)]
+        modules = []
+        for finder, name, _ in pkgutil.iter_modules(spec.submodule_search_locations, package_name + "."):
+            sub_spec = finder.find_spec(name)
+            modules.append((name, sub_spec.origin if sub_spec else None))
+        return modules
+
+    def _module_origin(self, module_name: str) -> Optional[str]:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            return None
+        return spec.origin if spec else None
+
     def _register_task(self, name: str, task: Task):
-        if name in self.tasks:
+        # dict.__contains__: a lazy map also "contains" names not imported yet.
+        if dict.__contains__(self.tasks, name):
             if name in self._explicit_tasks:
                 # Explicit wins, ignore implicit
                 return
@@ -78,9 +242,13 @@ class TaskLoader:
             print(f"Warning: Could not import module {module_name}: {e}")
             
     def _load_glob_modules(self, pattern: str):
+        for module_name, _ in self._glob_module_names(pattern):
+            self._load_module(module_name)
+
+    def _glob_module_names(self, pattern: str):
         import glob
         import os
-        
+
         # Pattern is likely a file path glob, e.g. "jobs/*.py"
         # We need to convert file paths to module paths
         files = glob.glob(pattern, recursive=True)
@@ -99,34 +267,41 @@ class TaskLoader:
                 continue
                 
             module_name = rel_path.replace(os.sep, ".")[:-3] # strip .py
-            self._load_module(module_name)
+            yield module_name, os.path.abspath(file_path)
 
     def _load_entry_point_plugins(self):
-        entries = iter_entry_points()
-        for ep in entries:
-            info = {
-                "name": ep.name,
-                "value": ep.value,
-                "module": getattr(ep, "module", ""),
-                "tasks": [],
-                "warnings": [],
-            }
-            registry = PluginRegistry(self, ep.name)
-            try:
-                hook = ep.load()
-                if not callable(hook):
-                    raise TypeError("Entry point must be callable")
-                hook(registry)
-                info["tasks"] = list(registry.records)
-                info["warnings"] = list(registry.warnings)
-                if not registry.records:
-                    info["warnings"].append("no tasks registered")
-            except Exception as exc:
-                info["error"] = str(exc)
-                if self.strict:
-                    raise
-                print(f"Warning: Plugin '{ep.name}' failed to load: {exc}")
-            self.plugin_reports.append(info)
+        for ep in iter_entry_points():
+            self._load_plugin(ep)
+
+    def _load_plugin(self, ep: Any):
+        key = (ep.name, ep.value)
+        if key in self._loaded_plugins:
+            return
+        self._loaded_plugins.add(key)
+        info = {
+            "name": ep.name,
+            "value": ep.value,
+            "module": getattr(ep, "module", ""),
+            "tasks": [],
+            "warnings": [],
+        }
+        registry = PluginRegistry(self, ep.name)
+        try:
+            hook = ep.load()
+            if not callable(hook):
+                raise TypeError("Entry point must be callable")
+            hook(registry)
+            info["tasks"] = list(registry.records)
+            info["warnings"] = list(registry.warnings)
+            entry_point_cache().record_plugin_tasks(ep, registry.registered_names)
+            if not registry.records:
+                info["warnings"].append("no tasks registered")
+        except Exception as exc:
+            info["error"] = str(exc)
+            if self.strict:
+                raise
+            print(f"Warning: Plugin '{ep.name}' failed to load: {exc}")
+        self.plugin_reports.append(info)
 
     def _scan_module(self, module: Any):
         for name, obj in vars(module).items():
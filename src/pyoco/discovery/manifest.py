@@ -0,0 +1,124 @@
+import ast
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ..paths import user_cache_dir
+
+# Callables whose result, bound to a module-level name, is a task.
+TASK_FACTORIES = {"task", "subflow_task", "Task"}
+
+
+def scan_source(source: str) -> List[str]:
+    """
+    Names of the tasks a module defines, found without importing it.
+
+    Recognizes top-level functions decorated with ``@task`` (or
+    ``@task(...)``, ``@pyoco.task``) and top-level assignments of
+    ``task(...)``, ``subflow_task(...)`` or ``Task(...)``. Tasks created
+    dynamically are missed; the loader falls back to importing for those.
+    """
+    names = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if any(_is_factory(decorator) for decorator in node.decorator_list):
+                names.append(node.name)
+        elif isinstance(node, ast.Assign):
+            if isinstance(node.value, ast.Call) and _is_factory(node.value):
+                names.extend(target.id for target in node.targets if isinstance(target, ast.Name))
+        elif isinstance(node, ast.AnnAssign):
+            if isinstance(node.value, ast.Call) and _is_factory(node.value) and isinstance(node.target, ast.Name):
+                names.append(node.target.id)
+    return names
+
+
+def _is_factory(node: ast.expr) -> bool:
+    while isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id in TASK_FACTORIES
+    if isinstance(node, ast.Attribute):
+        return node.attr in TASK_FACTORIES
+    return False
+
+
+class TaskManifest:
+    """
+    Task names per discovered module, persisted as JSON.
+
+    Entries are keyed on the module's source file mtime and size. A module
+    is scanned statically the first time it is seen; once imported, its
+    entry is replaced by the names actually found in the module.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv("PYOCO_TASK_MANIFEST") or user_cache_dir("task_manifest.json"))
+        self._entries: Dict[str, Dict] = self._read()
+        self._dirty = False
+
+    def tasks(self, module: str, filename: str) -> Optional[List[str]]:
+        """Task names defined by ``module``, or None if its source cannot be scanned."""
+        stamp = _stamp(filename)
+        if stamp is None:
+            return None
+        entry = self._entries.get(module)
+        if entry and entry.get("file") == filename and entry.get("stamp") == stamp:
+            return list(entry["tasks"])
+        try:
+            with open(filename, "rb") as fp:
+                names = scan_source(fp.read())
+        except (OSError, SyntaxError, ValueError):
+            return None
+        self._set(module, filename, stamp, names)
+        return names
+
+    def record(self, module: str, filename: Optional[str], names: Iterable[str]):
+        """Store the task names found by importing ``module``."""
+        stamp = _stamp(filename) if filename else None
+        if stamp is None:
+            return
+        names = sorted(names)
+        entry = self._entries.get(module)
+        if entry and entry.get("file") == filename and entry.get("stamp") == stamp and sorted(entry["tasks"]) == names:
+            return
+        self._set(module, filename, stamp, names)
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as fp:
+                json.dump({"version": 1, "modules": self._entries}, fp)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def _set(self, module: str, filename: str, stamp: List[int], names: List[str]):
+        self._entries[module] = {"file": filename, "stamp": stamp, "tasks": names}
+        self._dirty = True
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with self.path.open("r", encoding="utf-8") as fp:
+                payload = json.load(fp)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(payload, dict) or payload.get("version") != 1:
+            return {}
+        modules = payload.get("modules")
+        return modules if isinstance(modules, dict) else {}
+
+
+def _stamp(filename: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
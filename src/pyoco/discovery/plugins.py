@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from importlib import metadata as importlib_metadata
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Type
 
 from ..core.models import Task
 from ..dsl.syntax import TaskWrapper
+from ..paths import user_cache_dir
 
 
 class CallablePluginTask(Task):
@@ -14,13 +19,122 @@ class CallablePluginTask(Task):
         super().__init__(func=func, name=name)
 
 
-def iter_entry_points(group: str = "pyoco.tasks"):
+class EntryPointCache:
+    """
+    Entry points per group, and the task names each plug-in hook registered.
+
+    ``importlib.metadata.entry_points()`` reads the metadata of every
+    installed distribution, so results are persisted as JSON and reused
+    while the environment is unchanged: the cache is keyed on the names and
+    mtimes of the ``*.dist-info``/``*.egg-info`` entries on ``sys.path``.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv("PYOCO_ENTRY_POINT_CACHE") or user_cache_dir("entry_points.json"))
+        self._payload: Optional[Dict[str, Any]] = None
+        self._dirty = False
+
+    def entry_points(self, group: str) -> List[Any]:
+        payload = self._state()
+        cached = payload["groups"].get(group)
+        if cached is None:
+            cached = [[ep.name, ep.value] for ep in _scan_entry_points(group)]
+            payload["groups"][group] = cached
+            self._dirty = True
+            self.save()
+        from importlib.metadata import EntryPoint
+
+        return [EntryPoint(name=name, value=value, group=group) for name, value in cached]
+
+    def plugin_tasks(self, ep: Any) -> Optional[List[str]]:
+        names = self._state()["plugins"].get(_plugin_key(ep))
+        return list(names) if names is not None else None
+
+    def record_plugin_tasks(self, ep: Any, names: List[str]):
+        plugins = self._state()["plugins"]
+        key = _plugin_key(ep)
+        if plugins.get(key) != list(names):
+            plugins[key] = list(names)
+            self._dirty = True
+            self.save()
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as fp:
+                json.dump(self._payload, fp)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def _state(self) -> Dict[str, Any]:
+        if self._payload is None:
+            fingerprint = environment_fingerprint()
+            try:
+                with self.path.open("r", encoding="utf-8") as fp:
+                    payload = json.load(fp)
+            except (OSError, ValueError):
+                payload = None
+            if not isinstance(payload, dict) or payload.get("fingerprint") != fingerprint:
+                payload = {"fingerprint": fingerprint, "groups": {}, "plugins": {}}
+            self._payload = payload
+        return self._payload
+
+
+def environment_fingerprint() -> str:
+    """Digest of the installed distributions' metadata entries on ``sys.path``."""
+    digest = hashlib.sha256()
+    for entry in sys.path:
+        try:
+            with os.scandir(entry or ".") as it:
+                found = [
+                    (item.name, item.stat().st_mtime_ns)
+                    for item in it
+                    if item.name.endswith((".dist-info", ".egg-info"))
+                ]
+        except OSError:
+            continue
+        digest.update(entry.encode("utf-8", "surrogateescape") + b"\0")
+        for name, mtime in sorted(found):
+            digest.update(f"{name}:{mtime}\n".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _scan_entry_points(group: str):
+    from importlib import metadata as importlib_metadata
+
     eps = importlib_metadata.entry_points()
     if hasattr(eps, "select"):
         return list(eps.select(group=group))
     return list(eps.get(group, []))
 
 
+def _plugin_key(ep: Any) -> str:
+    return f"{ep.name}={ep.value}"
+
+
+_entry_point_cache: Optional[EntryPointCache] = None
+
+
+def entry_point_cache() -> EntryPointCache:
+    """Process-wide EntryPointCache (the environment is fingerprinted once)."""
+    global _entry_point_cache
+    if _entry_point_cache is None:
+        _entry_point_cache = EntryPointCache()
+    return _entry_point_cache
+
+
+def iter_entry_points(group: str = "pyoco.tasks"):
+    return entry_point_cache().entry_points(group)
+
+
 def list_available_plugins() -> List[Dict[str, Any]]:
     plugins = []
     for ep in iter_entry_points():
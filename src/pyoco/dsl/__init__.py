@@ -1,3 +1,3 @@
-from .syntax import task
+from .syntax import subflow_task, task
 
-__all__ = ["task"]
+__all__ = ["task", "subflow_task"]
@@ -30,6 +30,10 @@ class Expression:
         object.__setattr__(self, "_python", python_expr)
         object.__setattr__(self, "_code", compile_safely(python_expr))
 
+    def __reduce__(self):
+        # Code objects are not picklable; recompile from the source instead.
+        return (self.__class__, (self.source,))
+
     def evaluate(
         self,
         ctx: Optional[Mapping[str, Any]] = None,
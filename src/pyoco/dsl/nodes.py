@@ -13,11 +13,18 @@ DEFAULT_CASE_VALUE = "__default__"
 class DSLNode:
     """Base class for all DSL AST nodes."""
 
+    def is_control_flow(self) -> bool:
+        """Whether the node needs the control-flow interpreter (vs. plain DAG edges)."""
+        return True
+
 
 @dataclass
 class TaskNode(DSLNode):
     task: Task
 
+    def is_control_flow(self) -> bool:
+        return False
+
 
 @dataclass
 class SubFlowNode(DSLNode):
@@ -35,6 +42,8 @@ class ForEachNode(DSLNode):
     body: SubFlowNode
     source: Expression
     alias: Optional[str] = None
+    prefetch: int = 0
+    chunk: Optional[int] = None
 
 
 @dataclass
@@ -42,6 +51,8 @@ class UntilNode(DSLNode):
     body: SubFlowNode
     condition: Expression
     max_iter: Optional[int] = None
+    interval: Optional[float] = None
+    deferrable: bool = False
 
 
 @dataclass
@@ -54,3 +65,14 @@ class CaseNode(DSLNode):
 class SwitchNode(DSLNode):
     expression: Expression
     cases: List[CaseNode] = field(default_factory=list)
+
+
+@dataclass
+class ParallelNode(DSLNode):
+    """Fork/join block: branches run concurrently and all finish before the next step."""
+
+    branches: List[SubFlowNode] = field(default_factory=list)
+
+    def is_control_flow(self) -> bool:
+        # A block of plain task chains is fully described by DAG edges.
+        return any(step.is_control_flow() for branch in self.branches for step in branch.steps)
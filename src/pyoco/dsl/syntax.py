@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
-from typing import Callable, Iterable, List, Sequence, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-from ..core.models import Task
+from ..core.channels import DEFAULT_STREAM_CAPACITY
+from ..core.models import Flow, Task
+from ..core.subflow import SubflowPlan
 from .expressions import Expression, ensure_expression
 from .nodes import (
     CaseNode,
     DSLNode,
     ForEachNode,
+    ParallelNode,
     RepeatNode,
     SubFlowNode,
     SwitchNode,
@@ -17,6 +21,8 @@ from .nodes import (
     DEFAULT_CASE_VALUE,
 )
 RESERVED_CTX_KEYS = {"params", "results", "scratch", "loop", "loops", "env", "artifacts"}
+FOREACH_OPTIONS = {"prefetch", "chunk"}
+UNTIL_OPTIONS = {"max_iter", "interval", "deferrable"}
 
 
 class FlowFragment:
@@ -24,28 +30,99 @@ class FlowFragment:
     Represents a fragment of a flow (sequence of DSL nodes). Every DSL
     operator returns a FlowFragment so sub-flows can be composed before
     being attached to a Flow.
+
+    Fragments are views over a shared, append-only node buffer: ``a >> b``
+    extends the buffer in place when ``a`` is the newest view of it and only
+    copies when an older prefix is extended again. Entry/exit tasks, the task
+    list and the control-flow flag are cached per view, so chaining ``n``
+    steps costs O(n) overall.
     """
 
-    __slots__ = ("_nodes",)
+    __slots__ = ("_buffer", "_size", "_tasks", "_task_count", "_first", "_last", "_control_flow")
 
     def __init__(self, nodes: Sequence[DSLNode]):
         if not isinstance(nodes, (list, tuple)):
             raise TypeError("FlowFragment expects a list/tuple of nodes.")
-        self._nodes: Tuple[DSLNode, ...] = tuple(nodes)
+        self._buffer: List[DSLNode] = list(nodes)
+        self._size = len(self._buffer)
+        self._tasks: List[Task] = []
+        for node in self._buffer:
+            self._tasks.extend(_collect_tasks(node))
+        self._task_count = len(self._tasks)
+        self._first: List[Task] = []
+        for node in self._buffer:
+            self._first = _entry_tasks(node)
+            if self._first:
+                break
+        self._last: List[Task] = []
+        for node in reversed(self._buffer):
+            self._last = _exit_tasks(node)
+            if self._last:
+                break
+        self._control_flow = any(node.is_control_flow() for node in self._buffer)
+
+    @property
+    def _nodes(self) -> Tuple[DSLNode, ...]:
+        return tuple(self._buffer[: self._size])
 
     # Sequence composition -------------------------------------------------
-    def __rshift__(self, other: Union["FlowFragment", "TaskWrapper", Task]) -> "FlowFragment":
+    def __rshift__(self, other: Union["FlowFragment", "TaskWrapper", Task, "Parallel"]) -> "FlowFragment":
         right = ensure_fragment(other)
         self._link_to(right)
-        return FlowFragment(self._nodes + right._nodes)
+        right_nodes = right._buffer[: right._size]
+        right_tasks = right._tasks[: right._task_count]
+
+        combined = FlowFragment.__new__(FlowFragment)
+        if self._owns_tail():
+            combined._buffer = self._buffer
+            combined._tasks = self._tasks
+        else:
+            combined._buffer = self._buffer[: self._size]
+            combined._tasks = self._tasks[: self._task_count]
+        combined._buffer.extend(right_nodes)
+        combined._tasks.extend(right_tasks)
+        combined._size = len(combined._buffer)
+        combined._task_count = len(combined._tasks)
+        combined._first = self._first or right._first
+        combined._last = right._last or self._last
+        combined._control_flow = self._control_flow or right._control_flow
+        return combined
+
+    def _owns_tail(self) -> bool:
+        # Only the newest view may grow the shared buffers in place. Task
+        # wrappers are long-lived (loaders hand them out), so they never lend
+        # their buffer to a chain.
+        return (
+            not isinstance(self, TaskWrapper)
+            and self._size == len(self._buffer)
+            and self._task_count == len(self._tasks)
+        )
+
+    def __and__(self, other) -> "Parallel":
+        return Parallel([self, other])
 
     # Loop support ---------------------------------------------------------
-    def __getitem__(self, selector: Union[int, str, Expression]) -> "FlowFragment":
+    def __getitem__(
+        self, selector: Union[int, str, Expression, Tuple[str, Dict[str, Any]]]
+    ) -> "FlowFragment":
         """
         Implements [] operator for repeat / for-each loops.
+
+        For-each loops accept an optional options mapping, e.g.
+        ``fragment["$ctx.rows as row", {"prefetch": 64}]`` or
+        ``fragment["$ctx.rows as batch", {"chunk": 10000}]`` to hand the body
+        one slice of the source per iteration.
         """
 
         body = self.to_subflow()
+        if isinstance(selector, tuple):
+            if len(selector) != 2 or not isinstance(selector[0], str) or not isinstance(selector[1], dict):
+                raise ValueError("ForEach tuple selector must be (expression, options).")
+            source, alias = parse_foreach_selector(selector[0])
+            options = parse_foreach_options(selector[1])
+            node = ForEachNode(body=body, source=ensure_expression(source), alias=alias, **options)
+            return FlowFragment([node])
+
         if isinstance(selector, int):
             if selector < 0:
                 raise ValueError("Repeat count must be non-negative.")
@@ -63,25 +140,35 @@ class FlowFragment:
 
         raise TypeError(f"Unsupported loop selector: {selector!r}")
 
-    def __mod__(self, value: Union[str, Expression, Tuple[Union[str, Expression], int]]) -> "FlowFragment":
+    def __mod__(
+        self,
+        value: Union[str, Expression, Tuple[Union[str, Expression], Union[int, Dict[str, Any]]]],
+    ) -> "FlowFragment":
         """
         Implements the % operator for until loops.
+
+        The tuple form accepts either ``max_iter`` or an options mapping such
+        as ``{"max_iter": 100, "interval": 5.0, "deferrable": True}``.
         """
 
-        max_iter = None
+        options: Dict[str, Any] = {}
         expr_value: Union[str, Expression]
 
         if isinstance(value, tuple):
             if len(value) != 2:
-                raise ValueError("Until tuple selector must be (expression, max_iter).")
-            expr_value, max_iter = value
+                raise ValueError("Until tuple selector must be (expression, max_iter) or (expression, options).")
+            expr_value, extra = value
+            if isinstance(extra, dict):
+                options = parse_until_options(extra)
+            else:
+                options = {"max_iter": extra}
         else:
             expr_value = value
 
         node = UntilNode(
             body=self.to_subflow(),
             condition=ensure_expression(expr_value),
-            max_iter=max_iter,
+            **options,
         )
         return FlowFragment([node])
 
@@ -99,37 +186,27 @@ class FlowFragment:
 
     # Helpers --------------------------------------------------------------
     def to_subflow(self) -> SubFlowNode:
-        return SubFlowNode(list(self._nodes))
+        return SubFlowNode(self._buffer[: self._size])
 
     def task_nodes(self) -> List[Task]:
-        tasks: List[Task] = []
-        for node in self._nodes:
-            tasks.extend(_collect_tasks(node))
-        return tasks
+        return self._tasks[: self._task_count]
 
-    def _first_task(self) -> Task | None:
-        for node in self._nodes:
-            tasks = _collect_tasks(node)
-            if tasks:
-                return tasks[0]
-        return None
+    def _first_tasks(self) -> List[Task]:
+        return self._first
 
-    def _last_task(self) -> Task | None:
-        for node in reversed(self._nodes):
-            tasks = _collect_tasks(node)
-            if tasks:
-                return tasks[-1]
-        return None
+    def _last_tasks(self) -> List[Task]:
+        return self._last
 
     def _link_to(self, other: "FlowFragment"):
-        left_task = self._last_task()
-        right_task = other._first_task()
-        if left_task and right_task and left_task is not right_task:
-            right_task.dependencies.add(left_task)
-            left_task.dependents.add(right_task)
+        right_tasks = other._first_tasks()
+        for left_task in self._last_tasks():
+            for right_task in right_tasks:
+                if left_task is not right_task:
+                    right_task.dependencies.add(left_task)
+                    left_task.dependents.add(right_task)
 
     def has_control_flow(self) -> bool:
-        return any(not isinstance(node, TaskNode) for node in self._nodes)
+        return self._control_flow
 
 
 class TaskWrapper(FlowFragment):
@@ -147,13 +224,37 @@ class TaskWrapper(FlowFragment):
     def __call__(self, *args, **kwargs) -> "TaskWrapper":
         return self
 
-    def __and__(self, other):
-        return Parallel([self, other])
+    def map(self, source: Any, arg: Optional[str] = None) -> "TaskWrapper":
+        """
+        Fan this task out over ``source`` at runtime.
+
+        ``source`` is a list or a reference such as ``"$node.list_files.output"``.
+        The engine runs one instance per item (``process[0]``, ``process[1]``, ...)
+        passing the item as ``arg`` (default: the first parameter that is not
+        ``ctx`` or a configured input), and downstream tasks see the gathered list.
+
+        Returns a wrapper over a copy of the task (without its edges), so the
+        decorated task itself stays unmapped for other flows.
+        """
+        mapped = detached_copy(self.task)
+        mapped.map_over = source
+        mapped.map_arg = arg
+        return TaskWrapper(mapped)
 
     def __or__(self, other):
         return Branch([self, other])
 
 
+def detached_copy(task: Task) -> Task:
+    """Copy of ``task`` with its own inputs/outputs and no dependency edges."""
+    clone = copy.copy(task)
+    clone.dependencies = set()
+    clone.dependents = set()
+    clone.inputs = dict(task.inputs)
+    clone.outputs = list(task.outputs)
+    return clone
+
+
 class Branch(list):
     """Represents `A | B` OR-branches (legacy)."""
 
@@ -169,16 +270,46 @@ class Branch(list):
 
 
 class Parallel(list):
-    """Represents `A & B` parallel branches (legacy)."""
+    """
+    Represents `A & B` parallel branches.
+
+    At the top level of a DAG flow it only wires edges (legacy behaviour).
+    Composed into a fragment (`x >> (a & b) >> y`, loop bodies, switch
+    cases) it becomes a ParallelNode fork/join block.
+    """
+
+    def __and__(self, other) -> "Parallel":
+        return Parallel([*self, other])
 
     def __rshift__(self, other):
-        targets = _collect_target_tasks(other)
-        for target in targets:
-            for source in self:
-                if hasattr(source, "task"):
-                    target.dependencies.add(source.task)
-                    source.task.dependents.add(target)
-        return other
+        if isinstance(other, (list, tuple)) and not isinstance(other, Parallel):
+            # Legacy fan-in onto a plain list of targets.
+            targets = _collect_target_tasks(other)
+            for target in targets:
+                for source in self:
+                    if hasattr(source, "task"):
+                        target.dependencies.add(source.task)
+                        source.task.dependents.add(target)
+            return other
+        return self.to_fragment() >> other
+
+    def __getitem__(self, selector):
+        if isinstance(selector, (int, slice)):
+            return super().__getitem__(selector)
+        return self.to_fragment()[selector]
+
+    def __mod__(self, value) -> FlowFragment:
+        return self.to_fragment() % value
+
+    def __rrshift__(self, other) -> CaseNode:
+        return self.to_fragment().__rrshift__(other)
+
+    def to_fragment(self) -> FlowFragment:
+        branches = [ensure_fragment(item).to_subflow() for item in self]
+        return FlowFragment([ParallelNode(branches=branches)])
+
+    def to_subflow(self) -> SubFlowNode:
+        return self.to_fragment().to_subflow()
 
 
 def switch(expression: Union[str, Expression]) -> "SwitchBuilder":
@@ -208,6 +339,8 @@ def ensure_fragment(value: Union[FlowFragment, TaskWrapper, Task]) -> FlowFragme
         return value
     if isinstance(value, TaskWrapper):
         return value
+    if isinstance(value, Parallel):
+        return value.to_fragment()
     if hasattr(value, "task"):
         return FlowFragment([TaskNode(value.task)])
     if isinstance(value, Task):
@@ -228,6 +361,41 @@ def parse_foreach_selector(selector: str) -> Tuple[str, Union[str, None]]:
     return token, alias
 
 
+def parse_foreach_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = set(options) - FOREACH_OPTIONS
+    if unknown:
+        raise ValueError(f"Unknown foreach option(s): {', '.join(sorted(unknown))}.")
+    parsed: Dict[str, Any] = {}
+    if "prefetch" in options:
+        prefetch = options["prefetch"]
+        if not isinstance(prefetch, int) or isinstance(prefetch, bool) or prefetch < 0:
+            raise ValueError("ForEach prefetch must be a non-negative integer.")
+        parsed["prefetch"] = prefetch
+    if "chunk" in options:
+        chunk = options["chunk"]
+        if not isinstance(chunk, int) or isinstance(chunk, bool) or chunk < 1:
+            raise ValueError("ForEach chunk must be a positive integer.")
+        parsed["chunk"] = chunk
+    return parsed
+
+
+def parse_until_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = set(options) - UNTIL_OPTIONS
+    if unknown:
+        raise ValueError(f"Unknown until option(s): {', '.join(sorted(unknown))}.")
+    parsed: Dict[str, Any] = {}
+    if "max_iter" in options:
+        parsed["max_iter"] = options["max_iter"]
+    if "interval" in options:
+        interval = options["interval"]
+        if not isinstance(interval, (int, float)) or isinstance(interval, bool) or interval < 0:
+            raise ValueError("Until interval must be a non-negative number of seconds.")
+        parsed["interval"] = float(interval)
+    if "deferrable" in options:
+        parsed["deferrable"] = bool(options["deferrable"])
+    return parsed
+
+
 def _collect_tasks(obj) -> List[Task]:
     if isinstance(obj, TaskNode):
         return [obj.task]
@@ -247,9 +415,50 @@ def _collect_tasks(obj) -> List[Task]:
         for case in obj.cases:
             tasks.extend(_collect_tasks(case.target))
         return tasks
+    if isinstance(obj, ParallelNode):
+        tasks: List[Task] = []
+        for branch in obj.branches:
+            tasks.extend(_collect_tasks(branch))
+        return tasks
     return []
 
 
+def _entry_tasks(obj) -> List[Task]:
+    """Tasks that an incoming edge should point at (every branch head for parallel blocks)."""
+    if isinstance(obj, ParallelNode):
+        tasks: List[Task] = []
+        for branch in obj.branches:
+            tasks.extend(_entry_tasks(branch))
+        return tasks
+    if isinstance(obj, SubFlowNode):
+        for step in obj.steps:
+            tasks = _entry_tasks(step)
+            if tasks:
+                return tasks
+        return []
+    if isinstance(obj, (RepeatNode, ForEachNode, UntilNode)):
+        return _entry_tasks(obj.body)
+    return _collect_tasks(obj)[:1]
+
+
+def _exit_tasks(obj) -> List[Task]:
+    """Tasks that an outgoing edge should start from (every branch tail for parallel blocks)."""
+    if isinstance(obj, ParallelNode):
+        tasks: List[Task] = []
+        for branch in obj.branches:
+            tasks.extend(_exit_tasks(branch))
+        return tasks
+    if isinstance(obj, SubFlowNode):
+        for step in reversed(obj.steps):
+            tasks = _exit_tasks(step)
+            if tasks:
+                return tasks
+        return []
+    if isinstance(obj, (RepeatNode, ForEachNode, UntilNode)):
+        return _exit_tasks(obj.body)
+    return _collect_tasks(obj)[-1:]
+
+
 def _collect_target_tasks(other) -> List[Task]:
     targets = []
     if hasattr(other, "task"):
@@ -261,8 +470,64 @@ def _collect_target_tasks(other) -> List[Task]:
     return targets
 
 
-def task(func: Callable) -> TaskWrapper:
-    return TaskWrapper(Task(func=func, name=func.__name__))
+def task(
+    func: Optional[Callable] = None,
+    *,
+    stream: Union[bool, int] = False,
+    coalesce: bool = False,
+    inline: bool = False,
+):
+    """
+    Register a function as a task. Usable bare (``@task``) or with options:
+
+    - ``stream``: run a generator task as a producer whose items flow to
+      its dependent through a bounded channel while it is still running.
+      ``True`` uses the default capacity; an int sets the channel capacity.
+      Each item is delivered once, so a streaming task may have only one
+      dependent.
+    - ``coalesce``: while one call of the task is running, other calls with
+      equal resolved inputs (from any run in the process) wait for it and
+      share its result or error instead of executing again. ``ctx`` is not
+      part of the comparison.
+    - ``inline``: run the task directly on the run's scheduler thread, saving
+      the hand-off to a worker. Meant for tasks of microseconds that never
+      block; while one runs, no other task of the run is started. Ignored
+      for streaming tasks and tasks with a timeout.
+    """
+
+    def decorate(inner: Callable) -> TaskWrapper:
+        wrapped = Task(func=inner, name=inner.__name__)
+        if stream:
+            wrapped.stream = DEFAULT_STREAM_CAPACITY if stream is True else int(stream)
+        wrapped.coalesce = coalesce
+        wrapped.inline = inline
+        return TaskWrapper(wrapped)
+
+    if func is None:
+        return decorate
+    return decorate(func)
+
+
+def subflow_task(
+    flow: Flow,
+    name: Optional[str] = None,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    output: Optional[str] = None,
+) -> TaskWrapper:
+    """
+    Embed ``flow`` in another flow as a single task (``parent >> subflow_task(etl)``).
+
+    The embedded flow is compiled once and reused for every invocation. Its
+    tasks run on the parent run's executor with their own context: params are
+    the parent's params overlaid with ``params`` (values may be ``$node``/``$ctx``
+    references into the parent). The task's output, ``$node.<name>.output``,
+    is the ``output`` task's result, the single sink's result, or a dict of
+    sink results. Child task records appear in the parent run as
+    ``<name>.<task>`` once the sub-flow finishes.
+    """
+    plan = SubflowPlan(flow, params=params, output=output)
+    return TaskWrapper(Task(func=plan, name=name or flow.name, subflow=plan))
 
 
-__all__ = ["task", "FlowFragment", "switch", "TaskWrapper", "Branch", "Parallel"]
+__all__ = ["task", "subflow_task", "FlowFragment", "switch", "TaskWrapper", "Branch", "Parallel"]
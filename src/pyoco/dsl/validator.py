@@ -7,6 +7,7 @@ from ..core.models import Flow
 from .nodes import (
     CaseNode,
     ForEachNode,
+    ParallelNode,
     RepeatNode,
     SubFlowNode,
     SwitchNode,
@@ -70,6 +71,9 @@ class FlowValidator:
             self._visit_subflow(node.body, f"{path}.until")
         elif isinstance(node, SwitchNode):
             self._validate_switch(node, path)
+        elif isinstance(node, ParallelNode):
+            for idx, branch in enumerate(node.branches):
+                self._visit_subflow(branch, f"{path}.parallel[{idx}]")
         elif isinstance(node, SubFlowNode):
             self._visit_subflow(node, path)
         else:
@@ -79,6 +83,8 @@ class FlowValidator:
     def _validate_until(self, node: UntilNode, path: str):
         if node.max_iter is None:
             self.report.warnings.append(f"{path}: Until loop missing max_iter (defaults to 1000).")
+        if node.deferrable and not node.interval:
+            self.report.warnings.append(f"{path}: Deferrable until loop has no interval; it will poll back-to-back.")
 
     def _validate_switch(self, node: SwitchNode, path: str):
         seen_values = set()
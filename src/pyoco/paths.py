@@ -0,0 +1,25 @@
+import os
+import sys
+from pathlib import Path
+
+
+def user_cache_dir(*parts: str) -> Path:
+    """
+    Per-user cache directory for pyoco, joined with ``parts``.
+
+    ``$PYOCO_CACHE_DIR`` wins; otherwise the platform's user cache location
+    is used (``$XDG_CACHE_HOME`` or ``~/.cache`` on Linux, ``~/Library/Caches``
+    on macOS, ``%LOCALAPPDATA%`` on Windows). Caches never go into the
+    current project, so read-only commands leave it untouched and a cloned
+    repository cannot ship cache files (pickles) that pyoco would load.
+    """
+    base = os.getenv("PYOCO_CACHE_DIR")
+    if base:
+        return Path(base).joinpath(*parts)
+    if sys.platform == "win32":
+        root = Path(os.getenv("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / "pyoco" / "Cache"
+    elif sys.platform == "darwin":
+        root = Path.home() / "Library" / "Caches" / "pyoco"
+    else:
+        root = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "pyoco"
+    return root.joinpath(*parts)
@@ -1,6 +1,12 @@
+import hashlib
+import os
+import pickle
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
-import yaml
+
+from ..paths import user_cache_dir
+
+CONFIG_CACHE_VERSION = 1
 
 @dataclass
 class TaskConfig:
@@ -18,6 +24,8 @@ class DiscoveryConfig:
     entry_points: List[str] = field(default_factory=list)
     packages: List[str] = field(default_factory=list)
     glob_modules: List[str] = field(default_factory=list)
+    # Import task modules only when a flow references one of their tasks.
+    lazy: bool = False
 
 @dataclass
 class RuntimeConfig:
@@ -32,10 +40,44 @@ class PyocoConfig:
     runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
 
     @classmethod
-    def from_yaml(cls, path: str) -> 'PyocoConfig':
-        with open(path, 'r') as f:
-            data = yaml.safe_load(f)
-        
+    def from_yaml(cls, path: str, cache: bool = True) -> 'PyocoConfig':
+        """
+        Load a flow.yaml. Parsed configs are cached (pickled) under
+        $PYOCO_CONFIG_CACHE_DIR (default: the per-user cache dir), keyed on the file's path, size and mtime,
+        so an unchanged file skips YAML parsing; ``cache=False`` bypasses it.
+        """
+        if not cache:
+            return cls.from_dict(_read_yaml(path))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return cls.from_dict(_read_yaml(path))
+        key = (CONFIG_CACHE_VERSION, os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        cache_path = _config_cache_path(key[1])
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_key, config = pickle.load(f)
+            if cached_key == key and isinstance(config, cls):
+                return config
+        except Exception:
+            pass
+
+        config = cls.from_dict(_read_yaml(path))
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                pickle.dump((key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        return config
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PyocoConfig':
         # Simple manual parsing/validation for MVP
         # In a real app, use pydantic or similar
         
@@ -55,3 +97,18 @@ class PyocoConfig:
             discovery=discovery,
             runtime=runtime
         )
+
+
+def _read_yaml(path: str) -> Dict[str, Any]:
+    import yaml
+
+    # The libyaml loader is an order of magnitude faster on large files.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=loader)
+
+
+def _config_cache_path(abs_path: str) -> str:
+    directory = os.getenv("PYOCO_CONFIG_CACHE_DIR") or str(user_cache_dir("config"))
+    digest = hashlib.sha256(abs_path.encode("utf-8", "surrogateescape")).hexdigest()[:32]
+    return os.path.join(directory, f"{digest}.pickle")
@@ -24,3 +24,6 @@ class TraceBackend(ABC):
 
     def on_node_transition(self, source: str, target: str):
         pass
+
+    def on_concurrency_change(self, limit: int):
+        pass
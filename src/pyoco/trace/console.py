@@ -46,3 +46,9 @@ class ConsoleTraceBackend(TraceBackend):
     def on_node_transition(self, source: str, target: str):
         if self.style == "cute":
             print(f"🐇 {source} -> {target}")
+
+    def on_concurrency_change(self, limit: int):
+        if self.style == "cute":
+            print(f"🎚️ concurrency={limit}")
+        else:
+            print(f"INFO pyoco concurrency limit={limit}")
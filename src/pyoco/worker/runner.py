@@ -164,3 +164,6 @@ class Worker:
             # Heartbeat one last time
             run_ctx.status = RunStatus.FAILED
             self.client.heartbeat(run_ctx)
+        finally:
+            # One engine per job: stop its worker threads with the job.
+            engine.close()
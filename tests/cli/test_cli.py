@@ -22,8 +22,8 @@ def mock_config():
     )
 
 def test_cli_check_valid(mock_config):
-    with patch("pyoco.cli.main.PyocoConfig.from_yaml", return_value=mock_config), \
-         patch("pyoco.cli.main.TaskLoader") as MockLoader, \
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
          patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml"]):
         
         loader = MockLoader.return_value
@@ -39,8 +39,8 @@ def test_cli_check_valid(mock_config):
 def test_cli_check_cycle(mock_config):
     mock_config.flows["main"].graph = "A >> B >> A" # Cycle
     
-    with patch("pyoco.cli.main.PyocoConfig.from_yaml", return_value=mock_config), \
-         patch("pyoco.cli.main.TaskLoader") as MockLoader, \
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
          patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml"]), \
          pytest.raises(SystemExit) as excinfo:
         
@@ -54,8 +54,8 @@ def test_cli_check_cycle(mock_config):
     assert excinfo.value.code == 1
 
 def test_cli_check_dry_run_json(mock_config, capsys):
-    with patch("pyoco.cli.main.PyocoConfig.from_yaml", return_value=mock_config), \
-         patch("pyoco.cli.main.TaskLoader") as MockLoader, \
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
          patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml", "--dry-run", "--json"]):
         
         loader = MockLoader.return_value
@@ -70,11 +70,90 @@ def test_cli_check_dry_run_json(mock_config, capsys):
         data = json.loads(json_payload)
         assert data["status"] == "ok"
 
+def test_cli_check_reports_all_cycles_and_stats(mock_config, capsys):
+    mock_config.flows["main"].graph = "(A >> B >> A, C >> D >> C)"
+
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
+         patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml", "--json"]), \
+         pytest.raises(SystemExit):
+
+        loader = MockLoader.return_value
+        loader.tasks = {name: Task(func=lambda: None, name=name) for name in "ABCD"}
+
+        main()
+
+    out = capsys.readouterr().out
+    data = json.loads(out[out.find("{"):])
+    cycles = sorted(e for e in data["errors"] if e.startswith("Cycle detected"))
+    assert cycles == [
+        "Cycle detected involving tasks: A, B.",
+        "Cycle detected involving tasks: C, D.",
+    ]
+    assert data["stats"]["nodes"] == 4
+    assert data["stats"]["edges"] == 4
+    assert data["stats"]["depth"] is None
+
+
+def test_cli_check_reports_graph_stats(mock_config, capsys):
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
+         patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml", "--json"]):
+
+        loader = MockLoader.return_value
+        loader.tasks = {
+            "A": Task(func=lambda: None, name="A"),
+            "B": Task(func=lambda: None, name="B")
+        }
+
+        main()
+
+    out = capsys.readouterr().out
+    stats = json.loads(out[out.find("{"):])["stats"]
+    assert stats == {
+        "nodes": 2,
+        "edges": 1,
+        "depth": 2,
+        "max_width": 1,
+        "critical_path_length": 2.0,
+        "critical_path": ["A", "B"],
+    }
+
+def test_cli_check_estimate_uses_history(mock_config, capsys, tmp_path):
+    history = tmp_path / "run.json"
+    history.write_text(json.dumps({
+        "flow_name": "main",
+        "task_records": {
+            "A": {"state": "SUCCEEDED", "duration_ms": 100.0},
+            "B": {"state": "SUCCEEDED", "duration_ms": 50.0},
+        },
+    }))
+
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
+         patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml", "--json",
+                            "--estimate", "--jobs", "4", "--history", str(history)]):
+
+        loader = MockLoader.return_value
+        loader.tasks = {
+            "A": Task(func=lambda: None, name="A"),
+            "B": Task(func=lambda: None, name="B")
+        }
+
+        main()
+
+    out = capsys.readouterr().out
+    estimate = json.loads(out[out.find("{"):])["estimate"]
+    assert estimate["jobs"] == 4
+    assert estimate["makespan_ms"] == 150.0
+    assert estimate["critical_path"] == ["A", "B"]
+    assert estimate["missing"] == []
+
 def test_cli_check_dry_run_error(mock_config):
     mock_config.flows["main"].graph = "flow >> switch('$ctx.params.flag')[('*' >> A, '*' >> B)]"
     
-    with patch("pyoco.cli.main.PyocoConfig.from_yaml", return_value=mock_config), \
-         patch("pyoco.cli.main.TaskLoader") as MockLoader, \
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
          patch("sys.argv", ["pyoco", "check", "--config", "dummy.yaml", "--dry-run"]), \
          pytest.raises(SystemExit) as excinfo:
         
@@ -96,7 +175,7 @@ def test_cli_runs_inspect_json(capsys):
         "tasks": {"t1": "SUCCEEDED"},
         "task_records": {"t1": {"state": "SUCCEEDED"}}
     }
-    with patch("pyoco.cli.main.Client") as MockClient, \
+    with patch("pyoco.client.Client") as MockClient, \
          patch("sys.argv", ["pyoco", "runs", "inspect", "abc", "--json"]):
         MockClient.return_value.get_run.return_value = fake_run
         main()
@@ -112,7 +191,7 @@ def test_cli_runs_logs_tail(capsys):
             {"seq": 1, "task": "t1", "stream": "stderr", "text": "oops\n"}
         ]
     }
-    with patch("pyoco.cli.main.Client") as MockClient, \
+    with patch("pyoco.client.Client") as MockClient, \
          patch("sys.argv", ["pyoco", "runs", "logs", "abc", "--tail", "1"]):
         MockClient.return_value.get_run_logs.return_value = fake_logs
         main()
@@ -120,9 +199,9 @@ def test_cli_runs_logs_tail(capsys):
         assert "oops" in output
 
 def test_cli_run_params(mock_config):
-    with patch("pyoco.cli.main.PyocoConfig.from_yaml", return_value=mock_config), \
-         patch("pyoco.cli.main.TaskLoader") as MockLoader, \
-         patch("pyoco.cli.main.Engine") as MockEngine, \
+    with patch("pyoco.schemas.config.PyocoConfig.from_yaml", return_value=mock_config), \
+         patch("pyoco.discovery.loader.TaskLoader") as MockLoader, \
+         patch("pyoco.core.engine.Engine") as MockEngine, \
          patch("sys.argv", ["pyoco", "run", "--config", "dummy.yaml", "--param", "x=2", "--param", "y=3"]):
         
         loader = MockLoader.return_value
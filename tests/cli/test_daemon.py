@@ -0,0 +1,159 @@
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pyoco.cli.daemon import RunnerDaemon, default_socket_path, request, submit_run
+from pyoco.cli.main import main
+
+JOBS = """
+import time
+from pyoco import task
+
+@task
+def greet(ctx):
+    print(f"hello from {{ctx.params.get('who')}}")
+    return "{greeting}"
+
+@task
+def slow(ctx):
+    # Every loaded task joins the flow; only the "slow" flow waits.
+    for _ in range(100 if ctx.params.get("wait") else 0):
+        if ctx.is_cancelled:
+            return "cancelled"
+        time.sleep(0.02)
+"""
+
+CONFIG = """
+version: 1
+flows:
+  main:
+    graph: |
+      flow >> greet
+    defaults: {who: daemon}
+  slow:
+    graph: |
+      flow >> slow
+    defaults: {wait: true}
+  forward:
+    graph: |
+      flow >> greet >> slow
+  backward:
+    graph: |
+      flow >> slow >> greet
+tasks:
+  greet:
+    callable: "daemon_jobs:greet"
+  slow:
+    callable: "daemon_jobs:slow"
+"""
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    (tmp_path / "daemon_jobs.py").write_text(JOBS.format(greeting="hi"))
+    (tmp_path / "flow.yaml").write_text(CONFIG)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PYOCO_CONFIG_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    runner = RunnerDaemon(str(tmp_path / "d.sock"))
+    thread = threading.Thread(target=runner.serve_forever, daemon=True)
+    thread.start()
+    assert runner.ready.wait(timeout=5)
+    yield runner
+    request(runner.socket_path, {"cmd": "stop"})
+    thread.join(timeout=2)
+    sys.modules.pop("daemon_jobs", None)
+
+
+def _run(daemon, flow="main", **params):
+    out, err = io.StringIO(), io.StringIO()
+    result = submit_run(daemon.socket_path, "flow.yaml", flow, params, cute=False, stdout=out, stderr=err)
+    return result, out.getvalue()
+
+
+def test_runs_stream_output_and_reuse_the_loaded_config(daemon):
+    result, output = _run(daemon)
+    assert result["status"] == "COMPLETED"
+    assert "INFO pyoco start flow=main" in output
+    assert "hello from daemon" in output
+
+    workspace = next(iter(daemon.workspaces.values()))
+    result, output = _run(daemon, who="cli")
+    assert result["status"] == "COMPLETED"
+    assert "hello from cli" in output
+    assert next(iter(daemon.workspaces.values())) is workspace
+    assert request(daemon.socket_path, {"cmd": "status"})["runs"] == 2
+
+
+def test_edited_task_module_is_reloaded(daemon, tmp_path):
+    _run(daemon)
+    module = tmp_path / "daemon_jobs.py"
+    module.write_text(JOBS.format(greeting="bye"))
+    stat = module.stat()
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    _run(daemon)
+    workspace = next(iter(daemon.workspaces.values()))
+    assert workspace.loader.tasks["greet"].func(type("Ctx", (), {"params": {"who": "x"}})()) == "bye"
+
+
+def test_unknown_flow_and_cancellation(daemon):
+    result, _ = _run(daemon, flow="missing")
+    assert result["status"] == "FAILED"
+    assert "not found" in result["error"]
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(daemon.socket_path)
+        run = {"cmd": "run", "config": os.path.abspath("flow.yaml"), "cwd": os.getcwd(), "flow": "slow", "params": {}}
+        sock.sendall((json.dumps(run) + "\n").encode())
+        replies = sock.makefile("r")
+        while "start node=slow" not in json.loads(replies.readline()).get("text", ""):
+            pass
+        sock.sendall(b'{"cmd": "cancel"}\n')
+        result = [json.loads(line) for line in replies if '"result"' in line][0]
+    assert result["status"] == "CANCELLED", result
+
+
+def test_cli_run_daemon_flag(daemon, capsys):
+    with patch("sys.argv", ["pyoco", "run", "--config", "flow.yaml", "--daemon", "--socket", daemon.socket_path,
+                            "--param", "who=flag"]):
+        main()
+    assert "hello from flag" in capsys.readouterr().out
+
+    with patch("sys.argv", ["pyoco", "run", "--config", "flow.yaml", "--daemon", "--socket", "/nonexistent.sock"]), \
+         pytest.raises(SystemExit) as excinfo:
+        main()
+    assert excinfo.value.code == 1
+
+
+def test_flows_over_shared_tasks_do_not_affect_each_other(daemon):
+    for flow in ("forward", "backward", "forward", "main"):
+        result, output = _run(daemon, flow=flow)
+        assert result["status"] == "COMPLETED", output
+
+    workspace = next(iter(daemon.workspaces.values()))
+    assert not workspace.loader.tasks["greet"].dependencies
+    assert daemon.engine is not None and daemon.runs == 4
+
+
+def test_default_socket_lives_in_a_private_runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("PYOCO_DAEMON_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert default_socket_path() == str(tmp_path / "pyoco-daemon.sock")
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    path = default_socket_path()
+    assert os.path.dirname(path) == str(tmp_path / f"pyoco-{os.getuid()}")
+    assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+
+    os.chmod(os.path.dirname(path), 0o755)
+    with pytest.raises(RuntimeError):
+        default_socket_path()
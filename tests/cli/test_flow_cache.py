@@ -0,0 +1,206 @@
+import os
+import runpy
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from pyoco.cli.flow_cache import FlowCache, build_flow
+from pyoco.cli.main import main
+from pyoco.core.engine import Engine
+from pyoco.core.models import Flow
+from pyoco.dsl.syntax import TaskWrapper, switch
+
+JOBS = """
+from pyoco import task
+
+@task
+def numbers():
+    return [1, 2, 3]
+
+@task
+def square(item):
+    return item * item
+
+@task
+def emit(ctx):
+    return ctx.params.get("mode")
+"""
+
+CONFIG = """
+version: 1
+flows:
+  main:
+    graph: |
+      flow >> numbers >> square.map("$node.numbers.output")
+  loop:
+    graph: |
+      flow >> switch("$ctx.params.mode")["a" >> emit, "*" >> numbers] >> emit[2]
+    defaults:
+      mode: a
+discovery:
+  glob_modules: ["cached_jobs.py"]
+"""
+
+
+def _load_tasks(path):
+    # A fresh module namespace per call, like a new CLI process.
+    namespace = runpy.run_path(str(path))
+    return {name: obj.task for name, obj in namespace.items() if isinstance(obj, TaskWrapper)}
+
+
+def _builder(graph, name, tasks, calls):
+    def build():
+        calls.append(name)
+        flow = Flow(name=name)
+        for t in tasks.values():
+            flow.add_task(t)
+        scope = {n: TaskWrapper(t) for n, t in tasks.items()}
+        scope.update(flow=flow, switch=switch)
+        exec(graph, {}, scope)
+        return flow
+    return build
+
+
+def _project(tmp_path):
+    jobs = tmp_path / "cached_jobs.py"
+    jobs.write_text(JOBS)
+    config = tmp_path / "flow.yaml"
+    config.write_text(CONFIG)
+    return jobs, config
+
+
+def test_unchanged_flow_is_served_from_cache(tmp_path):
+    jobs, config = _project(tmp_path)
+    cache = FlowCache(tmp_path / "cache")
+    graph = 'flow >> numbers >> square.map("$node.numbers.output")'
+    calls = []
+
+    for _ in range(3):
+        tasks = _load_tasks(jobs)
+        flow = cache.load_or_build(str(config), "main", tasks, _builder(graph, "main", tasks, calls))
+        ctx = Engine().run(flow)
+        assert ctx.results["square"] == [1, 4, 9]
+        square = next(t for t in flow.tasks if t.name == "square")
+        assert square.dependencies == {tasks["numbers"]}
+
+    assert calls == ["main"]
+
+
+def test_control_flow_program_round_trips(tmp_path):
+    jobs, config = _project(tmp_path)
+    cache = FlowCache(tmp_path / "cache")
+    graph = 'flow >> switch("$ctx.params.mode")["a" >> emit, "*" >> numbers] >> emit[2]'
+    calls = []
+
+    for _ in range(2):
+        tasks = _load_tasks(jobs)
+        flow = cache.load_or_build(str(config), "loop", tasks, _builder(graph, "loop", tasks, calls))
+        assert flow.has_control_flow()
+        ctx = Engine().run(flow, params={"mode": "a"})
+        assert ctx.results["emit"] == "a"
+
+    assert calls == ["loop"]
+
+
+def test_config_or_task_source_changes_invalidate(tmp_path):
+    jobs, config = _project(tmp_path)
+    cache = FlowCache(tmp_path / "cache")
+    graph = 'flow >> numbers >> square.map("$node.numbers.output")'
+    calls = []
+
+    def load():
+        tasks = _load_tasks(jobs)
+        return cache.load_or_build(str(config), "main", tasks, _builder(graph, "main", tasks, calls))
+
+    load()
+    config.write_text(CONFIG + "\n# edited\n")
+    load()
+    assert len(calls) == 2
+
+    stat = jobs.stat()
+    os.utime(jobs, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    load()
+    assert len(calls) == 3
+    load()
+    assert len(calls) == 3
+
+    # Corrupt entries are rebuilt rather than failing the run.
+    cache.entry_path(str(config), "main").write_bytes(b"not a pickle")
+    load()
+    assert len(calls) == 4
+
+
+def test_graph_embeds_config_flows_as_subflows(tmp_path):
+    jobs, config = _project(tmp_path)
+    loader = SimpleNamespace(tasks=_load_tasks(jobs))
+    graphs = {
+        "main": 'flow >> numbers >> square.map("$node.numbers.output")',
+        "outer": 'flow >> subflow("main", "inner") >> emit',
+    }
+
+    flow = build_flow("outer", graphs["outer"], loader, lazy=True, flows=graphs)
+    ctx = Engine().run(flow)
+    assert ctx.results["inner"] == [1, 4, 9]
+    assert {t.name for t in flow.tasks} == {"inner", "emit"}
+
+    cyclic = {"a": 'flow >> subflow("b")', "b": 'flow >> subflow("a")'}
+    with pytest.raises(ValueError, match="a -> b -> a"):
+        build_flow("a", cyclic["a"], loader, flows=cyclic)
+
+    cache = FlowCache(tmp_path / "cache")
+    cache.load_or_build(str(config), "outer", loader.tasks, lambda: flow)
+    assert not cache.entry_path(str(config), "outer").exists()
+
+
+def test_cli_run_uses_flow_cache(tmp_path, monkeypatch, capsys):
+    jobs, config = _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PYOCO_FLOW_CACHE_DIR", str(tmp_path / "cache"))
+
+    for _ in range(2):
+        sys.modules.pop("cached_jobs", None)
+        with patch("sys.argv", ["pyoco", "check", "--config", str(config), "--json"]):
+            main()
+
+    entry = FlowCache().entry_path(str(config), "main")
+    assert entry.exists()
+    built, cached = capsys.readouterr().out.split("Checking flow 'main'...")[1:]
+    assert built == cached
+
+    with patch("sys.argv", ["pyoco", "run", "--config", str(config), "--non-cute"]), \
+         patch("pyoco.core.engine.Engine") as MockEngine:
+        main()
+    sys.modules.pop("cached_jobs", None)
+    flow, _ = MockEngine.return_value.run.call_args.args
+    assert {t.name for t in flow.tasks} == {"numbers", "square", "emit"}
+    square = next(t for t in flow.tasks if t.name == "square")
+    assert square.map_over == "$node.numbers.output"
+    assert [t.name for t in square.dependencies] == ["numbers"]
+
+
+def test_cli_run_hit_skips_config_parsing_and_discovery(tmp_path, monkeypatch):
+    jobs, config = _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    argv = ["pyoco", "run", "--config", str(config), "--flow", "loop", "--param", "extra=1"]
+
+    sys.modules.pop("cached_jobs", None)
+    with patch("sys.argv", argv), patch("pyoco.core.engine.Engine"):
+        main()
+
+    sys.modules.pop("cached_jobs", None)
+    with patch("sys.argv", argv), \
+         patch("pyoco.schemas.config.PyocoConfig.from_yaml", side_effect=AssertionError("parsed")), \
+         patch("pyoco.discovery.loader.TaskLoader", side_effect=AssertionError("discovered")), \
+         patch("pyoco.core.engine.Engine") as MockEngine:
+        main()
+    sys.modules.pop("cached_jobs", None)
+
+    flow, params = MockEngine.return_value.run.call_args.args
+    assert params == {"mode": "a", "extra": "1"}
+    assert flow.has_control_flow()
+    assert {t.name for t in flow.tasks} == {"numbers", "square", "emit"}
+    assert next(t for t in flow.tasks if t.name == "emit").func.__module__ == "cached_jobs"
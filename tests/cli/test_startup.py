@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "httpx", "fastapi", "prometheus_client", "uvicorn", "yaml",
+    "pyoco.core.engine", "pyoco.core.graph", "pyoco.dsl.syntax", "pyoco.discovery.loader", "pyoco.client",
+]
+
+HELP = """
+import json, sys
+sys.argv = ["pyoco", *json.loads(sys.argv[1])]
+from pyoco.cli.main import main
+try:
+    main()
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _python(*args):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    src = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.abspath(src), env.get("PYTHONPATH")]))
+    return subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["run", "--help"], ["check", "--help"], ["runs", "list", "--help"]])
+def test_help_imports_no_heavy_dependencies(argv):
+    modules = set(json.loads(_python("-c", HELP, json.dumps(argv)).stdout.splitlines()[-1]))
+    assert not modules & set(HEAVY_MODULES)
+
+
+def test_package_import_is_lazy():
+    out = _python("-c", "import json, sys, pyoco; print(json.dumps(sorted(sys.modules)))").stdout
+    assert "pyoco.core.engine" not in json.loads(out)
+    out = _python("-c", "from pyoco import Flow, task; print(Flow.__module__, task.__module__)").stdout
+    assert out.split() == ["pyoco.core.models", "pyoco.dsl.syntax"]
+
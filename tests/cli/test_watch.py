@@ -0,0 +1,109 @@
+import os
+import sys
+
+import pytest
+
+from pyoco.cli.watch import FlowWatcher
+from pyoco.core.engine import Engine
+from pyoco.core.models import RunStatus
+from pyoco.trace.backend import TraceBackend
+
+JOBS = """
+from pyoco import task
+
+def _log(name):
+    with open("calls.txt", "a") as fp:
+        fp.write(name + "\\n")
+
+@task
+def extract(ctx):
+    _log("extract")
+    return {extract}
+
+@task
+def transform(ctx):
+    _log("transform")
+    return ctx.results["extract"] * {factor}
+
+@task
+def report(ctx):
+    _log("report")
+    return "report"
+"""
+
+CONFIG = """
+version: 1
+flows:
+  main:
+    graph: |
+      flow >> extract >> transform
+discovery:
+  glob_modules: ["watch_jobs.py"]
+"""
+
+
+class _Quiet(TraceBackend):
+    def on_flow_start(self, name, run_id=None): pass
+    def on_flow_end(self, name): pass
+    def on_node_start(self, node_name): pass
+    def on_node_end(self, node_name, duration_ms): pass
+    def on_node_error(self, node_name, error): pass
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PYOCO_CONFIG_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "flow.yaml").write_text(CONFIG)
+    _write_jobs(tmp_path, extract=2, factor=10)
+    yield tmp_path
+    sys.modules.pop("watch_jobs", None)
+
+
+def _write_jobs(root, **values):
+    path = root / "watch_jobs.py"
+    old = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(JOBS.format(**values))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, old + 1_000_000_000)))
+
+
+def _calls(root):
+    path = root / "calls.txt"
+    calls = sorted(path.read_text().split()) if path.exists() else []
+    path.unlink(missing_ok=True)
+    return calls
+
+
+def test_only_changed_tasks_and_dependents_rerun(workspace):
+    watcher = FlowWatcher("flow.yaml", "main", engine=Engine(trace_backend=_Quiet()))
+    run = watcher.run()
+    assert run.status == RunStatus.COMPLETED
+    assert _calls(workspace) == ["extract", "report", "transform"]
+    assert watcher.changed_files() == []
+
+    _write_jobs(workspace, extract=2, factor=100)
+    changed = watcher.changed_files()
+    assert [os.path.basename(path) for path in changed] == ["watch_jobs.py"]
+    watcher.run(changed)
+    assert _calls(workspace) == ["transform"]
+    assert watcher.results["transform"] == 200
+
+    _write_jobs(workspace, extract=3, factor=100)
+    watcher.run(watcher.changed_files())
+    assert _calls(workspace) == ["extract", "transform"]
+    assert watcher.results == {"extract": 3, "transform": 300, "report": "report"}
+
+
+def test_config_change_reruns_everything(workspace):
+    watcher = FlowWatcher("flow.yaml", "main", engine=Engine(trace_backend=_Quiet()))
+    watcher.run()
+    _calls(workspace)
+
+    config = workspace / "flow.yaml"
+    config.write_text(CONFIG + "\n# edited\n")
+    stat = config.stat()
+    os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    watcher.run(watcher.changed_files())
+    assert _calls(workspace) == ["extract", "report", "transform"]
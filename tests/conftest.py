@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(tmp_path, monkeypatch):
+    # Keep pyoco's on-disk caches out of the user's cache dir and the checkout.
+    cache = tmp_path / "pyoco-cache"
+    monkeypatch.setenv("PYOCO_CACHE_DIR", str(cache))
+    monkeypatch.setenv("PYOCO_FLOW_CACHE_DIR", str(cache / "flows"))
+    monkeypatch.setenv("PYOCO_CONFIG_CACHE_DIR", str(cache / "config"))
+    monkeypatch.setenv("PYOCO_ENTRY_POINT_CACHE", str(cache / "entry_points.json"))
+    monkeypatch.setenv("PYOCO_TASK_MANIFEST", str(cache / "task_manifest.json"))
@@ -0,0 +1,54 @@
+import pytest
+
+from pyoco.core.concurrency import ConcurrencyController
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _window(controller, clock, latency_ms, seconds=1.0, saturated=True):
+    clock.now += seconds
+    for _ in range(max(controller.limit, controller.window)):
+        controller.observe(latency_ms, saturated)
+
+
+def test_grows_while_saturated_and_backs_off_on_latency_and_congestion():
+    clock = _Clock()
+    changes = []
+    controller = ConcurrencyController(2, 10, initial=4, on_change=changes.append, clock=clock)
+
+    _window(controller, clock, 10)
+    assert controller.limit == 5
+    _window(controller, clock, 12, seconds=0.5)  # more calls per second: keep growing
+    assert controller.limit == 6
+    _window(controller, clock, 10, seconds=0.5, saturated=False)
+    assert controller.limit == 6
+
+    _window(controller, clock, 50)  # latency far above the baseline
+    assert controller.limit == 4
+
+    controller.congestion()
+    controller.congestion()  # once per window
+    assert controller.limit == 2
+    controller.congestion()
+    assert controller.limit == 2  # min bound
+    assert changes == [5, 6, 4, 2]
+
+
+def test_undoes_an_increase_that_lowered_throughput():
+    clock = _Clock()
+    controller = ConcurrencyController(1, 10, initial=8, clock=clock)
+    _window(controller, clock, 10, seconds=1.0)
+    assert controller.limit == 9
+    _window(controller, clock, 10, seconds=2.0)
+    assert controller.limit == 8
+
+
+def test_rejects_invalid_bounds():
+    with pytest.raises(ValueError):
+        ConcurrencyController(4, 2)
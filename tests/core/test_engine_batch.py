@@ -0,0 +1,281 @@
+import concurrent.futures
+import inspect
+import threading
+import time
+
+import pytest
+
+from pyoco import task
+from pyoco.core.engine import Engine
+from pyoco.core.models import Flow, RunStatus, Task
+from pyoco.core.simulation import NullTraceBackend
+from pyoco.core.sweep import SweepShare
+
+
+def _sweep_flow(running, peak, lock):
+    def work(ctx):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        if ctx.params["x"] == 3:
+            raise ValueError("bad x")
+        return ctx.params["x"] * 10
+
+    def report(ctx):
+        return f"x={ctx.params['x']} -> {ctx.results['work']}"
+
+    flow = Flow(name="sweep")
+    flow >> Task(func=work, name="work") >> Task(func=report, name="report")
+    return flow
+
+
+def test_map_runs_each_params_dict_with_its_own_context():
+    running, peak, lock = [], [], threading.Lock()
+    flow = _sweep_flow(running, peak, lock)
+
+    handles = Engine(trace_backend=NullTraceBackend()).map(flow, [{"x": i} for i in range(6)], max_concurrent_runs=2)
+
+    assert [h.status for h in handles] == [RunStatus.COMPLETED] * 3 + [RunStatus.FAILED] + [RunStatus.COMPLETED] * 2
+    assert handles[4].result().results["report"] == "x=4 -> 40"
+    assert handles[0].result().params == {"x": 0}
+    assert len({h.run_id for h in handles}) == 6
+    with pytest.raises(ValueError):
+        handles[3].result()
+    assert max(peak) == 2
+
+
+def test_submit_and_cancel_a_queued_run():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def block(ctx):
+        started.set()
+        release.wait(5)
+
+    def record(ctx):
+        calls.append(ctx.params)
+
+    engine = Engine(trace_backend=NullTraceBackend(), max_concurrent_runs=1)
+    first = engine.submit(_flow(block))
+    queued = engine.submit(_flow(record), {"n": 1})
+    started.wait(5)
+    queued.cancel()
+    release.set()
+
+    assert first.result(timeout=5).run_context.status == RunStatus.COMPLETED
+    with pytest.raises(concurrent.futures.CancelledError):
+        queued.result(timeout=5)
+    assert queued.status == RunStatus.CANCELLED
+    assert calls == []
+
+
+def _flow(func):
+    flow = Flow(name=func.__name__)
+    flow.add_task(Task(func=func, name=func.__name__))
+    return flow
+
+
+def test_shared_prefix_runs_once_per_distinct_inputs():
+    calls = []
+    lock = threading.Lock()
+
+    def counted(name, func):
+        def run(*args, **kwargs):
+            with lock:
+                calls.append(name)
+            time.sleep(0.02)
+            return func(*args, **kwargs)
+        run.__signature__ = inspect.signature(func)
+        return Task(func=run, name=name)
+
+    load = counted("load", lambda dataset: f"rows({dataset})")
+    train = counted("train", lambda data, lr: f"{data} @ {lr}")
+    train.inputs = {"data": "$node.load.output", "lr": "$ctx.params.lr"}
+    audit = counted("audit", lambda ctx: ctx.params["lr"])
+    flow = Flow(name="sweep")
+    flow >> load >> train >> audit
+
+    share = SweepShare(flow)
+    assert share.consumed == {"load": {"dataset"}, "train": {"dataset", "lr"}, "audit": None}
+
+    sweep = [{"dataset": "a", "lr": lr} for lr in (0.1, 0.2, 0.1)] + [{"dataset": "b", "lr": 0.1}]
+    handles = Engine(trace_backend=NullTraceBackend()).map(flow, sweep, share_results=True)
+
+    assert all(h.status == RunStatus.COMPLETED for h in handles)
+    assert [h.result().results["train"] for h in handles] == [
+        "rows(a) @ 0.1", "rows(a) @ 0.2", "rows(a) @ 0.1", "rows(b) @ 0.1"
+    ]
+    assert sorted(calls) == ["audit"] * 4 + ["load"] * 2 + ["train"] * 3
+
+
+def test_map_releases_slot_and_share_when_submit_fails(monkeypatch):
+    flow = Flow(name="one")
+    flow.add_task(Task(func=lambda: "ok", name="only"))
+    engine = Engine(trace_backend=NullTraceBackend())
+    submit = engine.submit
+    releases = []
+
+    class Slots(threading.BoundedSemaphore):
+        def release(self, n=1):
+            releases.append(n)
+            super().release(n)
+
+    def failing_submit(flow, params, run_context=None):
+        if params["n"] == 1:
+            raise RuntimeError("pool gone")
+        return submit(flow, params, run_context=run_context)
+
+    monkeypatch.setattr(engine, "submit", failing_submit)
+    monkeypatch.setattr(threading, "BoundedSemaphore", Slots)
+    with pytest.raises(RuntimeError, match="pool gone"):
+        engine.map(flow, [{"n": 0}, {"n": 1}], max_concurrent_runs=1, share_results=True)
+
+    assert len(releases) == 2  # one for the finished run, one for the failed submit
+    assert engine._shares == {}
+    engine.close()
+
+
+def test_coalescing_task_executes_once_for_concurrent_equal_inputs():
+    calls = []
+    gate = threading.Barrier(6, timeout=5)
+
+    @task(coalesce=True)
+    def extract(source):
+        calls.append(source)
+        time.sleep(0.2)
+        return f"data from {source}"
+
+    def enter(ctx):
+        # Make every run reach `extract` while the first call is in flight.
+        gate.wait()
+
+    flow = Flow(name="herd")
+    flow >> Task(func=enter, name="enter") >> extract
+
+    sweep = [{"source": "s3"}] * 5 + [{"source": "gcs"}]
+    handles = Engine(trace_backend=NullTraceBackend()).map(flow, sweep, max_concurrent_runs=6)
+
+    assert [h.result().results["extract"] for h in handles] == ["data from s3"] * 5 + ["data from gcs"]
+    assert sorted(calls) == ["gcs", "s3"]
+
+
+def test_runs_share_long_lived_workers_fairly():
+    order = []
+    threads = set()
+
+    def step(name):
+        def run():
+            threads.add(threading.current_thread().name)
+            order.append(name)
+            time.sleep(0.01)
+        return Task(func=run, name=name)
+
+    wide = Flow(name="wide")
+    for i in range(8):
+        wide.add_task(step(f"wide{i}"))
+
+    with Engine(trace_backend=NullTraceBackend(), max_workers=1) as engine:
+        first = engine.submit(wide)
+        while not order:
+            time.sleep(0.001)
+        engine.run(_flow(lambda: order.append("late")))
+        first.result(timeout=5)
+        engine.run(wide)
+
+    # The late run is served in turn instead of after every queued task of the first.
+    assert order.index("late") <= 3
+    assert len(threads) == 1
+    with pytest.raises(RuntimeError):
+        engine.submit(wide)
+
+
+def test_worker_threads_do_not_outlive_their_engines():
+    import gc
+
+    import pyoco
+
+    flow = Flow(name="threads")
+    flow.add_task(Task(func=lambda: "ok", name="only"))
+    gc.collect()  # Engines dropped by earlier tests may still hold workers.
+    baseline = threading.active_count()
+
+    for _ in range(5):
+        Engine(trace_backend=NullTraceBackend()).run(flow)  # dropped without close()
+        pyoco.run(flow, trace=False)
+    gc.collect()
+
+    deadline = time.monotonic() + 2
+    while threading.active_count() > baseline and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() <= baseline
+
+
+def test_inline_tasks_run_on_the_scheduler_thread():
+    threads = {}
+
+    def step(name, **options):
+        def run():
+            threads[name] = threading.current_thread()
+        return Task(func=run, name=name, **options)
+
+    flow = Flow(name="inline")
+    flow >> step("tiny", inline=True) >> step("pooled")
+    flow.add_task(step("timed", inline=True, timeout_sec=5))
+
+    Engine(trace_backend=NullTraceBackend()).run(flow)
+
+    assert threads["tiny"] is threading.current_thread()
+    assert threads["pooled"] is not threading.current_thread()
+    assert threads["timed"] is not threading.current_thread()
+
+
+def test_auto_inline_after_observing_fast_runs():
+    seen = []
+    flow = _flow(lambda: seen.append(threading.current_thread()))
+
+    engine = Engine(trace_backend=NullTraceBackend(), auto_inline_ms=50)
+    for _ in range(4):
+        engine.run(flow)
+
+    assert [t is threading.current_thread() for t in seen] == [False, False, False, True]
+
+
+def test_adaptive_engine_backs_off_on_retries_and_reports_the_limit():
+    changes = []
+    running, peak, lock = [], [], threading.Lock()
+
+    class Recorder(NullTraceBackend):
+        def on_concurrency_change(self, limit):
+            changes.append(limit)
+
+    def flaky(name):
+        attempts = []
+
+        def run():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("throttled")
+        return Task(func=run, name=name, retries=1)
+
+    flow = Flow(name="throttled")
+    for i in range(12):
+        flow.add_task(flaky(f"call{i}"))
+
+    with Engine(trace_backend=Recorder(), max_workers=8, adaptive=True, min_workers=2) as engine:
+        assert engine.concurrency_limit == 8
+        assert engine.run(flow).run_context.status == RunStatus.COMPLETED
+        assert engine.concurrency_limit < 8
+
+    assert changes and changes[-1] == engine.concurrency_limit
+    assert min(changes) >= 2
+    assert max(peak) <= 8
@@ -72,3 +72,26 @@ def test_engine_mixed_injection():
     ctx = engine.run(flow, params={"base": 100})
     
     assert ctx.results["Mixed"] == 105
+
+def test_engine_reuses_given_results():
+    calls = []
+
+    def record(name, value):
+        def run(ctx):
+            calls.append(name)
+            return value
+        return run
+
+    t_a = Task(func=record("A", 10), name="A")
+    t_b = Task(func=task_b, name="B")
+    t_b.inputs = {"x": "$node.A.output"}
+    t_c = Task(func=record("C", 1), name="C")
+    flow = Flow(name="test_flow")
+    flow >> t_a >> t_b
+    flow.add_task(t_c)
+
+    ctx = Engine().run(flow, reuse={"A": 21, "C": 2})
+
+    assert calls == []
+    assert ctx.results == {"A": 21, "B": 42, "C": 2}
+    assert ctx.run_context.task_records["A"].output == 21
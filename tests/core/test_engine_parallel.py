@@ -1,6 +1,8 @@
+import sys
 import time
 import pytest
 from pyoco.core.models import Task, Flow
+from pyoco.core import engine as engine_module
 from pyoco.core.engine import Engine
 from pyoco.core.context import Context
 
@@ -85,3 +87,23 @@ def test_diamond_dependency():
     # Duration check: A(0) + max(B(0.05), C(0.05)) + D(0) ~= 0.05
     # If sequential: 0.1
     assert duration < 0.09
+
+def test_parallel_task_output_is_captured_per_task(capsys):
+    def noisy(name):
+        def run(ctx):
+            for i in range(20):
+                print(f"{name}{i}")
+                time.sleep(0.001)
+        return Task(func=run, name=name)
+
+    flow = Flow(name="noisy_flow")
+    flow.add_task(noisy("A"))
+    flow.add_task(noisy("B"))
+
+    ctx = Engine().run(flow)
+
+    logs = {entry["task"]: entry["text"] for entry in ctx.run_context.logs if entry["stream"] == "stdout"}
+    assert logs["A"].split() == [f"A{i}" for i in range(20)]
+    assert logs["B"].split() == [f"B{i}" for i in range(20)]
+    assert sys.stdout is not engine_module._task_stdout
+    assert "A19" in capsys.readouterr().out
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from pyoco.core.engine import Engine
+from pyoco.core.estimate import durations_from_runs, estimate_makespan, load_run_history
+from pyoco.core.graph import CompactGraph
+from pyoco.core.models import Flow, Task
+from pyoco.dsl.syntax import task
+
+
+def _diamond():
+    a, b, c, d = (Task(func=lambda: None, name=n) for n in "abcd")
+    for left, right in ((a, b), (a, c), (b, d), (c, d)):
+        right.dependencies.add(left)
+        left.dependents.add(right)
+    return CompactGraph([a, b, c, d])
+
+
+def test_makespan_depends_on_worker_count():
+    graph = _diamond()
+    durations = {"a": 10.0, "b": 30.0, "c": 20.0, "d": 5.0}
+
+    serial = estimate_makespan(graph, durations, jobs=1)
+    parallel = estimate_makespan(graph, durations, jobs=2)
+
+    assert serial.makespan_ms == 65.0
+    assert parallel.makespan_ms == 45.0
+    assert parallel.total_work_ms == 65.0
+    assert parallel.critical_path == ["a", "b", "d"]
+    assert parallel.critical_path_ms == 45.0
+    assert parallel.utilization == pytest.approx(65.0 / 90.0)
+    assert [(lvl.level, lvl.tasks, lvl.span_ms) for lvl in parallel.levels] == [
+        (1, 1, 10.0),
+        (2, 2, 30.0),
+        (3, 1, 5.0),
+    ]
+    assert parallel.levels[1].utilization == pytest.approx(50.0 / 60.0)
+
+
+def test_missing_durations_use_median_of_known():
+    estimate = estimate_makespan(_diamond(), {"a": 1.0, "b": 3.0, "c": 5.0}, jobs=4)
+    assert estimate.missing == ["d"]
+    assert estimate.total_work_ms == 12.0
+
+
+def test_cyclic_graph_cannot_be_estimated():
+    a, b = Task(func=lambda: None, name="a"), Task(func=lambda: None, name="b")
+    a.dependencies.add(b)
+    b.dependents.add(a)
+    b.dependencies.add(a)
+    a.dependents.add(b)
+    with pytest.raises(ValueError, match="cycles"):
+        estimate_makespan(CompactGraph([a, b]), {}, jobs=2)
+
+
+def test_durations_from_run_contexts_and_archives(tmp_path):
+    @task
+    def step():
+        return 1
+
+    flow = Flow("hist")
+    flow >> step
+    ctx = Engine().run(flow)
+
+    archived = {
+        "flow_name": "hist",
+        "task_records": {
+            "step": {"state": "SUCCEEDED", "duration_ms": 40.0},
+            "other": {"state": "FAILED", "duration_ms": 99.0},
+        },
+    }
+    unrelated = {"flow_name": "else", "task_records": {"step": {"state": "SUCCEEDED", "duration_ms": 1e6}}}
+    (tmp_path / "one.json").write_text(json.dumps(archived))
+    (tmp_path / "two.json").write_text(json.dumps(unrelated))
+    (tmp_path / "broken.json").write_text("{not json")
+
+    runs = load_run_history([tmp_path])
+    assert len(runs) == 2
+
+    durations = durations_from_runs([ctx.run_context, archived, archived], flow_name="hist")
+    assert set(durations) == {"step"}
+    assert durations["step"] == 40.0  # median of one live and two archived samples
+    assert durations_from_runs(runs, flow_name="hist") == {"step": 40.0}
+
@@ -0,0 +1,143 @@
+import tracemalloc
+
+import pytest
+
+from pyoco.core.engine import Engine
+from pyoco.core.graph import CompactGraph, analyze_graph, find_cycles, strongly_connected_components
+from pyoco.core.models import Flow, Task, TaskState
+
+
+def _chain(*tasks):
+    for left, right in zip(tasks, tasks[1:]):
+        right.dependencies.add(left)
+        left.dependents.add(right)
+
+
+def test_compact_graph_encodes_adjacency():
+    a, b, c, d = (Task(func=lambda: None, name=n) for n in "abcd")
+    _chain(a, b, d)
+    _chain(a, c, d)
+    d.trigger_policy = "ANY"
+    c.fail_policy = "isolate"
+
+    flow = Flow("diamond")
+    for t in (a, b, c, d):
+        flow.add_task(t)
+    graph = flow.compile_graph()
+
+    ids = graph.index
+    assert len(graph) == 4
+    assert graph.edge_count == 4
+    assert sorted(graph.tasks[i].name for i in graph.successors(ids[a])) == ["b", "c"]
+    assert sorted(graph.tasks[i].name for i in graph.predecessors(ids[d])) == ["b", "c"]
+    assert graph.in_degree[ids[d]] == 2
+    assert graph.any_join[ids[d]] and not graph.any_join[ids[b]]
+    assert graph.isolate[ids[c]] and not graph.isolate[ids[a]]
+
+
+def test_isolated_failure_cascades_through_dependents():
+    def boom():
+        raise RuntimeError("bad")
+
+    a = Task(func=boom, name="a", fail_policy="isolate")
+    b = Task(func=lambda: "b", name="b", fail_policy="isolate")
+    c = Task(func=lambda: "c", name="c")
+    other = Task(func=lambda: "other", name="other")
+    _chain(a, b, c)
+
+    flow = Flow("cascade")
+    for t in (a, b, c, other):
+        flow.add_task(t)
+
+    ctx = Engine().run(flow)
+
+    states = ctx.run_context.tasks
+    assert states["a"] == TaskState.FAILED
+    assert states["b"] == TaskState.FAILED
+    assert states["c"] == TaskState.FAILED
+    assert ctx.results["other"] == "other"
+
+
+def test_cycle_is_reported_as_deadlock():
+    a = Task(func=lambda: None, name="a")
+    b = Task(func=lambda: None, name="b")
+    _chain(a, b)
+    _chain(b, a)
+
+    flow = Flow("cycle")
+    flow.add_task(a)
+    flow.add_task(b)
+
+    with pytest.raises(RuntimeError, match="Deadlock or cycle"):
+        Engine().run(flow)
+
+
+def test_find_cycles_reports_every_cycle():
+    tasks = {n: Task(func=lambda: None, name=n) for n in "abcdefg"}
+    _chain(tasks["a"], tasks["b"], tasks["c"], tasks["a"])
+    _chain(tasks["c"], tasks["d"])
+    _chain(tasks["e"], tasks["f"], tasks["e"])
+    _chain(tasks["g"], tasks["g"])
+    graph = CompactGraph(tasks.values())
+
+    cycles = [sorted(graph.tasks[i].name for i in cycle) for cycle in find_cycles(graph)]
+    assert sorted(cycles) == [["a", "b", "c"], ["e", "f"], ["g"]]
+    assert len(strongly_connected_components(graph)) == 4
+
+
+def test_graph_analysis_handles_deep_chains_iteratively():
+    tasks = [Task(func=lambda: None, name=f"t{i}") for i in range(50_000)]
+    _chain(*tasks)
+    graph = CompactGraph(tasks)
+
+    assert find_cycles(graph) == []
+    stats = analyze_graph(graph)
+    assert stats.depth == 50_000
+    assert stats.max_width == 1
+    assert stats.critical_path[0] == graph.index[tasks[0]]
+    assert stats.critical_path[-1] == graph.index[tasks[-1]]
+
+
+def test_graph_costs_less_than_the_slotted_task_saves():
+    tasks = [Task(func=lambda: None, name=f"t{i}") for i in range(5_000)]
+    _chain(*tasks)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        graph = CompactGraph(tasks)
+        per_task = (tracemalloc.get_traced_memory()[0] - before) / len(tasks)
+    finally:
+        tracemalloc.stop()
+
+    assert len(graph) == 5_000
+    assert not hasattr(tasks[0], "__dict__")
+    # A per-instance __dict__ for Task's 16 fields would cost over 100 bytes.
+    assert per_task < 64
+
+
+def test_graph_stats_width_and_weighted_critical_path():
+    a, b, c, d, e = (Task(func=lambda: None, name=n) for n in "abcde")
+    _chain(a, b, e)
+    _chain(a, c, e)
+    _chain(a, d, e)
+    graph = CompactGraph([a, b, c, d, e])
+
+    stats = analyze_graph(graph)
+    assert (stats.nodes, stats.edges, stats.depth, stats.max_width) == (5, 6, 3, 3)
+    assert stats.critical_path_length == 3
+
+    weights = [0.0] * len(graph)
+    for task, cost in ((a, 1), (b, 1), (c, 5), (d, 2), (e, 1)):
+        weights[graph.index[task]] = cost
+    stats = analyze_graph(graph, weights)
+    assert stats.critical_path_length == 7
+    assert [graph.tasks[i].name for i in stats.critical_path] == ["a", "c", "e"]
+
+
+def test_graph_stats_skip_levels_for_cyclic_graphs():
+    a, b = Task(func=lambda: None, name="a"), Task(func=lambda: None, name="b")
+    _chain(a, b, a)
+    stats = analyze_graph(CompactGraph([a, b]))
+    assert stats.edges == 2
+    assert stats.depth is None and stats.critical_path == []
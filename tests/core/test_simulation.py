@@ -0,0 +1,127 @@
+import pytest
+
+from pyoco.core.estimate import estimate_makespan
+from pyoco.core.models import Flow, RunStatus, Task, TaskState
+from pyoco.core.simulation import SimulatedEngine
+from pyoco.dsl.syntax import task
+
+
+def _never_called():
+    raise AssertionError("simulation must not call task functions")
+
+
+def _diamond(**overrides):
+    a, b, c, d = (Task(func=_never_called, name=n) for n in "abcd")
+    for name, options in overrides.items():
+        for key, value in options.items():
+            setattr({"a": a, "b": b, "c": c, "d": d}[name], key, value)
+    for left, right in ((a, b), (a, c), (b, d), (c, d)):
+        right.dependencies.add(left)
+        left.dependents.add(right)
+    flow = Flow("diamond")
+    for t in (a, b, c, d):
+        flow.add_task(t)
+    return flow
+
+
+DURATIONS = {"a": 10.0, "b": 30.0, "c": 20.0, "d": 5.0}
+
+
+def test_virtual_clock_matches_worker_count():
+    flow = _diamond()
+
+    serial = SimulatedEngine(jobs=1, durations=DURATIONS).simulate(flow)
+    parallel = SimulatedEngine(jobs=2, durations=DURATIONS).simulate(flow)
+
+    assert serial.status == RunStatus.COMPLETED
+    assert serial.makespan_ms == pytest.approx(65.0)
+    assert serial.utilization == pytest.approx(1.0)
+    assert parallel.makespan_ms == pytest.approx(45.0)
+    assert parallel.busy_ms == pytest.approx(65.0)
+    assert parallel.tasks_run == 4
+    # Same answer as the static estimator for a failure-free run.
+    estimate = estimate_makespan(flow.compile_graph(), DURATIONS, jobs=2)
+    assert parallel.makespan_ms == pytest.approx(estimate.makespan_ms)
+
+    records = parallel.run_context.task_records
+    assert records["d"].started_at == pytest.approx(0.040)
+    assert records["d"].duration_ms == pytest.approx(5.0)
+    assert parallel.run_context.tasks["d"] == TaskState.SUCCEEDED
+
+
+def test_same_seed_replays_identically():
+    flow = _diamond(b={"retries": 3, "fail_policy": "isolate"})
+    options = dict(jobs=2, durations=DURATIONS, jitter=0.5, failure_rate=0.4)
+
+    first = SimulatedEngine(seed=7, **options).simulate(flow)
+    second = SimulatedEngine(seed=7, **options).simulate(flow)
+
+    assert first.makespan_ms == second.makespan_ms
+    assert first.retries == second.retries
+    assert {n: r.duration_ms for n, r in first.run_context.task_records.items()} == {
+        n: r.duration_ms for n, r in second.run_context.task_records.items()
+    }
+
+
+def test_failures_retries_and_isolation():
+    flow = _diamond(b={"retries": 2, "fail_policy": "isolate"}, d={"fail_policy": "isolate"})
+    report = SimulatedEngine(jobs=2, durations=DURATIONS, failure_rate={"b": 1.0}).simulate(flow)
+
+    assert report.status == RunStatus.COMPLETED
+    assert report.tasks_failed == 1
+    assert report.retries == 2
+    record = report.run_context.task_records["b"]
+    assert record.state == TaskState.FAILED
+    # Three attempts plus two backoffs of 100 ms.
+    assert record.duration_ms == pytest.approx(3 * 30.0 + 2 * 100.0)
+    assert report.run_context.tasks["d"] == TaskState.FAILED
+
+
+def test_stop_failure_and_timeout_end_the_simulation():
+    report = SimulatedEngine(durations=DURATIONS, failure_rate={"c": 1.0}).simulate(_diamond())
+    assert report.status == RunStatus.FAILED
+    assert "Simulated failure of task 'c'" in report.error
+
+    timed = SimulatedEngine(durations=DURATIONS).simulate(_diamond(b={"timeout_sec": 0.015}))
+    assert timed.status == RunStatus.FAILED
+    assert "exceeded timeout" in timed.error
+    assert timed.makespan_ms == pytest.approx(25.0)
+
+
+def test_mapped_tasks_fan_out_from_map_sizes():
+    @task
+    def produce():
+        raise AssertionError("not called")
+
+    @task
+    def process(item):
+        raise AssertionError("not called")
+
+    flow = Flow("mapped")
+    flow >> produce >> process.map("$node.produce.output")
+
+    report = SimulatedEngine(
+        jobs=4, durations={"produce": 5.0, "process": 10.0}, map_sizes={"process": 8}
+    ).simulate(flow)
+
+    assert report.status == RunStatus.COMPLETED
+    assert report.tasks_run == 9
+    assert report.makespan_ms == pytest.approx(25.0)
+    assert report.run_context.tasks["process[7]"] == TaskState.SUCCEEDED
+
+
+def test_control_flow_flows_are_rejected():
+    @task
+    def step():
+        pass
+
+    flow = Flow("loop")
+    flow >> step[3]
+    with pytest.raises(ValueError, match="DAG flows only"):
+        SimulatedEngine().simulate(flow)
+
+
+def test_simulated_engine_closes_like_an_engine():
+    with SimulatedEngine(jobs=2, durations=DURATIONS) as engine:
+        assert engine.simulate(_diamond()).makespan_ms == pytest.approx(45.0)
+    SimulatedEngine().close()
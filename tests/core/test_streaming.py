@@ -0,0 +1,168 @@
+import threading
+
+import pytest
+
+from pyoco.core.channels import Channel
+from pyoco.core.engine import Engine
+from pyoco.core.models import Flow
+from pyoco.dsl.syntax import task
+
+
+def test_channel_delivers_items_and_producer_error():
+    channel = Channel(capacity=2)
+    channel.put(1)
+    channel.put(2)
+    channel.fail(ValueError("boom"))
+
+    seen = []
+    with pytest.raises(ValueError, match="boom"):
+        for item in channel:
+            seen.append(item)
+    assert seen == [1, 2]
+
+
+def test_stream_consumer_overlaps_with_producer():
+    consumer_started = threading.Event()
+    events = []
+
+    @task(stream=1)
+    def extract():
+        for value in range(5):
+            events.append(("produce", value))
+            yield value
+        # The consumer was already running before the producer finished.
+        assert consumer_started.wait(timeout=2)
+
+    @task
+    def load(extract):
+        total = 0
+        for value in extract:
+            consumer_started.set()
+            events.append(("consume", value))
+            total += value
+        return total
+
+    flow = Flow("stream")
+    flow >> extract >> load
+
+    ctx = Engine().run(flow)
+
+    assert ctx.results["load"] == 10
+    assert ctx.run_context.task_records["extract"].state.value == "SUCCEEDED"
+    # Backpressure: the producer never runs more than capacity + 1 items ahead.
+    ahead = 0
+    for kind, _ in events:
+        ahead += 1 if kind == "produce" else -1
+        assert ahead <= 2
+
+
+def test_stream_producer_released_when_consumer_stops_early():
+    @task(stream=1)
+    def numbers():
+        value = 0
+        while True:
+            yield value
+            value += 1
+
+    @task
+    def head(numbers):
+        taken = []
+        for value in numbers:
+            taken.append(value)
+            if len(taken) == 3:
+                break
+        return taken
+
+    flow = Flow("stream_head")
+    flow >> numbers >> head
+
+    ctx = Engine().run(flow)
+
+    assert ctx.results["head"] == [0, 1, 2]
+
+
+def test_stream_producer_failure_reaches_consumer():
+    @task(stream=4)
+    def broken():
+        yield 1
+        raise RuntimeError("upstream broke")
+
+    @task
+    def drain(broken):
+        return list(broken)
+
+    flow = Flow("stream_error")
+    flow >> broken >> drain
+
+    with pytest.raises(RuntimeError, match="upstream broke"):
+        Engine().run(flow)
+
+
+def test_stream_makes_progress_with_a_single_worker():
+    @task(stream=1)
+    def numbers():
+        yield from range(5)
+
+    @task
+    def total(numbers):
+        return sum(numbers)
+
+    flow = Flow("stream_one_worker")
+    flow >> numbers >> total
+
+    results = []
+    engine = Engine(max_workers=1)
+    runner = threading.Thread(target=lambda: results.append(engine.run(flow)), daemon=True)
+    runner.start()
+    runner.join(timeout=5)
+
+    assert not runner.is_alive(), "producer starved its consumer of a worker"
+    assert results[0].results["total"] == 10
+    engine.close()
+
+
+def test_stream_with_several_consumers_is_rejected():
+    @task(stream=2)
+    def numbers():
+        yield from range(4)
+
+    @task
+    def total(numbers):
+        return sum(numbers)
+
+    @task
+    def count(numbers):
+        return len(list(numbers))
+
+    flow = Flow("stream_fanout")
+    flow >> numbers >> (total | count)
+
+    with pytest.raises(ValueError, match="only one consumer"):
+        Engine().run(flow)
+
+
+def test_retried_stream_consumer_fails_instead_of_losing_items():
+    attempts = []
+
+    @task(stream=4)
+    def numbers():
+        yield from range(4)
+
+    def flaky(numbers):
+        seen = []
+        for value in numbers:
+            seen.append(value)
+            if not attempts and len(seen) == 2:
+                attempts.append(seen)
+                raise ConnectionError("dropped")
+        attempts.append(seen)
+        return seen
+
+    consumer = task(flaky)
+    consumer.task.retries = 1
+    flow = Flow("stream_retry")
+    flow >> numbers >> consumer
+
+    with pytest.raises(RuntimeError, match="already read"):
+        Engine().run(flow)
+    assert attempts == [[0, 1]]
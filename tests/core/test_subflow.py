@@ -0,0 +1,237 @@
+import threading
+import time
+
+import pytest
+
+from pyoco.core.engine import Engine
+from pyoco.core.models import Flow, RunContext, RunStatus, TaskState
+from pyoco.dsl.syntax import subflow_task, task
+
+
+def _etl_flow():
+    @task
+    def extract(ctx):
+        return [ctx.params["base"] + i for i in range(3)]
+
+    @task
+    def transform(extract):
+        return [value * 2 for value in extract]
+
+    etl = Flow("etl")
+    etl >> extract >> transform
+    return etl
+
+
+def test_subflow_output_is_exposed_to_parent():
+    @task
+    def report(ctx):
+        return ctx.resolve("$node.etl.output")
+
+    flow = Flow("parent")
+    flow >> subflow_task(_etl_flow()) >> report
+
+    ctx = Engine().run(flow, params={"base": 1})
+    run = ctx.run_context
+
+    assert ctx.results["etl"] == [2, 4, 6]
+    assert ctx.results["report"] == [2, 4, 6]
+    assert run.tasks["etl"] == TaskState.SUCCEEDED
+    assert run.tasks["etl.extract"] == TaskState.SUCCEEDED
+    assert run.task_records["etl.transform"].output == [2, 4, 6]
+    # Child results stay inside the sub-flow.
+    assert "extract" not in ctx.results
+
+
+def test_subflow_plan_is_compiled_once_and_reused():
+    etl = _etl_flow()
+    first = subflow_task(etl, "first", params={"base": 0})
+    second = subflow_task(etl, "second", params={"base": "$ctx.params.offset"})
+    plan = first.task.subflow
+
+    calls = []
+    original = etl.compile_graph
+
+    def counting_compile():
+        calls.append(1)
+        return original()
+
+    etl.compile_graph = counting_compile
+
+    flow = Flow("twice")
+    flow >> first >> second
+    engine = Engine()
+    for _ in range(3):
+        ctx = engine.run(flow, params={"offset": 100})
+        assert ctx.results["first"] == [0, 2, 4]
+        assert ctx.results["second"] == [200, 202, 204]
+
+    # One compile per plan, regardless of how many runs used it.
+    assert len(calls) == 2
+    assert plan.graph() is plan.graph()
+
+
+def test_subflow_tasks_share_parent_executor():
+    both_running = threading.Barrier(2, timeout=2)
+
+    @task
+    def inner():
+        both_running.wait()
+        return "inner"
+
+    @task
+    def outer():
+        both_running.wait()
+        return "outer"
+
+    child = Flow("child")
+    child >> inner
+
+    flow = Flow("parent")
+    flow.add_task(outer.task)
+    flow >> subflow_task(child)
+
+    ctx = Engine().run(flow)
+    assert ctx.results["child"] == "inner"
+    assert ctx.results["outer"] == "outer"
+
+
+def test_subflow_failure_fails_the_task():
+    @task
+    def broken():
+        raise ValueError("inner failure")
+
+    @task
+    def after(child):
+        return child
+
+    child = Flow("child")
+    child >> broken
+
+    flow = Flow("parent")
+    flow >> subflow_task(child) >> after
+
+    run_ctx = RunContext()
+    with pytest.raises(ValueError, match="inner failure"):
+        Engine().run(flow, run_context=run_ctx)
+    assert run_ctx.tasks["child"] == TaskState.FAILED
+    assert run_ctx.tasks["child.broken"] == TaskState.FAILED
+    assert run_ctx.status == RunStatus.FAILED
+
+
+def test_control_flow_subflow_inside_parent_loop():
+    @task
+    def count(ctx):
+        return ctx.params["n"]
+
+    @task
+    def step(ctx):
+        return ctx.loop.index
+
+    child = Flow("child")
+    child >> count >> step[2]
+
+    flow = Flow("parent")
+    flow >> subflow_task(child, "inner", params={"n": 5}, output="count")[2]
+
+    ctx = Engine().run(flow)
+    assert ctx.results["inner"] == 5
+    assert ctx.run_context.tasks["inner.step"] == TaskState.SUCCEEDED
+
+
+def test_cancelling_parent_cancels_subflow():
+    started = threading.Event()
+
+    @task
+    def slow():
+        started.set()
+        time.sleep(0.3)
+
+    @task
+    def never():
+        raise AssertionError("should be cancelled")
+
+    child = Flow("child")
+    child >> slow >> never
+
+    flow = Flow("parent")
+    flow >> subflow_task(child)
+
+    engine = Engine()
+    run_ctx = RunContext()
+    runner = threading.Thread(target=engine.run, args=(flow,), kwargs={"run_context": run_ctx})
+    runner.start()
+    assert started.wait(timeout=2)
+    engine.cancel(run_ctx.run_id)
+    runner.join(timeout=2)
+
+    assert run_ctx.status == RunStatus.CANCELLED
+    assert run_ctx.tasks["child"] == TaskState.CANCELLED
+    assert run_ctx.tasks["child.never"] == TaskState.CANCELLED
+
+
+def _sensor_flow(index, interval=0.2):
+    def poke(ctx):
+        return ctx.loop.iteration
+
+    poke.__name__ = "poke"
+    child = Flow(f"sensor_{index}")
+    child >> task(poke) % ("$ctx.results.poke >= 3", {"max_iter": 5, "interval": interval, "deferrable": True})
+    return child
+
+
+def test_parked_subflows_do_not_hold_workers():
+    flow = Flow("sensors")
+    for index in range(6):
+        flow.add_task(subflow_task(_sensor_flow(index), f"sensor_{index}").task)
+
+    start = time.monotonic()
+    with Engine(max_workers=2) as engine:
+        ctx = engine.run(flow)
+    elapsed = time.monotonic() - start
+
+    assert all(ctx.run_context.tasks[f"sensor_{i}.poke"] == TaskState.SUCCEEDED for i in range(6))
+    # Sleeping in a worker per parked sensor would take ~1.2s on 2 workers.
+    assert elapsed < 0.8
+
+
+def test_cancelling_parent_wakes_parked_subflow():
+    flow = Flow("parent")
+    flow >> subflow_task(_sensor_flow(0, interval=30), "sensor")
+
+    engine = Engine()
+    run_ctx = RunContext()
+    runner = threading.Thread(target=engine.run, args=(flow,), kwargs={"run_context": run_ctx})
+    runner.start()
+    deadline = time.monotonic() + 2
+    while run_ctx.tasks.get("sensor.poke") != TaskState.SUCCEEDED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.cancel(run_ctx.run_id)
+    runner.join(timeout=2)
+
+    assert not runner.is_alive()
+    assert run_ctx.status == RunStatus.CANCELLED
+    engine.close()
+
+
+def test_subflow_task_timeout_covers_its_graph():
+    @task
+    def slow():
+        time.sleep(0.5)
+
+    @task
+    def never():
+        raise AssertionError("should not start after the timeout")
+
+    child = Flow("child")
+    child >> slow >> never
+
+    wrapper = subflow_task(child)
+    wrapper.task.timeout_sec = 0.1
+    flow = Flow("parent")
+    flow >> wrapper
+
+    run_ctx = RunContext()
+    with pytest.raises(TimeoutError, match="'child' exceeded timeout"):
+        Engine().run(flow, run_context=run_ctx)
+
+    assert run_ctx.tasks["child"] == TaskState.FAILED
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from pyoco.core.engine import Engine
+from pyoco.core.models import Flow, TaskState
+from pyoco.dsl.syntax import task
+
+
+def test_mapped_task_fans_out_and_gathers_in_order():
+    barrier = threading.Barrier(3, timeout=2)
+
+    @task
+    def list_files():
+        return ["a.txt", "b.txt", "c.txt"]
+
+    @task
+    def process(path):
+        # All three instances must be running at once to pass the barrier.
+        barrier.wait()
+        return path.upper()
+
+    @task
+    def collect(process):
+        return ",".join(process)
+
+    flow = Flow("mapped")
+    flow >> list_files >> process.map("$node.list_files.output") >> collect
+
+    ctx = Engine().run(flow)
+    run = ctx.run_context
+
+    assert ctx.results["process"] == ["A.TXT", "B.TXT", "C.TXT"]
+    assert ctx.results["collect"] == "A.TXT,B.TXT,C.TXT"
+    assert run.tasks["process"] == TaskState.SUCCEEDED
+    for index, path in enumerate(["a.txt", "b.txt", "c.txt"]):
+        record = run.task_records[f"process[{index}]"]
+        assert record.state == TaskState.SUCCEEDED
+        assert record.inputs == {"path": path}
+    assert run.task_records["process"].output == ["A.TXT", "B.TXT", "C.TXT"]
+
+
+def test_mapped_task_over_empty_list():
+    @task
+    def process(item):
+        raise AssertionError("no instances expected")
+
+    @task
+    def collect(process):
+        return len(process)
+
+    flow = Flow("empty")
+    flow >> process.map([]) >> collect
+
+    ctx = Engine().run(flow)
+    assert ctx.results["collect"] == 0
+
+
+def test_mapped_instance_failure_fails_the_task():
+    @task
+    def process(n):
+        if n == 2:
+            raise ValueError("bad item")
+        return n
+
+    flow = Flow("failing")
+    flow >> process.map([1, 2, 3])
+
+    engine = Engine()
+    with pytest.raises(ValueError, match="bad item"):
+        engine.run(flow)
+
+
+def test_mapped_task_isolated_failure_skips_dependents():
+    @task
+    def process(n):
+        raise ValueError("bad item")
+
+    @task
+    def after(process):
+        return process
+
+    process.task.fail_policy = "isolate"
+    after.task.fail_policy = "isolate"
+    flow = Flow("isolated")
+    flow >> process.map([1]) >> after
+
+    ctx = Engine().run(flow)
+    run = ctx.run_context
+    assert run.tasks["process"] == TaskState.FAILED
+    assert run.task_records["process"].error == "bad item"
+    assert run.tasks["after"] == TaskState.FAILED
+    assert "after" not in ctx.results
+
+
+def test_mapped_task_explicit_arg_and_inputs():
+    @task
+    def scale(factor, value):
+        return factor * value
+
+    scale.task.inputs = {"factor": "$ctx.params.factor"}
+    flow = Flow("explicit")
+    flow >> scale.map("$ctx.params.values", arg="value")
+
+    ctx = Engine().run(flow, params={"factor": 10, "values": [1, 2]})
+    assert ctx.results["scale"] == [10, 20]
+
+
+def test_mapped_task_inside_control_flow():
+    @task
+    def double(x):
+        return x * 2
+
+    flow = Flow("cf")
+    flow >> double.map([1, 2, 3])[1]
+
+    ctx = Engine().run(flow)
+    assert ctx.results["double"] == [2, 4, 6]
+    assert ctx.run_context.tasks["double[2]"] == TaskState.SUCCEEDED
+
+
+def test_map_leaves_the_decorated_task_unmapped():
+    @task
+    def double(n=1):
+        return n * 2
+
+    mapped = Flow("mapped")
+    mapped >> double.map([1, 2])
+    again = Flow("again")
+    again >> double.map([3])
+    plain = Flow("plain")
+    plain >> double
+
+    assert double.task.map_over is None
+    assert Engine().run(mapped).results["double"] == [2, 4]
+    assert Engine().run(again).results["double"] == [6]
+    assert Engine().run(plain).results["double"] == 2
@@ -0,0 +1,142 @@
+import sys
+import textwrap
+from unittest.mock import patch
+
+import pytest
+
+from pyoco.cli.main import main
+from pyoco.discovery.loader import TaskLoader
+from pyoco.discovery.manifest import TaskManifest, scan_source
+from pyoco.schemas.config import DiscoveryConfig, PyocoConfig, TaskConfig
+
+MODULES = {
+    "lazy_alpha": """
+        from pyoco import task
+
+        @task
+        def fetch():
+            return 2
+
+        @task
+        def double(fetch):
+            return fetch * 2
+    """,
+    "lazy_beta": """
+        from pyoco import task
+
+        @task
+        def unused():
+            return "beta"
+    """,
+    "lazy_dynamic": """
+        from pyoco import task
+
+        for _name in ("made",):
+            globals()[_name] = task(lambda: "dynamic")
+    """,
+}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    for name, source in MODULES.items():
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in MODULES:
+        sys.modules.pop(name, None)
+
+
+def _config(**tasks):
+    return PyocoConfig(
+        version=1,
+        flows={},
+        tasks={name: TaskConfig(callable=target) for name, target in tasks.items()},
+        discovery=DiscoveryConfig(glob_modules=["lazy_*.py"], lazy=True),
+    )
+
+
+def test_scan_source_finds_decorated_and_assigned_tasks():
+    source = textwrap.dedent("""
+        import pyoco
+        from pyoco import task, subflow_task
+
+        @task
+        def a(): pass
+
+        @pyoco.task(inputs={})
+        def b(): pass
+
+        def helper(): pass
+
+        c = task(helper)
+        d = subflow_task(flow)
+        e: object = pyoco.Task(func=helper, name="e")
+        f = helper()
+    """)
+    assert scan_source(source) == ["a", "b", "c", "d", "e"]
+
+
+def test_only_referenced_modules_are_imported(project):
+    loader = TaskLoader(_config(), manifest=TaskManifest(project / "manifest.json"))
+    loader.load()
+
+    assert {"fetch", "double", "unused"} <= set(loader.tasks)
+    assert not any(name in sys.modules for name in MODULES)
+
+    assert loader.tasks["double"].func(3) == 6
+    assert "lazy_alpha" in sys.modules
+    assert "lazy_beta" not in sys.modules
+    assert "lazy_dynamic" not in sys.modules
+
+
+def test_unindexed_names_fall_back_to_importing_everything(project):
+    manifest_path = project / "manifest.json"
+    loader = TaskLoader(_config(), manifest=TaskManifest(manifest_path))
+    loader.load()
+
+    assert "made" not in loader.tasks
+    assert loader.tasks["made"].func() == "dynamic"
+    assert "lazy_beta" in sys.modules
+    with pytest.raises(KeyError):
+        loader.tasks["missing"]
+
+    # The import recorded the real task names for the next process.
+    for name in MODULES:
+        sys.modules.pop(name, None)
+    again = TaskLoader(_config(), manifest=TaskManifest(manifest_path))
+    again.load()
+    assert again.tasks["made"].func() == "dynamic"
+    assert "lazy_beta" not in sys.modules
+
+
+def test_explicit_callables_win_and_load_on_demand(project):
+    loader = TaskLoader(_config(fetch="lazy_beta:unused"), manifest=TaskManifest(project / "manifest.json"))
+    loader.load()
+
+    assert "lazy_beta" not in sys.modules
+    assert loader.tasks["fetch"].func() == "beta"
+    assert "lazy_alpha" not in sys.modules
+
+
+def test_cli_run_imports_only_flow_modules(project, monkeypatch):
+    monkeypatch.setenv("PYOCO_TASK_MANIFEST", str(project / "manifest.json"))
+    (project / "flow.yaml").write_text(textwrap.dedent("""
+        version: 1
+        flows:
+          main:
+            graph: |
+              flow >> fetch >> double
+        discovery:
+          glob_modules: ["lazy_*.py"]
+          lazy: true
+    """))
+
+    with patch("sys.argv", ["pyoco", "run", "--config", "flow.yaml", "--no-cache"]), \
+         patch("pyoco.core.engine.Engine") as MockEngine:
+        main()
+
+    flow, _ = MockEngine.return_value.run.call_args.args
+    assert {t.name for t in flow.tasks} == {"fetch", "double"}
+    assert "lazy_beta" not in sys.modules
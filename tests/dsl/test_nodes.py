@@ -3,6 +3,7 @@ import pytest
 from pyoco.dsl.syntax import switch, task
 from pyoco.dsl.nodes import (
     ForEachNode,
+    ParallelNode,
     RepeatNode,
     SwitchNode,
     TaskNode,
@@ -68,3 +69,79 @@ def test_switch_builder_collects_cases():
     assert len(switch_node.cases) == 2
     assert switch_node.cases[0].value == "X"
     assert switch_node.cases[1].value == "__default__"
+
+
+def test_foreach_loop_accepts_options():
+    t1, t2 = build_two_tasks()
+    foreach = (t1 >> t2)["$ctx.items as item", {"prefetch": 8}].to_subflow().steps[0]
+    assert isinstance(foreach, ForEachNode)
+    assert foreach.alias == "item"
+    assert foreach.prefetch == 8
+    assert foreach.chunk is None
+
+    batched = (t1 >> t2)["$ctx.items as batch", {"chunk": 100}].to_subflow().steps[0]
+    assert batched.chunk == 100
+
+    with pytest.raises(ValueError):
+        (t1 >> t2)["$ctx.items", {"bogus": 1}]
+    with pytest.raises(ValueError):
+        (t1 >> t2)["$ctx.items", {"chunk": 0}]
+
+
+def test_parallel_operator_builds_parallel_node_inside_fragments():
+    t1, t2 = build_two_tasks()
+
+    @task
+    def gamma(ctx):  # pragma: no cover - body unused
+        return "gamma"
+
+    fragment = ((t1 & t2 & gamma) >> t1)[2]
+    repeat = fragment.to_subflow().steps[0]
+    assert isinstance(repeat, RepeatNode)
+    block = repeat.body.steps[0]
+    assert isinstance(block, ParallelNode)
+    assert [branch.steps[0].task.name for branch in block.branches] == ["alpha", "beta", "gamma"]
+    assert isinstance(repeat.body.steps[1], TaskNode)
+
+
+def test_chaining_shares_buffer_and_keeps_prefixes_intact():
+    t1, t2 = build_two_tasks()
+
+    @task
+    def gamma(ctx):  # pragma: no cover - body unused
+        return "gamma"
+
+    @task
+    def delta(ctx):  # pragma: no cover - body unused
+        return "delta"
+
+    prefix = (t1 >> t2)
+    extended = prefix >> gamma
+    # Extending the newest view appends in place instead of copying.
+    assert extended._buffer is prefix._buffer
+
+    branched = prefix >> delta
+    assert [n.task.name for n in prefix.to_subflow().steps] == ["alpha", "beta"]
+    assert [n.task.name for n in extended.to_subflow().steps] == ["alpha", "beta", "gamma"]
+    assert [n.task.name for n in branched.to_subflow().steps] == ["alpha", "beta", "delta"]
+    assert [t.name for t in branched.task_nodes()] == ["alpha", "beta", "delta"]
+    assert [t.name for t in t1.task_nodes()] == ["alpha"]
+
+
+def test_long_generated_chain_builds_linearly():
+    wrappers = []
+    for index in range(20000):
+        def body(ctx):  # pragma: no cover - body unused
+            return None
+
+        body.__name__ = f"step_{index}"
+        wrappers.append(task(body))
+
+    fragment = wrappers[0]
+    for wrapper in wrappers[1:]:
+        fragment = fragment >> wrapper
+
+    assert len(fragment.task_nodes()) == 20000
+    assert fragment._first_tasks()[0].name == "step_0"
+    assert fragment._last_tasks()[0].name == "step_19999"
+    assert {t.name for t in wrappers[-1].task.dependencies} == {"step_19998"}
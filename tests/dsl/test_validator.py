@@ -21,6 +21,18 @@ def test_validator_warns_on_until_without_max():
     assert any("missing max_iter" in warning for warning in report.warnings)
 
 
+def test_validator_warns_on_deferrable_until_without_interval():
+    @task
+    def poke(ctx):
+        return True
+
+    flow = Flow("warn_deferrable")
+    flow >> (poke) % ("$ctx.results.poke", {"max_iter": 5, "deferrable": True})
+
+    report = FlowValidator(flow).validate()
+    assert any("no interval" in warning for warning in report.warnings)
+
+
 def test_validator_errors_on_duplicate_switch_cases():
     @task
     def branch_a(ctx):
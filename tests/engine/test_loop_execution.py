@@ -1,7 +1,12 @@
+import threading
+import time
+from collections import deque
+
 import pytest
 
 from pyoco import Flow, task
 from pyoco.core.engine import Engine
+from pyoco.core.models import RunContext, RunStatus, TaskState
 from pyoco.core.exceptions import UntilMaxIterationsExceeded
 
 
@@ -89,3 +94,190 @@ def test_until_loop_respects_max_iter():
     engine = Engine()
     with pytest.raises(UntilMaxIterationsExceeded):
         engine.run(flow)
+
+
+def test_foreach_consumes_generator_lazily():
+    produced = []
+    seen = []
+
+    def rows():
+        for value in range(3):
+            produced.append(value)
+            yield value
+
+    @task
+    def seed(ctx):
+        ctx.set_var("rows", rows())
+
+    @task
+    def record(ctx):
+        # Only the current row has been pulled from the source.
+        seen.append((ctx.loop.item, len(produced), ctx.loop.count))
+
+    flow = Flow("foreach_generator")
+    flow >> seed >> (record)["$ctx.rows"]
+
+    Engine().run(flow)
+
+    assert seen == [(0, 1, None), (1, 2, None), (2, 3, None)]
+
+
+def test_foreach_prefetch_window_preserves_order():
+    seen = []
+
+    @task
+    def seed(ctx):
+        ctx.set_var("rows", (value * 2 for value in range(20)))
+
+    @task
+    def record(ctx):
+        seen.append(ctx.get_var("row"))
+
+    flow = Flow("foreach_prefetch")
+    flow >> seed >> (record)["$ctx.rows as row", {"prefetch": 4}]
+
+    Engine().run(flow)
+
+    assert seen == [value * 2 for value in range(20)]
+
+
+def test_foreach_prefetch_propagates_source_errors():
+    def rows():
+        yield 1
+        raise ValueError("source exploded")
+
+    @task
+    def seed(ctx):
+        ctx.set_var("rows", rows())
+
+    @task
+    def record(ctx):
+        return ctx.loop.item
+
+    flow = Flow("foreach_prefetch_error")
+    flow >> seed >> (record)["$ctx.rows", {"prefetch": 2}]
+
+    with pytest.raises(ValueError, match="source exploded"):
+        Engine().run(flow)
+
+
+def test_foreach_chunk_hands_batches_to_body():
+    batches = []
+
+    @task
+    def seed(ctx):
+        ctx.set_var("rows", list(range(7)))
+
+    @task
+    def vectorized(ctx):
+        batches.append((ctx.get_var("batch"), ctx.loop.index, ctx.loop.count))
+        return sum(ctx.loop.item)
+
+    flow = Flow("foreach_chunk")
+    flow >> seed >> (vectorized)["$ctx.rows as batch", {"chunk": 3}]
+
+    ctx = Engine().run(flow)
+
+    assert batches == [([0, 1, 2], 0, 3), ([3, 4, 5], 1, 3), ([6], 2, 3)]
+    assert ctx.results["vectorized"] == 6
+
+
+def test_foreach_chunk_batches_generator_source():
+    batches = []
+
+    @task
+    def seed(ctx):
+        ctx.set_var("rows", (value for value in range(5)))
+
+    @task
+    def vectorized(ctx):
+        batches.append((ctx.loop.item, ctx.loop.count))
+
+    flow = Flow("foreach_chunk_generator")
+    flow >> seed >> (vectorized)["$ctx.rows", {"chunk": 2, "prefetch": 1}]
+
+    Engine().run(flow)
+
+    assert batches == [([0, 1], None), ([2, 3], None), ([4], None)]
+
+
+def test_until_interval_waits_between_checks():
+    checks = []
+
+    @task
+    def poke(ctx):
+        checks.append(time.monotonic())
+        return len(checks)
+
+    flow = Flow("until_interval")
+    flow >> (poke) % ("$ctx.results.poke >= 3", {"max_iter": 10, "interval": 0.05})
+
+    Engine().run(flow)
+
+    assert len(checks) == 3
+    gaps = [later - earlier for earlier, later in zip(checks, checks[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+
+
+def test_deferrable_until_parks_through_the_driver():
+    parks = []
+
+    class RecordingEngine(Engine):
+        def _park(self, deadline, ctx):
+            parks.append(deadline)
+
+    @task
+    def poke(ctx):
+        return ctx.loop.iteration
+
+    flow = Flow("until_deferrable")
+    flow >> (poke) % ("$ctx.results.poke >= 3", {"max_iter": 5, "interval": 60, "deferrable": True})
+
+    RecordingEngine().run(flow)
+
+    assert len(parks) == 2
+
+
+def test_parked_until_stops_on_cancellation():
+    engine = Engine()
+
+    @task
+    def poke(ctx):
+        return False
+
+    @task
+    def after(ctx):  # pragma: no cover - must not run
+        return "ran"
+
+    flow = Flow("until_cancel")
+    flow >> (poke) % ("$ctx.results.poke", {"max_iter": 100, "interval": 30, "deferrable": True}) >> after
+
+    run_ctx = RunContext()
+    runner = threading.Thread(target=engine.run, args=(flow,), kwargs={"run_context": run_ctx})
+    runner.start()
+    time.sleep(0.2)
+    engine.cancel(run_ctx.run_id)
+    runner.join(timeout=2)
+
+    assert not runner.is_alive()
+    assert run_ctx.status == RunStatus.CANCELLED
+    assert run_ctx.tasks["after"] == TaskState.CANCELLED
+
+
+def test_foreach_chunk_drains_sources_that_cannot_be_sliced():
+    batches = []
+
+    @task
+    def seed(ctx):
+        ctx.set_var("rows", deque(range(5)))
+
+    @task
+    def vectorized(ctx):
+        batches.append(ctx.loop.item)
+
+    flow = Flow("foreach_chunk_deque")
+    flow >> seed >> (vectorized)["$ctx.rows", {"chunk": 2}]
+
+    Engine().run(flow)
+
+    assert batches == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,175 @@
+import threading
+import time
+
+import pytest
+
+from pyoco import Flow, task
+from pyoco.core.engine import Engine
+from pyoco.dsl.nodes import ParallelNode
+from pyoco.dsl.validator import FlowValidator
+
+
+def test_parallel_block_inside_repeat_runs_branches_concurrently():
+    active = []
+    peak = []
+    lock = threading.Lock()
+    joined = []
+
+    def branch(name):
+        def body(ctx):
+            with lock:
+                active.append(name)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(name)
+            return name
+
+        body.__name__ = name
+        return task(body)
+
+    a, b, c = branch("a"), branch("b"), branch("c")
+
+    @task
+    def join(ctx):
+        # Every branch has finished before the next step starts.
+        joined.append(sorted(k for k in ("a", "b", "c") if k in ctx.results))
+
+    flow = Flow("parallel_repeat")
+    flow >> ((a & b & c) >> join)[2]
+
+    start = time.monotonic()
+    Engine().run(flow)
+    elapsed = time.monotonic() - start
+
+    assert max(peak) == 3
+    assert joined == [["a", "b", "c"], ["a", "b", "c"]]
+    assert elapsed < 0.25  # serial execution would take >= 0.3s
+
+
+def test_parallel_branches_keep_their_own_loop_frames():
+    seen = []
+
+    @task
+    def left(ctx):
+        seen.append(("left", ctx.loop.type, ctx.loop.item))
+
+    @task
+    def right(ctx):
+        seen.append(("right", ctx.loop.type, ctx.loop.item))
+
+    @task
+    def seed(ctx):
+        ctx.set_var("items", [1, 2])
+
+    flow = Flow("parallel_foreach")
+    flow >> seed >> (left[3] & right)["$ctx.items"]
+
+    Engine().run(flow)
+
+    assert sorted(s for s in seen if s[0] == "right") == [("right", "foreach", 1), ("right", "foreach", 2)]
+    assert len([s for s in seen if s[0] == "left"]) == 6
+    assert all(s[1] == "repeat" for s in seen if s[0] == "left")
+
+
+def test_parallel_foreach_branches_keep_their_own_alias():
+    seen = []
+    lock = threading.Lock()
+
+    def reader(label):
+        def body(ctx):
+            item = ctx.get_var("item")
+            time.sleep(0.02)  # Let the other branch bind its alias meanwhile.
+            with lock:
+                seen.append((label, item, ctx.get_var("item")))
+
+        body.__name__ = f"read_{label}"
+        return task(body)
+
+    @task
+    def seed(ctx):
+        ctx.set_var("letters", ["a", "b", "c"])
+        ctx.set_var("digits", [1, 2, 3])
+
+    flow = Flow("parallel_alias")
+    flow >> seed >> (reader("left")["$ctx.letters as item"] & reader("right")["$ctx.digits as item"])
+
+    Engine().run(flow)
+
+    assert sorted(s[1] for s in seen if s[0] == "left") == ["a", "b", "c"]
+    assert sorted(s[1] for s in seen if s[0] == "right") == [1, 2, 3]
+    assert all(before == after for _, before, after in seen)
+
+
+def test_parked_sensor_branches_do_not_hold_threads():
+    polls = []
+
+    def sensor(index):
+        def poke(ctx):
+            polls.append(index)
+            return ctx.loop.iteration
+
+        poke.__name__ = f"sensor_{index}"
+        wrapper = task(poke)
+        return wrapper % (f"$ctx.results.sensor_{index} >= 3", {"max_iter": 5, "interval": 0.2, "deferrable": True})
+
+    block = sensor(0)
+    for index in range(1, 40):
+        block = block & sensor(index)
+
+    flow = Flow("sensors")
+    flow >> block
+
+    start = time.monotonic()
+    Engine().run(flow)
+    elapsed = time.monotonic() - start
+
+    assert len(polls) == 120
+    # Holding a thread per parked sensor would take ~2s on 8 workers.
+    assert elapsed < 1.2
+
+
+def test_parallel_block_propagates_branch_errors():
+    @task
+    def ok(ctx):
+        return "ok"
+
+    @task
+    def boom(ctx):
+        raise ValueError("branch failed")
+
+    flow = Flow("parallel_error")
+    flow >> (ok & boom)[1]
+
+    with pytest.raises(ValueError, match="branch failed"):
+        Engine().run(flow)
+
+
+def test_flat_parallel_block_stays_on_dag_scheduler():
+    @task
+    def a(ctx):
+        return 1
+
+    @task
+    def b(ctx):
+        return 2
+
+    @task
+    def c(ctx):
+        return 3
+
+    @task
+    def d(ctx):
+        return ctx.results["b"] + ctx.results["c"]
+
+    flow = Flow("flat_parallel")
+    flow >> a >> (b & c) >> d
+
+    assert not flow.has_control_flow()
+    assert {t.name for t in d.task.dependencies} == {"b", "c"}
+    assert {t.name for t in b.task.dependencies} == {"a"}
+    assert isinstance(flow.build_program().steps[1], ParallelNode)
+    assert FlowValidator(flow).validate().status == "ok"
+
+    ctx = Engine().run(flow)
+    assert ctx.results["d"] == 5
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pyoco.discovery.loader import TaskLoader
+from pyoco.discovery.plugins import EntryPointCache
+from pyoco.schemas.config import DiscoveryConfig, PyocoConfig
+
+
+def test_entry_points_are_cached_until_environment_changes(tmp_path):
+    path = tmp_path / "entry_points.json"
+    scanned = [SimpleNamespace(name="demo", value="pkg.hooks:register")]
+
+    with patch("pyoco.discovery.plugins._scan_entry_points", return_value=scanned) as scan, \
+         patch("pyoco.discovery.plugins.environment_fingerprint", return_value="env-1"):
+        first = EntryPointCache(path).entry_points("pyoco.tasks")
+        second = EntryPointCache(path).entry_points("pyoco.tasks")
+    assert scan.call_count == 1
+    assert [(ep.name, ep.value, ep.module) for ep in second] == [("demo", "pkg.hooks:register", "pkg.hooks")]
+    assert first == second
+
+    with patch("pyoco.discovery.plugins._scan_entry_points", return_value=[]) as scan, \
+         patch("pyoco.discovery.plugins.environment_fingerprint", return_value="env-2"):
+        assert EntryPointCache(path).entry_points("pyoco.tasks") == []
+    assert scan.call_count == 1
+
+
+def _plugin(task_name, calls):
+    def hook(registry):
+        calls.append(task_name)
+
+        @registry.task(name=task_name)
+        def run(ctx):
+            return task_name
+
+    return SimpleNamespace(name=task_name, value=f"pkg:{task_name}", module="pkg", load=lambda: hook)
+
+
+def test_lazy_loader_calls_only_the_needed_plugin_hook(tmp_path):
+    calls = []
+    entries = [_plugin("alpha", calls), _plugin("beta", calls)]
+    cache = EntryPointCache(tmp_path / "entry_points.json")
+    config = PyocoConfig(version=1, flows={}, tasks={}, discovery=DiscoveryConfig(lazy=True))
+
+    with patch("pyoco.discovery.loader.iter_entry_points", return_value=entries), \
+         patch("pyoco.discovery.loader.entry_point_cache", return_value=cache):
+        # First run: nothing recorded yet, so a lookup loads every plug-in.
+        first = TaskLoader(config)
+        first.load()
+        assert first.tasks["beta"].func(None) == "beta"
+        assert calls == ["alpha", "beta"]
+
+        calls.clear()
+        second = TaskLoader(config)
+        second.load()
+        assert "alpha" in second.tasks
+        assert calls == []
+        assert second.tasks["beta"].func(None) == "beta"
+        assert calls == ["beta"]
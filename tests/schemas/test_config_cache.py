@@ -0,0 +1,57 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pyoco.schemas.config import PyocoConfig
+
+CONFIG = """
+version: 1
+flows:
+  main:
+    graph: "A >> B"
+    defaults: {x: 1}
+tasks:
+  A:
+    callable: "mod:a"
+discovery:
+  glob_modules: ["jobs/*.py"]
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYOCO_CONFIG_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "flow.yaml"
+    path.write_text(CONFIG)
+    return path
+
+
+def test_unchanged_config_is_loaded_from_cache(config_path):
+    first = PyocoConfig.from_yaml(str(config_path))
+    with patch("pyoco.schemas.config._read_yaml", side_effect=AssertionError("parsed again")):
+        second = PyocoConfig.from_yaml(str(config_path))
+
+    assert second == first
+    assert second.flows["main"].defaults == {"x": 1}
+    assert second.tasks["A"].callable == "mod:a"
+    assert second.discovery.glob_modules == ["jobs/*.py"]
+
+
+def test_modified_config_is_parsed_again(config_path):
+    PyocoConfig.from_yaml(str(config_path))
+    config_path.write_text(CONFIG.replace("A >> B", "B >> A"))
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert PyocoConfig.from_yaml(str(config_path)).flows["main"].graph == "B >> A"
+
+
+def test_corrupt_cache_and_disabled_cache_fall_back_to_parsing(config_path, tmp_path):
+    PyocoConfig.from_yaml(str(config_path))
+    for entry in (tmp_path / "cache").iterdir():
+        entry.write_bytes(b"garbage")
+    assert PyocoConfig.from_yaml(str(config_path)).flows["main"].graph == "A >> B"
+
+    with patch("pyoco.schemas.config.pickle.load", side_effect=AssertionError("cache used")):
+        assert PyocoConfig.from_yaml(str(config_path), cache=False).version == 1